@@ -0,0 +1,106 @@
+"""Datos sintéticos compartidos por los benchmarks"""
+import atexit
+import os
+import random
+import shutil
+import tempfile
+from typing import Dict, List, Tuple
+
+from visor.services.navigation_system import NavigationSystem
+
+
+# Cooldowns (positivo, neutral, negativo)
+COOLDOWNS = {
+    'default': (5, 20, 0),
+    'long': (50, 500, 100),
+}
+
+# Proporción de votos (positivos, negativos)
+VOTE_RATIOS = {
+    'none': (0.0, 0.0),
+    'light': (0.10, 0.05),
+    'heavy': (0.40, 0.20),
+}
+
+
+def make_paths(count: int) -> List[str]:
+    """Rutas sintéticas repartidas en directorios de 1000 archivos"""
+    return [f"/library/dir_{i // 1000:05d}/img_{i:08d}.jpg" for i in range(count)]
+
+
+def make_votes(paths: List[str], ratio: str, seed: int = 0) -> Dict[str, int]:
+    """Votos aleatorios deterministas según VOTE_RATIOS"""
+    positive, negative = VOTE_RATIOS[ratio]
+    rng = random.Random(seed)
+    votes = {}
+    for path in paths:
+        r = rng.random()
+        if r < positive:
+            votes[path] = 1
+        elif r < positive + negative:
+            votes[path] = -1
+    return votes
+
+
+_nav_cache: Dict[Tuple, Tuple[List[str], Dict[str, int]]] = {}
+
+
+def make_nav(files: int, cooldowns: str = 'default', votes: str = 'light',
+             mode: str = 'uniform') -> NavigationSystem:
+    """NavigationSystem sembrado con `files` archivos y votos sintéticos"""
+    key = (files, votes)
+    if key not in _nav_cache:
+        # Solo se conserva el último tamaño para no acumular millones de rutas
+        _nav_cache.clear()
+        paths = make_paths(files)
+        _nav_cache[key] = (paths, make_votes(paths, votes))
+    paths, vote_map = _nav_cache[key]
+
+    pos, neu, neg = COOLDOWNS[cooldowns]
+    nav = NavigationSystem(
+        paths, positive_cooldown=pos, neutral_cooldown=neu,
+        negative_cooldown=neg, seed=1234
+    )
+    nav.votes = vote_map.copy()
+    nav.set_selection_mode(mode)
+    return nav
+
+
+# ========================================
+# Árboles de directorios
+# ========================================
+
+_trees: Dict[int, str] = {}
+NON_MEDIA_RATIO = 0.2
+EXTENSIONS = ['.jpg', '.png', '.webp', '.gif', '.mp4', '.mkv']
+
+
+def make_tree(files: int, per_dir: int = 100, fanout: int = 10) -> str:
+    """Árbol temporal con `files` archivos vacíos (parte no multimedia)"""
+    if files in _trees:
+        return _trees[files]
+
+    root = tempfile.mkdtemp(prefix=f"visor_bench_{files}_")
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    rng = random.Random(files)
+
+    dirs = max(1, files // per_dir)
+    created = 0
+    for d in range(dirs):
+        # Ruta anidada: a/b/c según el índice en base `fanout`
+        parts, n = [], d
+        for _ in range(3):
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+        directory = os.path.join(root, *parts, f"leaf{d}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(per_dir if d < dirs - 1 else files - created):
+            if rng.random() < NON_MEDIA_RATIO:
+                name = f"file_{i}.txt"
+            else:
+                name = f"file_{i}{rng.choice(EXTENSIONS)}"
+            open(os.path.join(directory, name), 'wb').close()
+            created += 1
+
+    _trees[files] = root
+    return root
@@ -0,0 +1,77 @@
+"""Decodificación y escalado de imágenes (requiere PySide6, funciona offscreen)"""
+import atexit
+import os
+import shutil
+import tempfile
+
+from .harness import benchmark, sizes
+
+
+VIEWPORT = (1600, 900)  # Tamaño típico del QLabel del visor
+
+_tmp = tempfile.mkdtemp(prefix="visor_bench_images_")
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+_app = None
+_images = {}
+
+
+def _ensure_app():
+    """QGuiApplication offscreen (QPixmap necesita una aplicación GUI)"""
+    global _app
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    from PySide6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def _make_image(size: str, fmt: str) -> str:
+    key = (size, fmt)
+    if key not in _images:
+        from PIL import Image
+        width, height = (int(v) for v in size.split('x'))
+        # Ruido: el peor caso para el compresor/decodificador
+        noise = Image.effect_noise((width, height), 64)
+        image = Image.merge('RGB', (noise, noise.rotate(90, expand=False), noise.transpose(Image.FLIP_LEFT_RIGHT)))
+        path = os.path.join(_tmp, f"{size}.{fmt}")
+        image.save(path, quality=90) if fmt == 'jpg' else image.save(path)
+        _images[key] = path
+    return _images[key]
+
+
+IMAGE_SIZES = [f"{w}x{h}" for w, h in sizes('images')]
+
+
+@benchmark("image.decode", size=IMAGE_SIZES, fmt=['jpg', 'png'])
+def decode(size, fmt):
+    _ensure_app()
+    from visor.ui.image_io import read_image
+    path = _make_image(size, fmt)
+    return lambda: read_image(path)
+
+
+@benchmark("image.scale_to_viewport", size=IMAGE_SIZES)
+def scale_to_viewport(size):
+    """El escalado de ViewerContainer._update_image"""
+    _ensure_app()
+    from PySide6.QtCore import Qt, QSize
+    from PySide6.QtGui import QPixmap
+    from visor.ui.image_io import read_image
+    image, _ = read_image(_make_image(size, 'jpg'))
+    pixmap = QPixmap.fromImage(image)
+    target = QSize(*VIEWPORT)
+    return lambda: pixmap.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+@benchmark("image.decode_and_display", size=IMAGE_SIZES)
+def decode_and_display(size):
+    """Camino completo de _show_image: decodificar, QPixmap y escalar"""
+    _ensure_app()
+    from PySide6.QtCore import Qt, QSize
+    from PySide6.QtGui import QPixmap
+    from visor.ui.image_io import read_image
+    path = _make_image(size, 'jpg')
+    target = QSize(*VIEWPORT)
+
+    def display():
+        image, _ = read_image(path)
+        QPixmap.fromImage(image).scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return display
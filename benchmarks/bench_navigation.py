@@ -0,0 +1,78 @@
+"""Throughput de NavigationSystem: next_random, get_stats, get_file_info, set_filter"""
+import random
+
+from visor.services.filter_index import FileFilter
+
+from .harness import benchmark, sizes
+from ._fixtures import make_nav, COOLDOWNS, VOTE_RATIOS
+
+
+@benchmark(
+    "navigation.next_random",
+    files=sizes('files'),
+    cooldowns=list(COOLDOWNS),
+    votes=list(VOTE_RATIOS),
+)
+def next_random(files, cooldowns, votes):
+    nav = make_nav(files, cooldowns, votes)
+    return nav.next_random
+
+
+@benchmark(
+    "navigation.next_random_mode",
+    files=sizes('files'),
+    mode=['uniform', 'weighted', 'shuffle'],
+)
+def next_random_mode(files, mode):
+    nav = make_nav(files, 'default', 'light', mode)
+    nav.next_random()  # Construir estructuras perezosas fuera del cronómetro
+    return nav.next_random
+
+
+@benchmark(
+    "navigation.get_stats",
+    files=sizes('files'),
+    votes=list(VOTE_RATIOS),
+)
+def get_stats(files, votes):
+    nav = make_nav(files, 'default', votes)
+    for _ in range(25):
+        nav.next_random()  # Cooldowns con contenido
+    return nav.get_stats
+
+
+@benchmark(
+    "navigation.get_file_info",
+    files=sizes('files'),
+    votes=list(VOTE_RATIOS),
+)
+def get_file_info(files, votes):
+    nav = make_nav(files, 'default', votes)
+    for _ in range(25):
+        nav.next_random()
+    rng = random.Random(0)
+    paths = nav.all_files
+    return lambda: nav.get_file_info(paths[rng.randrange(len(paths))])
+
+
+@benchmark(
+    "navigation.set_filter",
+    files=sizes('files'),
+    criterion=['directory', 'media_type', 'votes'],
+)
+def set_filter(files, criterion):
+    nav = make_nav(files, 'default', 'light', 'shuffle')
+    # Carpeta de 1000 archivos, un tipo o un voto: índice ya construido
+    filters = {
+        'directory': [FileFilter(directory="/library/dir_00000"), FileFilter(directory="/library/dir_00001")],
+        'media_type': [FileFilter(media_type='image'), FileFilter(media_type='video')],
+        'votes': [FileFilter(votes=(1,)), FileFilter(votes=(0,))],
+    }[criterion]
+    nav.set_filter(filters[0])
+    state = {'i': 0}
+
+    def switch():
+        state['i'] ^= 1
+        nav.set_filter(filters[state['i']])
+        nav.next_random()
+    return switch
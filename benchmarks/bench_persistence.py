@@ -0,0 +1,53 @@
+"""Guardado/carga de configuración y votos, e instantáneas de sesión"""
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+from .harness import benchmark, sizes
+from ._fixtures import make_nav, make_paths
+from visor.services.settings_store import SettingsStore
+
+
+_tmp = tempfile.mkdtemp(prefix="visor_bench_settings_")
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+
+
+def _store(name: str) -> SettingsStore:
+    base = Path(_tmp)
+    return SettingsStore(base / f"{name}.json", base / f"{name}.bin")
+
+
+def _data_with_votes(votes: int) -> dict:
+    nav = make_nav(1_000)
+    data = nav.export_data()
+    data['votes'] = {path: (1 if i % 3 else -1) for i, path in enumerate(make_paths(votes))}
+    return data
+
+
+@benchmark("persistence.save_settings", votes=sizes('votes'))
+def save_settings(votes):
+    store = _store(f"save_{votes}")
+    data = _data_with_votes(votes)
+    return lambda: store.save(data)
+
+
+@benchmark("persistence.load_settings", votes=sizes('votes'))
+def load_settings(votes):
+    store = _store(f"load_{votes}")
+    store.save(_data_with_votes(votes))
+    return store.load
+
+
+@benchmark("persistence.session_roundtrip", history=[100, 1_000, 10_000])
+def session_roundtrip(history):
+    nav = make_nav(100_000)
+    nav.set_max_history(history)
+    for _ in range(history):
+        nav.next_random()
+    target = make_nav(100_000)
+    target.set_max_history(history)
+
+    def roundtrip():
+        target.import_session(nav.export_session())
+    return roundtrip
@@ -0,0 +1,34 @@
+"""Escaneo de árboles de directorios (lo que ejecuta FileScanner)"""
+import os
+
+from .harness import benchmark, sizes
+from ._fixtures import make_tree
+from visor.services.file_catalog import FileCatalog, iter_media_files
+
+
+@benchmark("scanner.full_scan", files=sizes('scan'))
+def full_scan(files):
+    root = make_tree(files)
+
+    def scan():
+        catalog = FileCatalog()
+        for directory, skip in catalog.plan_roots([root]):
+            catalog.add_files(iter_media_files(directory, skip))
+        return catalog
+    return scan
+
+
+@benchmark("scanner.add_parent_of_indexed", files=sizes('scan'))
+def add_parent_of_indexed(files):
+    """Añadir el padre de un subárbol ya indexado: debe podarlo, no re-escanearlo"""
+    root = make_tree(files)
+    child = os.path.join(root, "d0")
+
+    def scan():
+        catalog = FileCatalog()
+        for directory, skip in catalog.plan_roots([child]):
+            catalog.add_files(iter_media_files(directory, skip))
+        for directory, skip in catalog.plan_roots([root, child, root + "/"]):
+            catalog.add_files(iter_media_files(directory, skip))
+        return catalog
+    return scan
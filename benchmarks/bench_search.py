@@ -0,0 +1,38 @@
+"""Búsqueda por nombre (SearchIndex): primer lote por tecla y carga del índice guardado"""
+from .harness import benchmark, sizes
+from ._fixtures import make_paths
+from visor.services.search_index import SearchIndex
+
+
+# Consultas: rara (pocos candidatos), común (todo coincide) y con errata
+QUERIES = {
+    'rare': "00012345",
+    'common': "img_",
+    'typo': "img_0001x345",
+}
+
+_indexes = {}
+
+
+def _index(files: int) -> SearchIndex:
+    """Índice completo (construirlo cuesta segundos: se comparte entre casos)"""
+    if files not in _indexes:
+        index = SearchIndex()
+        index.add(make_paths(files))
+        index.index_pending()
+        _indexes[files] = index
+    return _indexes[files]
+
+
+@benchmark("search.first_batch", files=sizes('files'), query=list(QUERIES))
+def first_batch(files, query):
+    """Lo que espera la lista tras cada tecla"""
+    index = _index(files)
+    text = QUERIES[query]
+    return lambda: next(index.search(text), None)
+
+
+@benchmark("search.loads", files=sizes('files'))
+def loads(files):
+    data = _index(files).dumps()
+    return lambda: SearchIndex.loads(data)
@@ -0,0 +1,40 @@
+"""Orden de la lista (SortIndex): construir una permutación y mover una fila por voto"""
+import random
+
+from .harness import benchmark, sizes
+from ._fixtures import make_paths, make_votes
+from visor.services.sort_index import SortIndex, SORT_NAME, SORT_MTIME, SORT_VOTE, SORT_TYPE
+
+
+@benchmark("sort.build", files=sizes('files'), key=[SORT_NAME, SORT_TYPE, SORT_MTIME, SORT_VOTE])
+def build(files, key):
+    """Primer cambio a un orden (los siguientes reutilizan la permutación)"""
+    paths = make_paths(files)
+    rng = random.Random(0)
+    index = SortIndex(paths)
+    index.set_votes(make_votes(paths, 'light'))
+    index.set_stats({}, {p: rng.random() for p in paths})
+
+    def run():
+        index.invalidate()
+        return index.order(key)
+    return run
+
+
+@benchmark("sort.vote_move", files=sizes('files'))
+def vote_move(files):
+    """Votar con la lista ordenada por voto"""
+    paths = make_paths(files)
+    votes = make_votes(paths, 'light')
+    index = SortIndex(paths)
+    index.set_votes(votes)
+    index.order(SORT_VOTE)
+    rng = random.Random(0)
+
+    def run():
+        path = paths[rng.randrange(len(paths))]
+        votes[path] = rng.choice((1, 0, -1))
+        move = index.find_vote_move(path)
+        if move is not None:
+            index.move_vote(path, *move)
+    return run
@@ -0,0 +1,36 @@
+"""Arranque en frío de la aplicación (proceso nuevo, ventana offscreen)"""
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .harness import benchmark
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+_home = tempfile.mkdtemp(prefix="visor_bench_home_")
+atexit.register(shutil.rmtree, _home, ignore_errors=True)
+
+
+@benchmark("startup.time_to_first_paint")
+def time_to_first_paint():
+    """Desde lanzar el intérprete hasta tener la ventana pintada y los votos cargados"""
+    env = dict(os.environ)
+    env.update({
+        'QT_QPA_PLATFORM': 'offscreen',
+        'HOME': _home,
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(SRC_DIR), env.get('PYTHONPATH')])),
+    })
+    command = [sys.executable, '-m', 'visor.main', '--quit-after-startup']
+
+    def launch():
+        result = subprocess.run(command, env=env, capture_output=True, timeout=60)
+        if result.returncode == 3:
+            raise RuntimeError("primer pintado fuera de presupuesto")
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors='replace').strip()[-200:])
+    return launch
@@ -0,0 +1,99 @@
+"""
+Tasa de aciertos de la caché de píxeles: política por votos frente a LRU
+
+    python -m benchmarks.cache_policy [--steps N] [--slots N]
+
+Simula sesiones de navegación (con vueltas atrás en el historial y la
+precarga de NavigationSystem.upcoming()) sobre una PixelCache pequeña.
+La propia caché lleva un LRU fantasma con la misma capacidad, así que
+las dos tasas salen del mismo flujo de accesos.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+
+SCENARIOS = [
+    # (archivos, modo, votos, peso de los positivos)
+    (2_000, 'uniform', 'light', 1.0),
+    (2_000, 'weighted', 'light', 3.0),
+    (2_000, 'weighted', 'light', 20.0),
+    (20_000, 'weighted', 'heavy', 3.0),
+    (20_000, 'shuffle', 'light', 1.0),
+]
+BACK_PROBABILITY = 0.1  # Pasos en que el usuario vuelve atrás
+
+
+def simulate(root: str, files: int, mode: str, votes: str, positive_weight: float,
+             steps: int, slots: int) -> dict:
+    from visor.services.pixel_cache import PixelCache
+    from ._fixtures import make_nav
+
+    nav = make_nav(files, 'default', votes, mode)
+    # Las rutas sintéticas se crean bajo `root` para que stat() funcione
+    nav.update_file_list([os.path.join(root, p.lstrip('/')) for p in nav.all_files])
+    nav.votes = {os.path.join(root, p.lstrip('/')): v for p, v in nav.votes.items()}
+    nav.category_weights[1] = positive_weight
+    for path in nav.all_files:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+
+    arena = Path(root) / f"arena_{files}_{mode}_{votes}_{positive_weight}"
+    pixel = b"\0\0\0\0"
+    cache = PixelCache(1, 1, path=arena, capacity_mb=slots * mmap_page() / 2**20)
+    rng = random.Random(7)
+    try:
+        for _ in range(steps):
+            if nav.can_go_back() and rng.random() < BACK_PROBABILITY:
+                path = nav.go_back()
+            else:
+                path = nav.next_random()
+            slot = cache.get(path)
+            if slot is not None:
+                slot.release()
+            else:
+                cache.reprioritize(nav.recurrence_priority)
+                cache.put(path, 1, 1, 4, 4, pixel, nav.recurrence_priority(path))
+            for upcoming in nav.upcoming():
+                if upcoming not in cache:
+                    cache.put(upcoming, 1, 1, 4, 4, pixel, nav.recurrence_priority(upcoming))
+        return cache.stats()
+    finally:
+        cache.close()
+
+
+def mmap_page() -> int:
+    import mmap
+    return mmap.PAGESIZE
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Política de la caché de píxeles frente a LRU")
+    parser.add_argument('--steps', type=int, default=5_000)
+    parser.add_argument('--slots', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    try:
+        import visor  # noqa: F401
+    except ImportError:
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+    root = tempfile.mkdtemp(prefix="visor_cache_policy_")
+    try:
+        print(f"{'archivos':>9} {'modo':>9} {'votos':>6} {'peso+':>6}   {'votos':>7} {'LRU':>7}")
+        for files, mode, votes, weight in SCENARIOS:
+            stats = simulate(root, files, mode, votes, weight, args.steps, args.slots)
+            print(f"{files:>9} {mode:>9} {votes:>6} {weight:>6.1f}   "
+                  f"{stats['hit_rate']:>7.1%} {stats['lru_hit_rate']:>7.1%}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
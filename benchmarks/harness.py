@@ -0,0 +1,211 @@
+"""
+Mini-harness de benchmarks (estilo asv)
+
+Cada benchmark es una función registrada con @benchmark que recibe sus
+parámetros, hace la preparación (no cronometrada) y devuelve la función
+sin argumentos que se mide.
+"""
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[..., Callable[[], object]]
+    params: Dict[str, list] = field(default_factory=dict)
+
+    def combinations(self) -> List[Dict]:
+        """Producto cartesiano de los parámetros"""
+        if not self.params:
+            return [{}]
+        keys = list(self.params)
+        return [dict(zip(keys, values)) for values in itertools.product(*self.params.values())]
+
+
+REGISTRY: List[Benchmark] = []
+
+
+# Tamaños por perfil (el perfil se fija antes de importar los módulos bench_*)
+PROFILES = {
+    'quick': {
+        'files': [1_000, 10_000],
+        'scan': [1_000],
+        'votes': [100, 10_000],
+        'images': [(1920, 1080)],
+    },
+    'default': {
+        'files': [1_000, 100_000, 1_000_000],
+        'scan': [1_000, 20_000],
+        'votes': [1_000, 100_000, 1_000_000],
+        'images': [(1920, 1080), (4000, 3000)],
+    },
+    'full': {
+        'files': [1_000, 100_000, 1_000_000, 5_000_000],
+        'scan': [1_000, 20_000, 100_000],
+        'votes': [1_000, 100_000, 1_000_000],
+        'images': [(1920, 1080), (4000, 3000), (8000, 6000)],
+    },
+}
+_profile = 'default'
+
+
+def set_profile(name: str):
+    """Elegir perfil de tamaños"""
+    global _profile
+    if name not in PROFILES:
+        raise ValueError(f"Perfil desconocido: {name}")
+    _profile = name
+
+
+def sizes(kind: str) -> list:
+    """Tamaños del perfil activo para un tipo de benchmark"""
+    return PROFILES[_profile][kind]
+
+
+def benchmark(name: str, **params):
+    """Registrar un benchmark; cada kwarg es la lista de valores de un parámetro"""
+    def decorator(func):
+        REGISTRY.append(Benchmark(name, func, params))
+        return func
+    return decorator
+
+
+def measure(target: Callable[[], object], min_time: float = 0.2, repeats: int = 5) -> Dict:
+    """
+    Cronometrar `target` con perf_counter_ns
+
+    Calibra cuántas llamadas caben en `min_time` por repetición; si una
+    sola llamada ya supera ese tiempo, se hace una llamada por repetición
+    (y menos repeticiones para no eternizar los tamaños grandes).
+    """
+    gc.collect()
+    start = time.perf_counter_ns()
+    target()
+    single = (time.perf_counter_ns() - start) / 1e9
+
+    if single >= min_time:
+        number = 1
+        repeats = max(1, min(repeats, int(5 * min_time / single) + 1))
+    else:
+        number = max(1, int(min_time / max(single, 1e-7)))
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                target()
+            samples.append((time.perf_counter_ns() - start) / number / 1e9)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    median = statistics.median(samples)
+    return {
+        'min': min(samples),
+        'median': median,
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops_per_sec': 1.0 / median if median > 0 else float('inf'),
+        'number': number,
+        'repeats': repeats,
+    }
+
+
+def environment_info() -> Dict:
+    """Metadatos para comparar resultados entre commits"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'qt_platform': os.environ.get('QT_QPA_PLATFORM'),
+    }
+
+
+def run(
+    benchmarks: List[Benchmark],
+    select: Optional[str] = None,
+    min_time: float = 0.2,
+    repeats: int = 5,
+    log=print
+) -> Dict:
+    """Ejecutar benchmarks y devolver el documento de resultados"""
+    results = []
+    for bench in benchmarks:
+        if select and select not in bench.name:
+            continue
+        for params in bench.combinations():
+            label = ", ".join(f"{k}={v}" for k, v in params.items())
+            try:
+                target = bench.func(**params)
+                stats = measure(target, min_time=min_time, repeats=repeats)
+            except Exception as e:
+                log(f"  ✗ {bench.name}[{label}]: {e}")
+                results.append({'name': bench.name, 'params': params, 'error': str(e)})
+                continue
+            log(f"  {bench.name}[{label}]: {format_time(stats['median'])} "
+                f"({stats['ops_per_sec']:.1f} ops/s)")
+            results.append({'name': bench.name, 'params': params, 'stats': stats})
+            # Liberar la preparación antes del siguiente caso
+            del target
+            gc.collect()
+
+    return {'meta': environment_info(), 'results': results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.10, log=print) -> int:
+    """Comparar medianas con otro archivo de resultados; devuelve nº de regresiones"""
+    def key(result):
+        return result['name'], json.dumps(result['params'], sort_keys=True)
+
+    base = {key(r): r['stats']['median'] for r in baseline['results'] if 'stats' in r}
+    regressions = 0
+    for result in current['results']:
+        if 'stats' not in result or key(result) not in base:
+            continue
+        before = base[key(result)]
+        after = result['stats']['median']
+        ratio = after / before if before > 0 else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ⚠ REGRESIÓN"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  ✓ mejora"
+        params = ", ".join(f"{k}={v}" for k, v in result['params'].items())
+        log(f"  {result['name']}[{params}]: {format_time(before)} → "
+            f"{format_time(after)} ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.2f} µs"
@@ -0,0 +1,93 @@
+"""
+Ejecutar la suite de benchmarks sin interfaz
+
+    python -m benchmarks.run [--profile quick|default|full] [-k FILTRO]
+                             [--output RUTA] [--compare BASE.json]
+
+Los resultados se guardan en JSON (por defecto en benchmarks/results/)
+junto con el commit y el entorno, para comparar entre commits con
+--compare. Con --compare el código de salida es 1 si hay regresiones.
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from . import harness
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+MODULES = [
+    'bench_navigation', 'bench_scanner', 'bench_persistence',
+    'bench_search', 'bench_sort', 'bench_images', 'bench_startup',
+]
+
+
+def _ensure_visor_importable():
+    """Permitir ejecutar la suite desde el repo sin instalar el paquete"""
+    try:
+        import visor  # noqa: F401
+    except ImportError:
+        sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de Visor Multimedia")
+    parser.add_argument('--profile', choices=list(harness.PROFILES), default='default',
+                        help="Tamaños a medir (quick para CI)")
+    parser.add_argument('-k', dest='select', default=None,
+                        help="Solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Archivo JSON de resultados")
+    parser.add_argument('--compare', type=Path, default=None,
+                        help="Resultados anteriores con los que comparar")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Variación relativa considerada regresión (0.10 = 10%%)")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Segundos mínimos por repetición")
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    _ensure_visor_importable()
+    # El perfil decide los parámetros, que se leen al importar los módulos
+    harness.set_profile(args.profile)
+
+    for name in MODULES:
+        try:
+            importlib.import_module(f"{__package__}.{name}")
+        except ImportError as e:
+            print(f"⚠ {name} omitido: {e}")
+
+    print(f"Perfil: {args.profile}")
+    document = harness.run(
+        harness.REGISTRY, select=args.select,
+        min_time=args.min_time, repeats=args.repeats
+    )
+    document['meta']['profile'] = args.profile
+
+    output = args.output
+    if output is None:
+        commit = (document['meta']['commit'] or 'nocommit')[:10]
+        output = BENCH_DIR / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"✓ Resultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print(f"\nComparación con {args.compare}:")
+        regressions = harness.compare(document, baseline, args.threshold)
+        if regressions:
+            print(f"⚠ {regressions} regresiones (umbral {args.threshold:.0%})")
+            return 1
+        print("✓ Sin regresiones")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
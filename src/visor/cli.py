@@ -0,0 +1,518 @@
+"""
+Línea de comandos sin interfaz gráfica
+
+    visor scan [DIR ...]     Crear o refrescar la biblioteca del índice
+    visor search TEXTO       Buscar archivos de la biblioteca por nombre
+    visor thumbs             Generar miniaturas de la biblioteca
+    visor stats              Estadísticas de la biblioteca y los votos
+    visor export             Exportar votos (JSON o CSV)
+    visor import ARCHIVO     Importar votos
+    visor bench [...]        Ejecutar la suite de benchmarks
+
+Pensado para cron en el servidor: la interfaz abre después con la
+biblioteca y las miniaturas ya preparadas. El trabajo pesado va a un
+pool de procesos y el progreso se escribe en stderr.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .services.file_catalog import (
+    FileCatalog, canonicalize_root, is_within, iter_media_files,
+    IMAGE_EXTENSIONS, VIDEO_EXTENSIONS, ALL_EXTENSIONS
+)
+from .services.media_index import MediaIndex
+from .services.navigation_system import NavigationSystem
+from .services.progress import ProgressMeter, format_duration
+from .services.search_index import SearchIndex
+from .services.settings_store import SettingsStore
+from .services.thumbnail_farm import ThumbnailFarm
+from .services.thumbnails import ThumbnailCache, THUMBNAIL_SIZE
+
+
+COMMANDS = ('scan', 'search', 'thumbs', 'stats', 'export', 'import', 'bench')
+CHUNK_SIZE = 256  # Elementos por tarea enviada al pool
+
+
+# ========================================
+# Progreso
+# ========================================
+
+class ProgressPrinter:
+    """Progreso en stderr: una línea que se reescribe en terminal, líneas sueltas si no"""
+
+    def __init__(self, label: str, total: int, quiet: bool = False, done: int = 0):
+        self.label = label
+        self.meter = ProgressMeter(total, done)
+        self.quiet = quiet
+        self._tty = sys.stderr.isatty()
+        self._last = 0.0
+        self._printed = None  # Último valor mostrado
+
+    def update(self, done: int, force: bool = False):
+        self.meter.update(done)
+        now = time.monotonic()
+        interval = 0.2 if self._tty else 5.0
+        if self.quiet or (not force and now - self._last < interval) or done == self._printed:
+            return
+        self._last = now
+        self._printed = done
+        line = f"{self.label}: {self.meter.format()}"
+        if self._tty:
+            sys.stderr.write(f"\r\033[K{line}")
+        else:
+            sys.stderr.write(line + "\n")
+        sys.stderr.flush()
+
+    def finish(self):
+        self.update(self.meter.done, force=True)
+        if self._tty and not self.quiet:
+            sys.stderr.write("\n")
+        elapsed = time.monotonic() - self.meter.started
+        return elapsed
+
+
+def _pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    # spawn: el mismo contexto que usa la interfaz (no hereda threads)
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+def _chunks(items: Sequence, size: int = CHUNK_SIZE) -> List[Sequence]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# ========================================
+# Workers (nivel de módulo para poder usarlos en procesos)
+# ========================================
+
+def _walk_unit(unit) -> List[str]:
+    """Recorrer un subdirectorio de una raíz"""
+    directory, skip_roots = unit
+    try:
+        return list(iter_media_files(directory, skip_roots))
+    except OSError:
+        return []
+
+
+def _stat_chunk(paths: Sequence[str]) -> List[Optional[int]]:
+    """Tamaño de cada archivo (None si ya no existe)"""
+    sizes = []
+    for path in paths:
+        try:
+            sizes.append(os.stat(path).st_size)
+        except OSError:
+            sizes.append(None)
+    return sizes
+
+
+def _exists_chunk(paths: Sequence[str]) -> List[bool]:
+    return [os.path.exists(p) for p in paths]
+
+
+# ========================================
+# Utilidades
+# ========================================
+
+def _load_catalog(index: MediaIndex) -> FileCatalog:
+    """Catálogo desde la instantánea del índice"""
+    catalog = FileCatalog()
+    snapshot = index.load_library_snapshot()
+    if snapshot:
+        catalog.restore(*snapshot)
+    return catalog
+
+
+def _load_search(index: MediaIndex, catalog: FileCatalog) -> SearchIndex:
+    """Índice de búsqueda guardado, ajustado al catálogo y sin pendientes"""
+    data = index.load_search_index()
+    search = SearchIndex.loads(data) if data is not None else None
+    if search is None:
+        search = SearchIndex()
+    search.sync(catalog.files, catalog.__contains__)
+    search.index_pending()
+    return search
+
+
+def _split_root(root: str, skip_roots: List[str]):
+    """
+    Dividir una raíz en unidades de trabajo para el pool
+
+    Returns:
+        (archivos del primer nivel, [(subdirectorio, omitir), ...])
+    """
+    skip = {canonicalize_root(d) for d in skip_roots}
+    top_files, units = [], []
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError:
+        return top_files, units
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.path not in skip:
+                units.append((entry.path, [d for d in skip if is_within(d, entry.path)]))
+        elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in ALL_EXTENSIONS:
+            top_files.append(entry.path)
+    return top_files, units
+
+
+def _parallel_exists(paths: List[str], workers: Optional[int], label: str, quiet: bool) -> Dict[str, bool]:
+    """Comprobar en paralelo qué rutas existen"""
+    result = {}
+    progress = ProgressPrinter(label, len(paths), quiet)
+    with _pool(workers) as pool:
+        chunks = _chunks(paths)
+        for chunk, flags in zip(chunks, pool.map(_exists_chunk, chunks)):
+            result.update(zip(chunk, flags))
+            progress.update(len(result))
+    progress.finish()
+    return result
+
+
+# ========================================
+# Subcomandos
+# ========================================
+
+def cmd_scan(args) -> int:
+    """Añadir raíces nuevas y/o refrescar las existentes"""
+    with MediaIndex(args.index) as index:
+        catalog = _load_catalog(index)
+        previous_roots = list(catalog.roots)
+
+        new_jobs = catalog.plan_roots(args.directories)
+        for directory in args.directories:
+            if not os.path.isdir(canonicalize_root(directory)):
+                print(f"⚠ No es un directorio: {directory}", file=sys.stderr)
+
+        # Sin directorios (o con --refresh) se verifican también las existentes;
+        # las raíces no montadas conservan sus archivos
+        jobs = list(new_jobs)
+        if not args.directories or args.refresh:
+            jobs += [
+                (root, []) for root in catalog.roots
+                if root in previous_roots and os.path.isdir(root)
+            ]
+        if not jobs:
+            print("Nada que escanear (añade directorios: visor scan DIR ...)")
+            return 0
+
+        found: List[str] = []
+        units = []
+        for root, skip in jobs:
+            top_files, root_units = _split_root(root, skip)
+            found.extend(top_files)
+            units.extend(root_units)
+
+        progress = ProgressPrinter("scan (directorios)", len(units), args.quiet)
+        with _pool(args.workers) as pool:
+            for done, files in enumerate(pool.map(_walk_unit, units), 1):
+                found.extend(files)
+                progress.update(done)
+        elapsed = progress.finish()
+
+        refreshed = [root for root, _ in jobs if root not in {r for r, _ in new_jobs}]
+        found_set = set(found)
+        missing = [
+            f for f in catalog.files
+            if f not in found_set and any(is_within(f, root) for root in refreshed)
+        ]
+        catalog.remove_files(missing)
+        added = catalog.add_files(found)
+        search = _load_search(index, catalog)
+        index.save_library_snapshot(catalog.roots, catalog.files, search_index=search.dumps())
+
+    print(
+        f"✓ {len(catalog)} archivos en {len(catalog.roots)} raíces "
+        f"(+{len(added)} nuevos, -{len(missing)} eliminados) en {format_duration(elapsed)}"
+    )
+    return 0
+
+
+def cmd_search(args) -> int:
+    """Archivos cuyo nombre contiene todas las palabras (o se parece, si no hay ninguno)"""
+    with MediaIndex(args.index) as index:
+        catalog = _load_catalog(index)
+        search = _load_search(index, catalog)
+
+    shown = 0
+    for batch in search.search(' '.join(args.query)):
+        if args.limit:
+            batch = batch[:args.limit - shown]
+        for path in batch:
+            print(path)
+        shown += len(batch)
+        if args.limit and shown >= args.limit:
+            break
+    if not shown:
+        print("Sin resultados", file=sys.stderr)
+    return 0
+
+
+def cmd_thumbs(args) -> int:
+    """Generar las miniaturas (y metadatos) que falten; reanuda si se interrumpió"""
+    with MediaIndex(args.index) as index:
+        catalog = _load_catalog(index)
+        if not any(os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS for f in catalog.files):
+            print("No hay imágenes en la biblioteca (ejecuta antes: visor scan DIR)")
+            return 0
+
+        printer = None
+
+        def progress(done, total, rate, eta):
+            nonlocal printer
+            if printer is None:
+                printer = ProgressPrinter("thumbs", total, args.quiet, done=done)
+            printer.update(done)
+
+        farm = ThumbnailFarm(
+            cache=ThumbnailCache(args.cache_dir, args.size),
+            index=index,
+            max_workers=args.workers,
+            force=args.force,
+            verify=args.verify,
+            progress=progress
+        )
+        counts = farm.run(catalog.files)
+        elapsed = printer.finish()
+
+    print(
+        f"✓ {counts['created']} generadas, {counts['cached']} ya existían, "
+        f"{counts['failed']} fallidas en {format_duration(elapsed)}"
+    )
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """Estadísticas de biblioteca y votos"""
+    with MediaIndex(args.index) as index:
+        catalog = _load_catalog(index)
+    settings = SettingsStore(args.settings).load() or {}
+
+    nav = NavigationSystem(catalog.files)
+    nav.import_data(settings)
+    nav_stats = nav.get_stats()
+
+    by_extension: Dict[str, int] = {}
+    for f in catalog.files:
+        ext = os.path.splitext(f)[1].lower()
+        by_extension[ext] = by_extension.get(ext, 0) + 1
+    images = sum(n for ext, n in by_extension.items() if ext in IMAGE_EXTENSIONS)
+    videos = sum(n for ext, n in by_extension.items() if ext in VIDEO_EXTENSIONS)
+    orphan_votes = sum(1 for p in nav.votes if p not in catalog)
+
+    stats = {
+        'roots': catalog.roots,
+        'files': len(catalog),
+        'images': images,
+        'videos': videos,
+        'by_extension': dict(sorted(by_extension.items(), key=lambda kv: -kv[1])),
+        'votes': {
+            'positive': nav_stats['positive_voted'],
+            'negative': nav_stats['negative_voted'],
+            'neutral': nav_stats['neutral_voted'],
+            'without_file': orphan_votes,
+        },
+        'selection_mode': nav.selection_mode,
+    }
+
+    if args.sizes and catalog.files:
+        total_bytes = 0
+        missing = 0
+        progress = ProgressPrinter("stats (tamaños)", len(catalog), args.quiet)
+        done = 0
+        with _pool(args.workers) as pool:
+            chunks = _chunks(catalog.files)
+            for sizes in pool.map(_stat_chunk, chunks):
+                total_bytes += sum(s for s in sizes if s is not None)
+                missing += sum(1 for s in sizes if s is None)
+                done += len(sizes)
+                progress.update(done)
+        progress.finish()
+        stats['total_bytes'] = total_bytes
+        stats['missing_files'] = missing
+
+    if args.json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Biblioteca: {stats['files']} archivos ({images} imágenes, {videos} videos) "
+          f"en {len(catalog.roots)} raíces")
+    for root in catalog.roots:
+        print(f"  {root}")
+    print("Extensiones: " + ", ".join(f"{ext} {n}" for ext, n in stats['by_extension'].items()))
+    votes = stats['votes']
+    print(f"Votos: 👍 {votes['positive']} | 👎 {votes['negative']} | ⚪ {votes['neutral']} "
+          f"| sin archivo en la biblioteca: {votes['without_file']}")
+    print(f"Modo de selección: {nav.selection_mode}")
+    if 'total_bytes' in stats:
+        print(f"Tamaño total: {stats['total_bytes'] / 1e9:.2f} GB "
+              f"({stats['missing_files']} archivos ya no existen)")
+    return 0
+
+
+def cmd_export(args) -> int:
+    """Exportar votos"""
+    settings = SettingsStore(args.settings).load() or {}
+    votes: Dict[str, int] = settings.get('votes', {})
+
+    if args.existing_only and votes:
+        exists = _parallel_exists(list(votes), args.workers, "export (verificando)", args.quiet)
+        votes = {p: v for p, v in votes.items() if exists[p]}
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(['path', 'vote'])
+            writer.writerows(sorted(votes.items()))
+        else:
+            json.dump({'votes': votes}, out, indent=2, ensure_ascii=False)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✓ {len(votes)} votos exportados", file=sys.stderr)
+    return 0
+
+
+def _read_votes(path: Path) -> Dict[str, int]:
+    """Votos de un JSON ({'votes': {...}} o {...}) o un CSV path,vote"""
+    if path.suffix.lower() == '.csv':
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            return {row['path']: int(row['vote']) for row in reader}
+    with open(path) as f:
+        data = json.load(f)
+    return data.get('votes', data) if isinstance(data, dict) else {}
+
+
+def cmd_import(args) -> int:
+    """Importar votos (fusionando con los existentes por defecto)"""
+    try:
+        incoming = _read_votes(args.file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error leyendo {args.file}: {e}", file=sys.stderr)
+        return 1
+
+    invalid = [p for p, v in incoming.items() if v not in (-1, 0, 1)]
+    if invalid:
+        print(f"⚠ {len(invalid)} votos con valor no válido ignorados", file=sys.stderr)
+    incoming = {p: v for p, v in incoming.items() if v in (-1, 0, 1)}
+
+    if args.prune_missing and incoming:
+        exists = _parallel_exists(list(incoming), args.workers, "import (verificando)", args.quiet)
+        incoming = {p: v for p, v in incoming.items() if exists[p]}
+
+    store = SettingsStore(args.settings)
+    settings = store.load() or {}
+    votes = {} if args.replace else dict(settings.get('votes', {}))
+    for path, vote in incoming.items():
+        if vote == 0:
+            votes.pop(path, None)  # Neutral = sin voto
+        else:
+            votes[path] = vote
+    settings['votes'] = votes
+    store.save(settings)
+
+    print(f"✓ {len(incoming)} votos importados ({len(votes)} en total)")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    """Delegar en benchmarks/run.py del repositorio"""
+    repo_root = Path(__file__).resolve().parents[2]
+    if not (repo_root / "benchmarks" / "run.py").exists():
+        print("La suite de benchmarks solo está disponible desde el repositorio", file=sys.stderr)
+        return 1
+    sys.path.insert(0, str(repo_root))
+    from benchmarks import run as bench_run
+    return bench_run.main(args.bench_args)
+
+
+# ========================================
+# Entrada
+# ========================================
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--index', type=Path, default=None,
+                        help="Base de datos del índice (por defecto en el home)")
+    common.add_argument('--settings', type=Path, default=None,
+                        help="Archivo de configuración y votos (por defecto en el home)")
+    common.add_argument('-j', '--workers', type=int, default=None,
+                        help="Procesos del pool (por defecto, nº de CPUs)")
+    common.add_argument('-q', '--quiet', action='store_true', help="Sin progreso")
+
+    parser = argparse.ArgumentParser(
+        prog='visor', description="Visor Multimedia: sin argumentos abre la interfaz"
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('scan', parents=[common], help="Crear o refrescar la biblioteca")
+    p.add_argument('directories', nargs='*', help="Raíces nuevas (sin ninguna: refrescar todas)")
+    p.add_argument('--refresh', action='store_true', help="Refrescar también las raíces existentes")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser('search', parents=[common], help="Buscar archivos por nombre")
+    p.add_argument('query', nargs='+', help="Palabras del nombre (sin mayúsculas ni orden)")
+    p.add_argument('-n', '--limit', type=int, default=0, help="Resultados como máximo (0 = todos)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('thumbs', parents=[common], help="Generar miniaturas")
+    p.add_argument('--size', type=int, default=THUMBNAIL_SIZE, help="Lado mayor en píxeles")
+    p.add_argument('--cache-dir', type=Path, default=None, help="Directorio de miniaturas")
+    p.add_argument('--force', action='store_true', help="Regenerar aunque existan")
+    p.add_argument('--verify', action='store_true',
+                   help="Revisar también lo ya procesado (archivos modificados)")
+    p.set_defaults(func=cmd_thumbs)
+
+    p = sub.add_parser('stats', parents=[common], help="Estadísticas de biblioteca y votos")
+    p.add_argument('--sizes', action='store_true', help="Sumar tamaños en disco (lee cada archivo)")
+    p.add_argument('--json', action='store_true', help="Salida JSON")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('export', parents=[common], help="Exportar votos")
+    p.add_argument('-o', '--output', type=Path, default=None, help="Archivo (por defecto stdout)")
+    p.add_argument('--format', choices=['json', 'csv'], default='json')
+    p.add_argument('--existing-only', action='store_true', help="Omitir archivos que ya no existen")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('import', parents=[common], help="Importar votos (JSON o CSV)")
+    p.add_argument('file', type=Path)
+    p.add_argument('--replace', action='store_true', help="Sustituir en lugar de fusionar")
+    p.add_argument('--prune-missing', action='store_true', help="Omitir archivos que no existen")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('bench', help="Ejecutar benchmarks (argumentos de benchmarks.run)")
+    p.add_argument('bench_args', nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # bench reenvía todas sus opciones a benchmarks.run sin interpretarlas
+    if argv[:1] == ['bench']:
+        return cmd_bench(argparse.Namespace(bench_args=argv[1:]))
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        print("\nInterrumpido", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
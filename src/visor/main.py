@@ -1,13 +1,47 @@
-from .ui.app import VisorApp
+from .services.profiler import startup  # Primero: origen del informe de arranque
+import os
 import sys
 
 
+def _cli_commands():
+    from .cli import COMMANDS
+    return COMMANDS
+
+
 def main():
-    app = VisorApp(sys.argv)
-    return app.run()
+    """
+    Arrancar la interfaz
+
+    Opciones de diagnóstico:
+        --startup-report      Imprimir los tiempos de cada fase del arranque
+        --quit-after-startup  Salir tras cargar la configuración (código 3
+                              si el primer pintado supera el presupuesto)
+    """
+    # Subcomandos sin interfaz: visor scan|thumbs|stats|export|import|bench
+    if len(sys.argv) > 1 and sys.argv[1] in ('-h', '--help', *_cli_commands()):
+        from . import cli
+        return cli.main(sys.argv[1:])
+    
+    argv = list(sys.argv)
+    report = '--startup-report' in argv or os.environ.get('VISOR_STARTUP_REPORT') == '1'
+    quit_after = '--quit-after-startup' in argv
+    argv = [a for a in argv if a not in ('--startup-report', '--quit-after-startup')]
 
+    from .ui.app import VisorApp
+    startup.mark("import Qt")
 
+    app = VisorApp(argv)
+    window = app.main_window
+
+    def on_startup_finished():
+        if report or quit_after:
+            print(startup.format_report())
+        if quit_after:
+            app.exit(0 if startup.within_budget() else 3)
+
+    window.startupFinished.connect(on_startup_finished)
+    return app.run()
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
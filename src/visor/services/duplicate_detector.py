@@ -0,0 +1,345 @@
+import os
+import hashlib
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .file_catalog import IMAGE_EXTENSIONS
+from .media_index import MediaIndex
+
+
+PARTIAL_HASH_BYTES = 64 * 1024  # Primer bloque para el hash parcial
+FULL_HASH_CHUNK = 1024 * 1024
+DHASH_SIZE = 8  # dHash de 8x8 = 64 bits
+DHASH_MAX_DISTANCE = 4  # Distancia Hamming máxima para casi-duplicados
+CANCEL_POLL_SECONDS = 0.1  # Cada cuánto se mira si hay que cancelar mientras se espera al pool
+
+
+# ========================================
+# Workers (nivel de módulo para poder usarlos en procesos)
+# ========================================
+
+_cancel_event = None  # multiprocessing.Event compartido con el proceso principal
+
+
+def _init_worker(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _worker_cancelled() -> bool:
+    return _cancel_event is not None and _cancel_event.is_set()
+
+
+def _run_chunk(func, paths: List[str]) -> List:
+    """Aplicar `func` a un bloque de rutas (lo que queda tras cancelar, None)"""
+    return [None if _worker_cancelled() else func(path) for path in paths]
+
+
+def _partial_hash(path: str) -> Optional[str]:
+    """BLAKE2 del primer bloque del archivo"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(PARTIAL_HASH_BYTES), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def _full_hash(path: str) -> Optional[str]:
+    """BLAKE2 del archivo completo"""
+    try:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            while chunk := f.read(FULL_HASH_CHUNK):
+                if _worker_cancelled():
+                    return None  # Archivos grandes: no terminar de leerlos
+                h.update(chunk)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+def _dhash(path: str) -> Optional[int]:
+    """Hash perceptual (dHash) de una imagen"""
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            # draft() permite a JPEG decodificar a escala reducida (mucho más rápido)
+            img.draft('L', (DHASH_SIZE * 16, DHASH_SIZE * 16))
+            small = img.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE))
+            pixels = small.tobytes()
+    except Exception:
+        return None
+
+    value = 0
+    row_len = DHASH_SIZE + 1
+    for y in range(DHASH_SIZE):
+        row = pixels[y * row_len:(y + 1) * row_len]
+        for x in range(DHASH_SIZE):
+            value = (value << 1) | (row[x] > row[x + 1])
+    # SQLite guarda enteros con signo de 64 bits
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+# ========================================
+# Agrupación
+# ========================================
+
+class _UnionFind:
+    """Union-find para fusionar grupos de duplicados"""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, x: str) -> str:
+        self.parent.setdefault(x, x)
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: str, b: str):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+    def groups(self) -> List[List[str]]:
+        result = defaultdict(list)
+        for x in self.parent:
+            result[self.find(x)].append(x)
+        return [sorted(g) for g in result.values() if len(g) > 1]
+
+
+def _hamming(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+class DuplicateDetector:
+    """
+    Detección de duplicados por contenido
+
+    Etapas:
+    1. Prefiltro por tamaño (y hardlinks por inodo, sin leer nada)
+    2. Hash parcial BLAKE2 del primer bloque
+    3. Hash completo BLAKE2 solo para los que coinciden en el parcial
+    4. (Opcional) dHash perceptual para casi-duplicados de imágenes
+
+    Los hashes se calculan en un pool de procesos y se cachean en el
+    índice de medios, validados por tamaño y mtime.
+    """
+
+    def __init__(
+        self,
+        index: Optional[MediaIndex] = None,
+        perceptual: bool = False,
+        max_workers: Optional[int] = None,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        mtimes_ready: Optional[Callable[[Dict[str, float]], None]] = None,
+        sizes_ready: Optional[Callable[[Dict[str, int]], None]] = None
+    ):
+        """
+        Args:
+            index: Índice donde cachear hashes (None = sin caché)
+            perceptual: Incluir casi-duplicados mediante dHash
+            max_workers: Procesos del pool (None = nº de CPUs)
+            progress: Callback (etapa, hechos, total)
+            should_cancel: Callback que devuelve True para abortar
+            mtimes_ready: Callback con {path: mtime} tras el stat inicial
+                (lo aprovechan los filtros por fecha sin otro recorrido)
+            sizes_ready: Ídem con {path: tamaño} (orden por tamaño)
+        """
+        self.index = index
+        self.perceptual = perceptual
+        self.max_workers = max_workers
+        self._cancel_event = None  # Se crea con cada pool
+        self._progress = progress or (lambda stage, done, total: None)
+        self._should_cancel = should_cancel or (lambda: False)
+        self._mtimes_ready = mtimes_ready
+        self._sizes_ready = sizes_ready
+
+    def find_groups(self, paths: Iterable[str]) -> List[List[str]]:
+        """Devolver grupos de archivos duplicados (cada grupo ordenado)"""
+        stats = self._stat_files(paths)
+        if self._mtimes_ready is not None:
+            self._mtimes_ready({p: s.st_mtime for p, s in stats.items()})
+        if self._sizes_ready is not None:
+            self._sizes_ready({p: s.st_size for p, s in stats.items()})
+        cached = self.index.get_content_hashes(
+            {p: (s.st_size, s.st_mtime_ns) for p, s in stats.items()}
+        ) if self.index else {}
+        computed: Dict[str, Dict] = defaultdict(dict)
+        uf = _UnionFind()
+
+        # spawn: no heredar threads de Qt con fork
+        ctx = multiprocessing.get_context('spawn')
+        # Los workers lo consultan entre archivos (y entre bloques del hash
+        # completo): cancelar no espera a que acabe un lote entero
+        self._cancel_event = ctx.Event()
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(self._cancel_event,)
+        ) as pool:
+            # 1. Prefiltro por tamaño; hardlinks directos por (dispositivo, inodo)
+            by_size = defaultdict(list)
+            by_inode = defaultdict(list)
+            for path, st in stats.items():
+                by_inode[(st.st_dev, st.st_ino)].append(path)
+                by_size[st.st_size].append(path)
+
+            for same_inode in by_inode.values():
+                for other in same_inode[1:]:
+                    uf.union(same_inode[0], other)
+
+            # Un representante por inodo: los hardlinks no se re-hashean
+            candidates = [
+                [p for p in group if uf.find(p) == p]
+                for size, group in by_size.items() if size > 0
+            ]
+            candidates = [g for g in candidates if len(g) > 1]
+
+            # 2. Hash parcial
+            partial = self._run_stage(
+                pool, 'partial', _partial_hash,
+                [p for g in candidates for p in g], 'partial_hash', cached, computed
+            )
+            if partial is None:
+                return []
+
+            narrowed = []
+            for group in candidates:
+                buckets = defaultdict(list)
+                for p in group:
+                    if partial.get(p):
+                        buckets[partial[p]].append(p)
+                narrowed.extend(b for b in buckets.values() if len(b) > 1)
+
+            # 3. Hash completo (solo archivos mayores que el bloque parcial)
+            needs_full = [
+                p for g in narrowed for p in g
+                if stats[p].st_size > PARTIAL_HASH_BYTES
+            ]
+            full = self._run_stage(
+                pool, 'full', _full_hash, needs_full, 'full_hash', cached, computed
+            )
+            if full is None:
+                return []
+
+            for group in narrowed:
+                buckets = defaultdict(list)
+                for p in group:
+                    # Si cabe en el bloque parcial, el parcial ya es el hash completo
+                    key = full.get(p) if stats[p].st_size > PARTIAL_HASH_BYTES else partial[p]
+                    if key:
+                        buckets[key].append(p)
+                for bucket in buckets.values():
+                    for other in bucket[1:]:
+                        uf.union(bucket[0], other)
+
+            # 4. Hash perceptual
+            if self.perceptual:
+                images = [
+                    p for p in stats
+                    if os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS
+                    and uf.find(p) == p
+                ]
+                dhashes = self._run_stage(
+                    pool, 'perceptual', _dhash, images, 'dhash', cached, computed
+                )
+                if dhashes is None:
+                    return []
+                self._merge_near_duplicates(dhashes, uf)
+
+        if self.index and computed:
+            self.index.store_content_hashes(
+                (p, stats[p].st_size, stats[p].st_mtime_ns, {**cached.get(p, {}), **h})
+                for p, h in computed.items()
+            )
+
+        return uf.groups()
+
+    # ========================================
+    # Internos
+    # ========================================
+
+    def _stat_files(self, paths: Iterable[str]) -> Dict[str, os.stat_result]:
+        stats = {}
+        for path in paths:
+            try:
+                stats[path] = os.stat(path)
+            except OSError:
+                continue
+        return stats
+
+    def _run_stage(
+        self, pool, stage: str, func, paths: List[str],
+        key: str, cached: Dict, computed: Dict
+    ) -> Optional[Dict]:
+        """Calcular `func` para `paths` reutilizando la caché; None si se cancela"""
+        result = {}
+        pending = []
+        for p in paths:
+            value = cached.get(p, {}).get(key)
+            if value is not None:
+                result[p] = value
+            else:
+                pending.append(p)
+
+        total = len(paths)
+        done = total - len(pending)
+        self._progress(stage, done, total)
+
+        chunksize = max(1, min(64, len(pending) // ((self.max_workers or os.cpu_count() or 1) * 4)))
+        chunks = {
+            pool.submit(_run_chunk, func, pending[i:i + chunksize]): pending[i:i + chunksize]
+            for i in range(0, len(pending), chunksize)
+        }
+        waiting = set(chunks)
+        reported = done
+        while waiting:
+            # Con plazo: la cancelación se atiende aunque ningún bloque termine
+            finished, waiting = wait(waiting, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            if self._should_cancel():
+                self._cancel_event.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                return None
+            for future in finished:
+                for path, value in zip(chunks[future], future.result()):
+                    result[path] = value
+                    if value is not None:
+                        computed[path][key] = value
+                done += len(chunks[future])
+            if done - reported >= 100 or (finished and done == total):
+                self._progress(stage, done, total)
+                reported = done
+
+        return result
+
+    def _merge_near_duplicates(self, dhashes: Dict[str, int], uf: _UnionFind):
+        """
+        Unir imágenes con dHash cercano
+
+        Por el principio del palomar, dos hashes a distancia <= 4 coinciden
+        en al menos una de 5 bandas; solo se comparan pares que comparten banda.
+        """
+        bands = DHASH_MAX_DISTANCE + 1
+        band_bits = 64 // bands + 1
+        mask = (1 << band_bits) - 1
+        items = [(p, h & 0xFFFFFFFFFFFFFFFF) for p, h in dhashes.items() if h is not None]
+
+        for band in range(bands):
+            shift = band * band_bits
+            buckets = defaultdict(list)
+            for path, h in items:
+                buckets[(h >> shift) & mask].append((path, h))
+            for bucket in buckets.values():
+                if len(bucket) < 2:
+                    continue
+                for i, (pa, ha) in enumerate(bucket):
+                    for pb, hb in bucket[i + 1:]:
+                        if _hamming(ha, hb) <= DHASH_MAX_DISTANCE:
+                            uf.union(pa, pb)
+
@@ -0,0 +1,165 @@
+import os
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+
+EXIF_HEADER_BYTES = 64 * 1024  # El segmento APP1 debe caber aquí (máx. 64 KB por norma)
+
+TAG_ORIENTATION = 0x0112
+TAG_PREVIEW_OFFSET = 0x0201  # JPEGInterchangeFormat (IFD1)
+TAG_PREVIEW_LENGTH = 0x0202  # JPEGInterchangeFormatLength (IFD1)
+
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+class ExifInfo(NamedTuple):
+    """Lo que el visor usa del EXIF; el offset del preview es absoluto en el archivo"""
+    orientation: int = 1
+    preview_offset: int = 0
+    preview_length: int = 0
+
+    @property
+    def has_preview(self) -> bool:
+        return self.preview_length > 0
+
+    @property
+    def swaps_axes(self) -> bool:
+        """Orientaciones 5-8 giran 90°: ancho y alto se intercambian"""
+        return self.orientation >= 5
+
+
+NO_EXIF = ExifInfo()
+
+
+# ========================================
+# Parser
+# ========================================
+
+def _read_ifd(data: bytes, base: int, offset: int, endian: str) -> Tuple[dict, int]:
+    """
+    Entradas enteras de un IFD TIFF
+
+    Returns:
+        ({tag: valor}, offset del siguiente IFD o 0)
+    """
+    start = base + offset
+    if offset <= 0 or start + 2 > len(data):
+        return {}, 0
+    (count,) = struct.unpack_from(endian + "H", data, start)
+    entries = {}
+    for i in range(count):
+        pos = start + 2 + i * 12
+        if pos + 12 > len(data):
+            return entries, 0
+        tag, kind, n = struct.unpack_from(endian + "HHI", data, pos)
+        if n != 1 or kind not in (3, 4):
+            continue  # Solo interesan SHORT/LONG escalares (en línea en la entrada)
+        (value,) = struct.unpack_from(endian + ("H" if kind == 3 else "I"), data, pos + 8)
+        entries[tag] = value
+    end = start + 2 + count * 12
+    next_ifd = struct.unpack_from(endian + "I", data, end)[0] if end + 4 <= len(data) else 0
+    return entries, next_ifd
+
+
+def _parse_tiff(data: bytes, base: int) -> ExifInfo:
+    """Orientación (IFD0) y preview JPEG (IFD1) de una estructura TIFF en `base`"""
+    order = data[base:base + 2]
+    if order == b"II":
+        endian = "<"
+    elif order == b"MM":
+        endian = ">"
+    else:
+        return NO_EXIF
+    if len(data) < base + 8:
+        return NO_EXIF
+    magic, ifd0 = struct.unpack_from(endian + "HI", data, base + 2)
+    if magic != 42:
+        return NO_EXIF
+
+    entries, ifd1 = _read_ifd(data, base, ifd0, endian)
+    orientation = entries.get(TAG_ORIENTATION, 1)
+    if not 1 <= orientation <= 8:
+        orientation = 1
+
+    preview, _ = _read_ifd(data, base, ifd1, endian)
+    offset = preview.get(TAG_PREVIEW_OFFSET, 0)
+    length = preview.get(TAG_PREVIEW_LENGTH, 0)
+    if offset <= 0 or length <= 0:
+        return ExifInfo(orientation)
+    return ExifInfo(orientation, base + offset, length)
+
+
+def parse_exif(data: bytes) -> ExifInfo:
+    """
+    EXIF a partir del principio de un archivo JPEG o TIFF
+
+    Recorre los marcadores JPEG hasta el segmento APP1 "Exif" sin
+    decodificar nada; lo que no se entienda se trata como "sin EXIF".
+    """
+    if data[:4] in (b"II*\0", b"MM\0*"):
+        return _parse_tiff(data, 0)
+    if data[:2] != b"\xff\xd8":
+        return NO_EXIF
+
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return NO_EXIF
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Relleno entre marcadores
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # Fin de imagen / inicio de datos: no hay más cabeceras
+            return NO_EXIF
+        (length,) = struct.unpack_from(">H", data, pos + 2)
+        if marker == 0xE1 and data[pos + 4:pos + 10] == b"Exif\0\0":
+            return _parse_tiff(data, pos + 10)
+        pos += 2 + length
+    return NO_EXIF
+
+
+def read_exif(path: str) -> ExifInfo:
+    """Leer el EXIF de `path` con una sola lectura de EXIF_HEADER_BYTES"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(EXIF_HEADER_BYTES)
+    except OSError:
+        return NO_EXIF
+    try:
+        return parse_exif(data)
+    except struct.error:
+        return NO_EXIF
+
+
+def read_preview(path: str, info: ExifInfo) -> Optional[bytes]:
+    """JPEG embebido descrito por `info`, o None si no es válido"""
+    if not info.has_preview:
+        return None
+    try:
+        with open(path, "rb") as f:
+            f.seek(info.preview_offset)
+            data = f.read(info.preview_length)
+    except OSError:
+        return None
+    if len(data) != info.preview_length or not data.startswith(b"\xff\xd8"):
+        return None
+    return data
+
+
+def cached_exif(index, path: str) -> ExifInfo:
+    """
+    EXIF de `path` a través de la caché del índice
+
+    Args:
+        index: MediaIndex (o None para leer siempre del archivo)
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return NO_EXIF
+    info = index.get_exif_info(path, st.st_size, st.st_mtime_ns) if index is not None else None
+    if info is None:
+        info = read_exif(path)
+        if index is not None:
+            index.store_exif_info([(path, st.st_size, st.st_mtime_ns, info)])
+    return info
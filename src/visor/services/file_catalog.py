@@ -0,0 +1,139 @@
+import os
+from typing import Iterable, Iterator, List, Set, Tuple
+
+
+# Extensiones soportadas
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif"}
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".webm", ".mov"}
+ALL_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+def canonicalize_root(directory: str) -> str:
+    """Ruta canónica de un directorio (sin symlinks, '..' ni '~')"""
+    return os.path.realpath(os.path.expanduser(directory))
+
+
+def is_within(path: str, root: str) -> bool:
+    """¿Está `path` dentro de `root` (o es el mismo)? Ambas rutas canónicas"""
+    if path == root:
+        return True
+    prefix = root if root.endswith(os.sep) else root + os.sep
+    return path.startswith(prefix)
+
+
+def iter_media_files(root: str, skip_roots: Iterable[str] = ()) -> Iterator[str]:
+    """
+    Recorrer `root` de forma recursiva emitiendo archivos multimedia
+
+    Los subárboles en `skip_roots` (ya indexados) no se recorren.
+    No sigue symlinks de directorios para evitar ciclos y duplicados.
+    """
+    skip = {canonicalize_root(d) for d in skip_roots}
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Podar subárboles ya indexados (modifica dirnames in-place)
+        if skip:
+            dirnames[:] = [
+                d for d in dirnames
+                if os.path.join(dirpath, d) not in skip
+            ]
+
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in ALL_EXTENSIONS:
+                yield os.path.join(dirpath, name)
+
+
+class FileCatalog:
+    """
+    Catálogo de archivos multimedia
+
+    - Raíces canónicas (realpath) sin solapamientos
+    - Entradas únicas mediante un set en cada inserción
+    """
+
+    def __init__(self):
+        self.roots: List[str] = []
+        self.files: List[str] = []
+        self._file_set: Set[str] = set()
+
+    # ========================================
+    # Raíces
+    # ========================================
+
+    def plan_roots(self, directories: Iterable[str]) -> List[Tuple[str, List[str]]]:
+        """
+        Registrar nuevas raíces y devolver qué hay que escanear
+
+        Returns:
+            Lista de (raíz, subárboles a omitir). Las raíces ya cubiertas
+            por otra existente se descartan; si una raíz nueva contiene a
+            otras ya indexadas, éstas se omiten en el escaneo y se
+            sustituyen por la nueva en `roots`.
+        """
+        jobs = []
+
+        for directory in directories:
+            root = canonicalize_root(directory)
+            if not os.path.isdir(root):
+                continue
+
+            # Ya cubierta por una raíz existente (o repetida)
+            if any(is_within(root, existing) for existing in self.roots):
+                continue
+
+            # La nueva raíz contiene raíces ya indexadas
+            nested = [r for r in self.roots if is_within(r, root)]
+            if nested:
+                self.roots = [r for r in self.roots if r not in nested]
+
+            self.roots.append(root)
+            jobs.append((root, nested))
+
+        return jobs
+
+    # ========================================
+    # Archivos
+    # ========================================
+
+    def add_file(self, file_path: str) -> bool:
+        """Añadir archivo; devuelve False si ya estaba en el catálogo"""
+        if file_path in self._file_set:
+            return False
+        self._file_set.add(file_path)
+        self.files.append(file_path)
+        return True
+
+    def add_files(self, file_paths: Iterable[str]) -> List[str]:
+        """Añadir varios archivos; devuelve solo los nuevos"""
+        added = []
+        for file_path in file_paths:
+            if self.add_file(file_path):
+                added.append(file_path)
+        return added
+
+    def remove_files(self, file_paths: Iterable[str]) -> List[str]:
+        """Quitar archivos; devuelve los que estaban en el catálogo"""
+        removed = [p for p in dict.fromkeys(file_paths) if p in self._file_set]
+        if removed:
+            self._file_set.difference_update(removed)
+            # In-place: quien tenga referencia a la lista la ve actualizada
+            self.files[:] = [p for p in self.files if p in self._file_set]
+        return removed
+
+    def restore(self, roots: Iterable[str], files: Iterable[str]):
+        """Sustituir el contenido por una instantánea guardada"""
+        self.roots = list(roots)
+        self.files[:] = dict.fromkeys(files)
+        self._file_set = set(self.files)
+
+    def clear(self):
+        """Vaciar catálogo y raíces"""
+        self.roots.clear()
+        self.files.clear()
+        self._file_set.clear()
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._file_set
+
+    def __len__(self) -> int:
+        return len(self.files)
@@ -0,0 +1,431 @@
+import os
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .file_catalog import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS, is_within
+
+
+MEDIA_IMAGE = 'image'
+MEDIA_VIDEO = 'video'
+MEDIA_TYPES = (MEDIA_IMAGE, MEDIA_VIDEO)
+
+
+class FileFilter(NamedTuple):
+    """Criterios de filtrado de la navegación; se combinan con AND (None = sin restricción)"""
+    directory: Optional[str] = None  # Carpeta canónica, subcarpetas incluidas
+    media_type: Optional[str] = None  # 'image' o 'video'
+    votes: Optional[Tuple[int, ...]] = None  # Votos admitidos, p. ej. (1,) = solo positivos
+    mtime_from: Optional[float] = None  # Fecha de modificación (epoch), incluida
+    mtime_to: Optional[float] = None  # Fecha de modificación (epoch), excluida
+
+    @property
+    def is_empty(self) -> bool:
+        return self == NO_FILTER
+
+    @property
+    def uses_dates(self) -> bool:
+        return self.mtime_from is not None or self.mtime_to is not None
+
+
+NO_FILTER = FileFilter()
+
+
+def year_range(year: int) -> Tuple[float, float]:
+    """(inicio, fin) del año en hora local, para mtime_from / mtime_to"""
+    start = time.mktime((year, 1, 1, 0, 0, 0, 0, 0, -1))
+    end = time.mktime((year + 1, 1, 1, 0, 0, 0, 0, 0, -1))
+    return start, end
+
+
+def media_type_of(path: str) -> Optional[str]:
+    """'image', 'video' o None según la extensión"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return MEDIA_IMAGE
+    if ext in VIDEO_EXTENSIONS:
+        return MEDIA_VIDEO
+    return None
+
+
+# ========================================
+# Bitsets
+# ========================================
+
+# Posiciones de los bits a 1 de cada byte
+_BYTE_ROWS = [tuple(b for b in range(8) if value >> b & 1) for value in range(256)]
+
+
+def bit_rows(bits: int) -> List[int]:
+    """Posiciones de los bits a 1 de un entero, en orden creciente"""
+    if bits <= 0:
+        return []
+    length = (bits.bit_length() + 63) // 64 * 8
+    data = bits.to_bytes(length, 'little')
+    rows = []
+    # Saltar palabras de 64 bits vacías; solo se miran los bytes de las demás
+    for word_index, word in enumerate(memoryview(data).cast('Q')):
+        if not word:
+            continue
+        start = word_index * 8
+        for offset in range(start, start + 8):
+            byte = data[offset]
+            if byte:
+                base = offset << 3
+                rows.extend([base + b for b in _BYTE_ROWS[byte]])
+    return rows
+
+
+class BitArray:
+    """
+    Bitset mutable sobre un bytearray
+
+    Cambiar un bit es O(1); el entero equivalente (para AND/OR de
+    millones de bits en una sola operación) se cachea hasta el
+    siguiente cambio.
+    """
+
+    __slots__ = ('_data', '_int')
+
+    def __init__(self, data: Optional[bytearray] = None):
+        self._data = data if data is not None else bytearray()
+        self._int: Optional[int] = None
+
+    @classmethod
+    def from_int(cls, bits: int) -> 'BitArray':
+        bitset = cls(bytearray(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')))
+        bitset._int = bits
+        return bitset
+
+    def set(self, row: int, value: bool = True):
+        byte = row >> 3
+        data = self._data
+        if byte >= len(data):
+            if not value:
+                return
+            # Crecimiento geométrico: añadir filas de una en una es O(1) amortizado
+            data.extend(bytes(max(byte + 1 - len(data), len(data))))
+        if value:
+            data[byte] |= 1 << (row & 7)
+        else:
+            data[byte] &= ~(1 << (row & 7)) & 0xFF
+        self._int = None
+
+    def set_many(self, rows: List[int]):
+        """Poner a 1 varias filas (crece una sola vez)"""
+        if not rows:
+            return
+        data = self._data
+        needed = (max(rows) >> 3) + 1
+        if needed > len(data):
+            data.extend(bytes(max(needed - len(data), len(data))))
+        for row in rows:
+            data[row >> 3] |= 1 << (row & 7)
+        self._int = None
+
+    def clear(self):
+        self._data = bytearray()
+        self._int = 0
+
+    def __contains__(self, row: int) -> bool:
+        byte = row >> 3
+        return byte < len(self._data) and bool(self._data[byte] >> (row & 7) & 1)
+
+    def to_int(self) -> int:
+        if self._int is None:
+            self._int = int.from_bytes(self._data, 'little')
+        return self._int
+
+    def count(self) -> int:
+        return self.to_int().bit_count()
+
+
+# ========================================
+# Índice
+# ========================================
+
+class _DirNode:
+    """Carpeta del árbol de prefijos: subcarpetas y tramos de filas de sus archivos"""
+
+    __slots__ = ('children', 'runs')
+
+    def __init__(self):
+        self.children: List['_DirNode'] = []
+        self.runs: List[List[int]] = []  # [inicio, fin) de filas consecutivas
+
+
+class FilterIndex:
+    """
+    Índices precalculados para filtrar la navegación
+
+    Cada archivo es una fila (su posición en la lista de navegación) y
+    cada criterio se resuelve a un bitset sobre las filas:
+    - Carpeta: árbol de prefijos cuyos nodos guardan tramos [inicio, fin)
+      de filas consecutivas. El escaneo emite cada carpeta de seguido,
+      así que un subárbol suele ser uno o pocos tramos.
+    - Tipo de medio, voto y mes de modificación: un bitset por valor.
+
+    Resolver un filtro es intersecar unos pocos enteros grandes, sin
+    recorrer los archivos: milisegundos con un millón de filas.
+    """
+
+    def __init__(self):
+        self._paths: List[str] = []
+        self._dirs: Dict[str, _DirNode] = {}
+        self._types = {media_type: BitArray() for media_type in MEDIA_TYPES}
+        self._votes = {1: BitArray(), -1: BitArray()}
+        self._months: Dict[int, BitArray] = {}
+        self._mtimes = array('d')  # NaN = fecha desconocida
+        self._month_cache: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    # ========================================
+    # Construcción
+    # ========================================
+
+    def extend(
+        self,
+        paths: Iterable[str],
+        votes: Optional[Dict[str, int]] = None,
+        mtimes: Optional[Dict[str, float]] = None
+    ) -> range:
+        """
+        Añadir archivos como filas siguientes
+
+        Args:
+            paths: Rutas, en el orden de la navegación
+            votes: {ruta: voto} (los ausentes son neutrales)
+            mtimes: {ruta: fecha de modificación} conocidas
+
+        Returns:
+            Filas asignadas
+        """
+        start = len(self._paths)
+        self._paths.extend(paths)
+        end = len(self._paths)
+
+        image_ext, video_ext = IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+        sep = os.sep
+        images, videos, positive, negative, dated = [], [], [], [], []
+        get_vote = votes.get if votes else None
+        get_mtime = mtimes.get if mtimes else None
+
+        # Archivos de la misma carpeta llegan seguidos: un nodo por tramo
+        last_dir, runs = None, None
+        for row in range(start, end):
+            path = self._paths[row]
+            # rpartition en vez de os.path.dirname/splitext: la mitad de coste
+            directory, _, name = path.rpartition(sep)
+            directory = directory or sep
+            if directory != last_dir:
+                last_dir = directory
+                runs = self._dir_node(directory).runs
+            if runs and runs[-1][1] == row:
+                runs[-1][1] = row + 1
+            else:
+                runs.append([row, row + 1])
+
+            ext = '.' + name.rpartition('.')[2].lower()
+            if ext in image_ext:
+                images.append(row)
+            elif ext in video_ext:
+                videos.append(row)
+
+            if get_vote is not None:
+                vote = get_vote(path, 0)
+                if vote == 1:
+                    positive.append(row)
+                elif vote == -1:
+                    negative.append(row)
+            if get_mtime is not None:
+                mtime = get_mtime(path)
+                if mtime is not None:
+                    dated.append((row, mtime))
+
+        self._types[MEDIA_IMAGE].set_many(images)
+        self._types[MEDIA_VIDEO].set_many(videos)
+        self._votes[1].set_many(positive)
+        self._votes[-1].set_many(negative)
+        self._mtimes.extend(array('d', [float('nan')]) * (end - start))
+        self.set_mtimes(dated)
+        return range(start, end)
+
+    def _dir_node(self, directory: str) -> _DirNode:
+        """Nodo de una carpeta, creando los que falten hasta la raíz"""
+        node = self._dirs.get(directory)
+        if node is not None:
+            return node
+
+        node = self._dirs[directory] = _DirNode()
+        child, parent = node, os.path.dirname(directory)
+        while parent != directory:
+            existing = self._dirs.get(parent)
+            if existing is not None:
+                existing.children.append(child)
+                break
+            created = self._dirs[parent] = _DirNode()
+            created.children.append(child)
+            child, directory, parent = created, parent, os.path.dirname(parent)
+        return node
+
+    def set_vote(self, row: int, vote: int):
+        self._votes[1].set(row, vote == 1)
+        self._votes[-1].set(row, vote == -1)
+
+    def reset_votes(self, row_votes: Iterable[Tuple[int, int]]):
+        """Sustituir todos los votos: (fila, voto)"""
+        for bitset in self._votes.values():
+            bitset.clear()
+        for row, vote in row_votes:
+            if vote in self._votes:
+                self._votes[vote].set(row)
+
+    def set_mtime(self, row: int, mtime: float):
+        self.set_mtimes(((row, mtime),))
+
+    def set_mtimes(self, row_mtimes: Iterable[Tuple[int, float]]):
+        """Registrar fechas de modificación: (fila, mtime)"""
+        mtimes, month_key = self._mtimes, self._month_key
+        moved: Dict[int, List[int]] = {}
+        for row, mtime in row_mtimes:
+            old = mtimes[row]
+            if old == mtime:
+                continue
+            if old == old:  # No es NaN: sacar del mes anterior
+                self._months[month_key(old)].set(row, False)
+            mtimes[row] = mtime
+            moved.setdefault(month_key(mtime), []).append(row)
+        for key, rows in moved.items():
+            self._months.setdefault(key, BitArray()).set_many(rows)
+
+    def _month_key(self, mtime: float) -> int:
+        # Cache por cuarto de hora: todas las zonas horarias son múltiplos
+        # de 15 min, así que el mes local no cambia dentro de uno
+        slot = int(mtime // 900)
+        key = self._month_cache.get(slot)
+        if key is None:
+            local = time.localtime(mtime)
+            key = self._month_cache[slot] = local.tm_year * 12 + local.tm_mon - 1
+        return key
+
+    @staticmethod
+    def _is_month_start(mtime: float) -> bool:
+        local = time.localtime(mtime)
+        return (mtime == int(mtime) and local.tm_mday == 1
+                and local.tm_hour == local.tm_min == local.tm_sec == 0)
+
+    # ========================================
+    # Consultas
+    # ========================================
+
+    def all_bits(self) -> int:
+        return (1 << len(self._paths)) - 1
+
+    def directory_bits(self, directory: str) -> int:
+        """Archivos de la carpeta y sus subcarpetas"""
+        node = self._dirs.get(os.path.normpath(directory))
+        if node is None:
+            return 0
+
+        runs = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            runs.extend(node.runs)
+            stack.extend(node.children)
+        runs.sort()
+
+        bits = 0
+        start, end = None, None
+        for run_start, run_end in runs:
+            if start is not None and run_start <= end:
+                end = max(end, run_end)
+                continue
+            if start is not None:
+                bits |= (1 << end) - (1 << start)
+            start, end = run_start, run_end
+        if start is not None:
+            bits |= (1 << end) - (1 << start)
+        return bits
+
+    def media_type_bits(self, media_type: str) -> int:
+        if media_type not in self._types:
+            raise ValueError(f"Tipo de medio desconocido: {media_type}")
+        return self._types[media_type].to_int()
+
+    def vote_bits(self, votes: Iterable[int]) -> int:
+        positive = self._votes[1].to_int()
+        negative = self._votes[-1].to_int()
+        bits = 0
+        for vote in set(votes):
+            if vote == 1:
+                bits |= positive
+            elif vote == -1:
+                bits |= negative
+            else:
+                bits |= self.all_bits() & ~(positive | negative)
+        return bits
+
+    def mtime_bits(self, mtime_from: Optional[float], mtime_to: Optional[float]) -> int:
+        """Archivos modificados en [mtime_from, mtime_to); sin fecha conocida no entran"""
+        first = self._month_key(mtime_from) if mtime_from is not None else None
+        last = self._month_key(mtime_to) if mtime_to is not None else None
+
+        bits = 0
+        for key, bitset in self._months.items():
+            if (first is None or key >= first) and (last is None or key <= last):
+                bits |= bitset.to_int()
+
+        # Meses del borde: se comprueba la fecha exacta de cada archivo,
+        # salvo que el límite caiga justo al inicio del mes
+        outside = BitArray()
+        mtimes = self._mtimes
+        if (mtime_from is not None and first in self._months
+                and not self._is_month_start(mtime_from)):
+            for row in bit_rows(self._months[first].to_int()):
+                if mtimes[row] < mtime_from:
+                    outside.set(row)
+        if mtime_to is not None and last in self._months:
+            if self._is_month_start(mtime_to):
+                outside = BitArray.from_int(outside.to_int() | self._months[last].to_int())
+            else:
+                for row in bit_rows(self._months[last].to_int()):
+                    if mtimes[row] >= mtime_to:
+                        outside.set(row)
+        return bits & ~outside.to_int()
+
+    def resolve(self, file_filter: FileFilter) -> int:
+        """Bitset de las filas que cumplen el filtro"""
+        bits = self.all_bits()
+        if file_filter.directory is not None:
+            bits &= self.directory_bits(file_filter.directory)
+        if file_filter.media_type is not None:
+            bits &= self.media_type_bits(file_filter.media_type)
+        if file_filter.votes is not None:
+            bits &= self.vote_bits(file_filter.votes)
+        if file_filter.uses_dates:
+            bits &= self.mtime_bits(file_filter.mtime_from, file_filter.mtime_to)
+        return bits
+
+    def matches(self, row: int, file_filter: FileFilter) -> bool:
+        """¿Cumple una fila el filtro? (sin resolver los bitsets completos)"""
+        if file_filter.directory is not None and not is_within(
+                self._paths[row], os.path.normpath(file_filter.directory)):
+            return False
+        if file_filter.media_type is not None and row not in self._types[file_filter.media_type]:
+            return False
+        if file_filter.votes is not None:
+            vote = 1 if row in self._votes[1] else -1 if row in self._votes[-1] else 0
+            if vote not in file_filter.votes:
+                return False
+        if file_filter.uses_dates:
+            mtime = self._mtimes[row]
+            if mtime != mtime:  # Fecha desconocida
+                return False
+            if file_filter.mtime_from is not None and mtime < file_filter.mtime_from:
+                return False
+            if file_filter.mtime_to is not None and mtime >= file_filter.mtime_to:
+                return False
+        return True
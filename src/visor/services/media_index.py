@@ -0,0 +1,264 @@
+import time
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .exif import ExifInfo
+
+
+DEFAULT_INDEX_PATH = Path.home() / ".visor_multimedia_index.db"
+
+
+class MediaIndex:
+    """
+    Índice persistente de la biblioteca (SQLite)
+
+    Guarda por archivo tamaño y mtime para validar los datos cacheados:
+    si el archivo cambia en disco, sus entradas dejan de ser válidas.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS content_hashes (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            partial_hash TEXT,
+            full_hash TEXT,
+            dhash INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS library_snapshot (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            roots BLOB NOT NULL,
+            files BLOB NOT NULL,
+            file_count INTEGER NOT NULL,
+            saved_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS search_index (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            data BLOB NOT NULL,  -- SearchIndex.dumps(), con sus propias rutas
+            saved_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS media_metadata (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            width INTEGER,
+            height INTEGER,
+            format TEXT,
+            thumb_side INTEGER NOT NULL  -- Lado de la miniatura generada; 0 = no decodificable
+        );
+        CREATE TABLE IF NOT EXISTS exif_info (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            orientation INTEGER NOT NULL,
+            preview_offset INTEGER NOT NULL,
+            preview_length INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: Ruta de la base de datos (por defecto en el home)
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_INDEX_PATH
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    # ========================================
+    # Hashes de contenido
+    # ========================================
+
+    def get_content_hashes(self, stats: Dict[str, Tuple[int, int]]) -> Dict[str, Dict]:
+        """
+        Obtener hashes cacheados que siguen siendo válidos
+
+        Args:
+            stats: {path: (size, mtime_ns)} actuales
+        """
+        result = {}
+        cursor = self._conn.execute(
+            "SELECT path, size, mtime_ns, partial_hash, full_hash, dhash "
+            "FROM content_hashes"
+        )
+        for path, size, mtime_ns, partial_hash, full_hash, dhash in cursor:
+            current = stats.get(path)
+            if current is None or current != (size, mtime_ns):
+                continue
+            result[path] = {
+                'partial_hash': partial_hash,
+                'full_hash': full_hash,
+                'dhash': dhash,
+            }
+        return result
+
+    def store_content_hashes(self, rows: Iterable[Tuple[str, int, int, Dict]]):
+        """
+        Guardar hashes calculados
+
+        Args:
+            rows: (path, size, mtime_ns, {'partial_hash', 'full_hash', 'dhash'})
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO content_hashes "
+                "(path, size, mtime_ns, partial_hash, full_hash, dhash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (path, size, mtime_ns,
+                     h.get('partial_hash'), h.get('full_hash'), h.get('dhash'))
+                    for path, size, mtime_ns, h in rows
+                )
+            )
+
+    # ========================================
+    # Metadatos y progreso de miniaturas
+    # ========================================
+
+    def get_thumbnail_states(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Estado de las miniaturas ya procesadas
+
+        Returns:
+            {path: (size, mtime_ns, thumb_side)}; thumb_side 0 = falló
+        """
+        cursor = self._conn.execute(
+            "SELECT path, size, mtime_ns, thumb_side FROM media_metadata"
+        )
+        return {path: (size, mtime_ns, side) for path, size, mtime_ns, side in cursor}
+
+    def get_media_metadata(self, path: str) -> Optional[Dict]:
+        """Metadatos de un archivo (sin validar contra el disco)"""
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, width, height, format, thumb_side "
+            "FROM media_metadata WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('size', 'mtime_ns', 'width', 'height', 'format', 'thumb_side')
+        return dict(zip(keys, row))
+
+    def store_media_metadata(self, rows: Iterable[Tuple[str, int, int, Dict]]):
+        """
+        Guardar metadatos (y con ellos el progreso de las miniaturas)
+
+        Args:
+            rows: (path, size, mtime_ns, {'width', 'height', 'format', 'thumb_side'})
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO media_metadata "
+                "(path, size, mtime_ns, width, height, format, thumb_side) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (path, size, mtime_ns, m.get('width'), m.get('height'),
+                     m.get('format'), m.get('thumb_side', 0))
+                    for path, size, mtime_ns, m in rows
+                )
+            )
+
+    # ========================================
+    # EXIF (orientación y preview embebido)
+    # ========================================
+
+    def get_exif_info(self, path: str, size: int, mtime_ns: int) -> Optional[ExifInfo]:
+        """ExifInfo cacheado si sigue siendo válido para (size, mtime_ns), o None"""
+        row = self._conn.execute(
+            "SELECT orientation, preview_offset, preview_length FROM exif_info "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?", (path, size, mtime_ns)
+        ).fetchone()
+        return ExifInfo(*row) if row is not None else None
+
+    def store_exif_info(self, rows: Iterable[Tuple[str, int, int, ExifInfo]]):
+        """
+        Guardar EXIF ya analizado
+
+        Args:
+            rows: (path, size, mtime_ns, ExifInfo)
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO exif_info "
+                "(path, size, mtime_ns, orientation, preview_offset, preview_length) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((path, size, mtime_ns, *info) for path, size, mtime_ns, info in rows)
+            )
+
+    # ========================================
+    # Instantánea de la biblioteca
+    # ========================================
+
+    # Separador: NUL es el único byte que no puede aparecer en una ruta
+    _SEP = "\0"
+
+    @classmethod
+    def _pack_paths(cls, paths: Iterable[str]) -> bytes:
+        return cls._SEP.join(paths).encode('utf-8', 'surrogateescape')
+
+    @classmethod
+    def _unpack_paths(cls, blob: bytes) -> List[str]:
+        if not blob:
+            return []
+        return bytes(blob).decode('utf-8', 'surrogateescape').split(cls._SEP)
+
+    def save_library_snapshot(
+        self,
+        roots: List[str],
+        files: List[str],
+        search_index: Optional[bytes] = None
+    ):
+        """
+        Guardar raíces y archivos de la biblioteca
+
+        Se guarda como un único BLOB: cargar 500k rutas es una lectura y
+        un split, no 500k filas. El índice de búsqueda (SearchIndex.dumps())
+        se guarda en la misma transacción; None = conservar el anterior.
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO library_snapshot "
+                "(id, roots, files, file_count, saved_at) VALUES (0, ?, ?, ?, ?)",
+                (self._pack_paths(roots), self._pack_paths(files), len(files), time.time())
+            )
+            if search_index is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_index (id, data, saved_at) VALUES (0, ?, ?)",
+                    (search_index, time.time())
+                )
+
+    def load_library_snapshot(self) -> Optional[Tuple[List[str], List[str]]]:
+        """Cargar (raíces, archivos) de la última sesión; None si no hay"""
+        row = self._conn.execute(
+            "SELECT roots, files FROM library_snapshot WHERE id = 0"
+        ).fetchone()
+        if row is None:
+            return None
+        return self._unpack_paths(row[0]), self._unpack_paths(row[1])
+
+    def load_search_index(self) -> Optional[bytes]:
+        """Índice de búsqueda guardado con la biblioteca (SearchIndex.loads())"""
+        row = self._conn.execute("SELECT data FROM search_index WHERE id = 0").fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def clear_library_snapshot(self):
+        """Olvidar la biblioteca guardada"""
+        with self._conn:
+            self._conn.execute("DELETE FROM library_snapshot")
+            self._conn.execute("DELETE FROM search_index")
+
+    # ========================================
+    # Gestión
+    # ========================================
+
+    def close(self):
+        """Cerrar conexión"""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
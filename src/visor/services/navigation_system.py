@@ -1,7 +1,14 @@
+import os
 import random
+import marshal
 from typing import List, Optional, Dict
 from collections import deque
 
+from .weighted_sampler import FenwickTree
+from .filter_index import FilterIndex, FileFilter, BitArray, NO_FILTER, bit_rows
+from .permutation import FeistelPermutation
+from .profiler import traced
+
 
 class NavigationSystem:
     """
@@ -9,15 +16,26 @@ class NavigationSystem:
     
     Votos: +1 (positivo), 0 (neutral), -1 (negativo)
     Cooldowns: Configuración global por categoría de voto
+    Modos de selección:
+        uniform: todos los archivos elegibles con la misma probabilidad
+        weighted: probabilidad proporcional al peso (categoría × archivo × decaimiento)
+        shuffle: bolsa aleatoria, todo el catálogo sale una vez antes de repetir
+    Filtro: restringe los tres modos a una carpeta, tipo, voto o fecha
     """
     
+    MODE_UNIFORM = 'uniform'
+    MODE_WEIGHTED = 'weighted'
+    MODE_SHUFFLE = 'shuffle'
+    SELECTION_MODES = (MODE_UNIFORM, MODE_WEIGHTED, MODE_SHUFFLE)
+    
     def __init__(
         self, 
         file_list: List[str],
         positive_cooldown: int = 5,   # Cooldown para archivos con voto positivo
         neutral_cooldown: int = 20,   # Cooldown para archivos sin voto
         negative_cooldown: int = 0,   # Cooldown para archivos con voto negativo (0 = bloqueados)
-        max_history: int = 1000
+        max_history: int = 1000,
+        seed: Optional[int] = None
     ):
         """
         Args:
@@ -26,10 +44,20 @@ class NavigationSystem:
             neutral_cooldown: Archivos antes de repetir los sin voto
             negative_cooldown: Archivos antes de repetir los negativos (0 = nunca)
             max_history: Máximo de archivos en historial
+            seed: Semilla del generador aleatorio (None = aleatoria)
         """
-        self.all_files = file_list.copy()
+        # dict.fromkeys: copia sin duplicados preservando el orden
+        self.all_files = list(dict.fromkeys(file_list))
+        self._file_index: Dict[str, int] = {f: i for i, f in enumerate(self.all_files)}
         self.max_history = max_history
         
+        # Filtro (carpeta, tipo, voto, fecha): índice de bitsets por fila
+        self.file_filter = NO_FILTER
+        self.file_mtimes: Dict[str, float] = {}  # Fechas conocidas, para filtrar por fecha
+        self._filter_index: Optional[FilterIndex] = None  # Se construye con el primer filtro
+        self._filter_member: Optional[BitArray] = None  # Filas que lo cumplen (None = todas)
+        self._filter_files: Optional[List[str]] = None  # Candidatos del filtro (cache)
+        
         # Configuración de cooldowns por categoría
         self.positive_cooldown = positive_cooldown
         self.neutral_cooldown = neutral_cooldown
@@ -42,28 +70,67 @@ class NavigationSystem:
         # Historial de navegación
         self.history: List[str] = []
         self.history_position = -1
+        self._skipped: Optional[str] = None  # Elegido al saltar, aún sin mostrar
         
         # Caches de archivos recientes por categoría
         self.recent_positive = deque(maxlen=positive_cooldown)
         self.recent_neutral = deque(maxlen=neutral_cooldown)
         self.recent_negative = deque(maxlen=negative_cooldown if negative_cooldown > 0 else 1)
+        
+        # Duplicados: {file_path: representante del grupo}
+        # Solo el representante es candidato en la selección aleatoria
+        self.duplicate_of: Dict[str, str] = {}
+        
+        # Selección ponderada
+        self.selection_mode = self.MODE_UNIFORM
+        self.category_weights: Dict[int, float] = {1: 3.0, 0: 1.0, -1: 1.0}
+        self.file_weights: Dict[str, float] = {}  # Multiplicadores por archivo
+        self.decay_steps = 0  # Pasos hasta recuperar el peso completo (0 = sin decaimiento)
+        self._sampler: Optional[FenwickTree] = None  # Se construye bajo demanda
+        self._sampler_files: List[str] = []  # Archivo de cada posición del árbol
+        self._sampler_index: Dict[str, int] = {}
+        self._step = 0  # Selecciones aleatorias realizadas
+        self._last_shown: Dict[str, int] = {}  # Paso en que se mostró (ventana de decaimiento)
+        
+        # Bolsa aleatoria (modo shuffle): permutación perezosa del catálogo
+        self._bag: Optional[FeistelPermutation] = None
+        self._bag_files: List[str] = []  # Catálogo al empezar la ronda
+        self._bag_key = 0
+        self._bag_cursor = 0
+        self._bag_extra: List[str] = []  # Añadidos durante la ronda
+        self._bag_deferred: deque = deque()  # En cooldown cuando les tocó
+        
+        # Generador aleatorio propio: sesiones reproducibles con la misma semilla
+        self.reseed(seed)
     
     # ========================================
     # Votos
     # ========================================
     
+    @property
+    def votes(self) -> Dict[str, int]:
+        return self._votes
+    
+    @votes.setter
+    def votes(self, votes: Dict[str, int]):
+        self._votes = votes
+        self._sync_filter_votes()
+    
     def vote_positive(self, file_path: str):
         """Votar positivo (👍)"""
         self.votes[file_path] = 1
+        self._vote_changed(file_path)
     
     def vote_negative(self, file_path: str):
         """Votar negativo (👎)"""
         self.votes[file_path] = -1
+        self._vote_changed(file_path)
     
     def clear_vote(self, file_path: str):
         """Quitar voto (vuelve a neutral ⚪)"""
         if file_path in self.votes:
             del self.votes[file_path]
+            self._vote_changed(file_path)
     
     def get_vote(self, file_path: str) -> int:
         """Obtener voto: 1, 0, o -1"""
@@ -81,6 +148,7 @@ class NavigationSystem:
             self.clear_vote(file_path)  # Si ya tiene ese voto, quitarlo
         else:
             self.votes[file_path] = vote_type
+            self._vote_changed(file_path)
     
     def get_vote_symbol(self, file_path: str) -> str:
         """Obtener símbolo del voto"""
@@ -91,15 +159,87 @@ class NavigationSystem:
     # Configuración de Cooldowns
     # ========================================
     
+    def apply_config(
+        self,
+        positive_cooldown: Optional[int] = None,
+        neutral_cooldown: Optional[int] = None,
+        negative_cooldown: Optional[int] = None,
+        max_history: Optional[int] = None,
+        selection_mode: Optional[str] = None,
+        positive_weight: Optional[float] = None,
+        neutral_weight: Optional[float] = None,
+        negative_weight: Optional[float] = None,
+        decay_steps: Optional[int] = None
+    ) -> bool:
+        """
+        Aplicar varios cambios de configuración como una sola transacción
+        
+        Se valida todo antes de modificar nada; solo se reconstruyen los
+        deques cuyo tamaño cambia y los índices se recalculan una única vez.
+        None = dejar ese valor como está.
+        
+        Returns:
+            True si algo cambió
+        """
+        if selection_mode is not None and selection_mode not in self.SELECTION_MODES:
+            raise ValueError(f"Modo de selección desconocido: {selection_mode}")
+        
+        changed = False
+        invalidate = False
+        
+        if positive_cooldown is not None and max(0, positive_cooldown) != self.positive_cooldown:
+            self.positive_cooldown = max(0, positive_cooldown)
+            self.recent_positive = self._resize_deque(self.recent_positive, self.positive_cooldown)
+            changed = invalidate = True
+        
+        if neutral_cooldown is not None and max(0, neutral_cooldown) != self.neutral_cooldown:
+            self.neutral_cooldown = max(0, neutral_cooldown)
+            self.recent_neutral = self._resize_deque(self.recent_neutral, self.neutral_cooldown)
+            changed = invalidate = True
+        
+        if negative_cooldown is not None and max(0, negative_cooldown) != self.negative_cooldown:
+            # 0 = bloqueados permanentemente; el deque mantiene al menos 1
+            self.negative_cooldown = max(0, negative_cooldown)
+            maxlen = self.negative_cooldown if self.negative_cooldown > 0 else 1
+            self.recent_negative = self._resize_deque(self.recent_negative, maxlen)
+            changed = invalidate = True
+        
+        if max_history is not None and max(100, max_history) != self.max_history:
+            self.max_history = max(100, max_history)  # Mínimo 100
+            
+            # Si el historial actual excede el nuevo límite, truncar
+            if len(self.history) > self.max_history:
+                overflow = len(self.history) - self.max_history
+                self.history = self.history[overflow:]
+                self.history_position = max(0, self.history_position - overflow)
+            changed = True
+        
+        if selection_mode is not None and selection_mode != self.selection_mode:
+            self.selection_mode = selection_mode
+            changed = invalidate = True
+        
+        for vote, weight in ((1, positive_weight), (0, neutral_weight), (-1, negative_weight)):
+            if weight is not None and max(0.0, float(weight)) != self.category_weights[vote]:
+                self.category_weights[vote] = max(0.0, float(weight))
+                changed = invalidate = True
+        
+        if decay_steps is not None and max(0, decay_steps) != self.decay_steps:
+            self.decay_steps = max(0, decay_steps)
+            self._last_shown.clear()
+            changed = invalidate = True
+        
+        if invalidate:
+            self._invalidate_sampler()
+        
+        return changed
+    
     def set_positive_cooldown(self, cooldown: int):
         """Configurar cooldown para positivos"""
-        self.positive_cooldown = max(0, cooldown)
-        self._resize_deque(self.recent_positive, self.positive_cooldown)
+        self.apply_config(positive_cooldown=cooldown)
     
     def set_neutral_cooldown(self, cooldown: int):
         """Configurar cooldown para neutrales"""
-        self.neutral_cooldown = max(0, cooldown)
-        self._resize_deque(self.recent_neutral, self.neutral_cooldown)
+        self.apply_config(neutral_cooldown=cooldown)
     
     def set_negative_cooldown(self, cooldown: int):
         """
@@ -107,19 +247,11 @@ class NavigationSystem:
         0 = bloqueados permanentemente
         >0 = se repiten después de N archivos
         """
-        self.negative_cooldown = max(0, cooldown)
-        maxlen = self.negative_cooldown if self.negative_cooldown > 0 else 1
-        self._resize_deque(self.recent_negative, maxlen)
+        self.apply_config(negative_cooldown=cooldown)
 
     def set_max_history(self, max_history: int):
         """Cambiar límite máximo de historial"""
-        self.max_history = max(100, max_history)  # Mínimo 100
-        
-        # Si el historial actual excede el nuevo límite, truncar
-        if len(self.history) > self.max_history:
-            overflow = len(self.history) - self.max_history
-            self.history = self.history[overflow:]
-            self.history_position = max(0, self.history_position - overflow)
+        self.apply_config(max_history=max_history)
     
     def get_cooldown_for_file(self, file_path: str) -> int:
         """Obtener cooldown efectivo para un archivo"""
@@ -131,14 +263,202 @@ class NavigationSystem:
         else:
             return self.neutral_cooldown
     
-    def _resize_deque(self, dq: deque, new_size: int):
-        """Redimensionar deque preservando elementos"""
+    def _resize_deque(self, dq: deque, new_size: int) -> deque:
+        """Redimensionar deque preservando los elementos más recientes"""
+        # maxlen es de solo lectura: crear un deque nuevo
         if new_size <= 0:
             new_size = 1
-        items = list(dq)
-        dq.clear()
-        dq.maxlen = new_size
-        dq.extend(items[-new_size:] if len(items) > new_size else items)
+        return deque(dq, maxlen=new_size)
+    
+    # ========================================
+    # Selección ponderada
+    # ========================================
+    
+    def set_selection_mode(self, mode: str):
+        """Cambiar modo de selección ('uniform', 'weighted' o 'shuffle')"""
+        self.apply_config(selection_mode=mode)
+    
+    def set_category_weights(
+        self,
+        positive: Optional[float] = None,
+        neutral: Optional[float] = None,
+        negative: Optional[float] = None
+    ):
+        """Configurar peso por categoría de voto"""
+        self.apply_config(
+            positive_weight=positive,
+            neutral_weight=neutral,
+            negative_weight=negative
+        )
+    
+    def set_file_weight(self, file_path: str, weight: float):
+        """Multiplicador de peso para un archivo (1.0 = normal)"""
+        weight = max(0.0, float(weight))
+        if weight == 1.0:
+            self.file_weights.pop(file_path, None)
+        else:
+            self.file_weights[file_path] = weight
+        self._refresh_weight(file_path)
+    
+    def set_decay_steps(self, steps: int):
+        """
+        Configurar decaimiento por tiempo desde la última vez mostrado
+        
+        Un archivo recién mostrado recupera su peso linealmente durante
+        `steps` selecciones. 0 = sin decaimiento.
+        """
+        self.apply_config(decay_steps=steps)
+    
+    def get_weight(self, file_path: str) -> float:
+        """Peso efectivo actual de un archivo (0 = no elegible)"""
+        if not self._is_eligible(file_path):
+            return 0.0
+        
+        weight = (
+            self.category_weights.get(self.get_vote(file_path), 1.0)
+            * self.file_weights.get(file_path, 1.0)
+        )
+        
+        if self.decay_steps > 0:
+            shown = self._last_shown.get(file_path)
+            if shown is not None:
+                elapsed = self._step - shown
+                if elapsed < self.decay_steps:
+                    weight *= elapsed / self.decay_steps
+        
+        return weight
+    
+    def _get_sampler(self) -> FenwickTree:
+        """Árbol de pesos (se construye en O(N) solo cuando hace falta)"""
+        if self._sampler is None:
+            # Con filtro, el árbol cubre solo sus candidatos
+            files = self._candidate_files()
+            self._sampler_files = files
+            self._sampler_index = (
+                self._file_index if files is self.all_files
+                else {f: i for i, f in enumerate(files)}
+            )
+            self._sampler = FenwickTree([self.get_weight(f) for f in files])
+        return self._sampler
+    
+    def _invalidate_sampler(self):
+        """Descartar el árbol de pesos; se reconstruirá en el próximo sorteo"""
+        self._sampler = None
+    
+    def _refresh_weight(self, file_path: str):
+        """Actualizar el peso de un archivo en O(log N)"""
+        if self._sampler is None:
+            return
+        index = self._sampler_index.get(file_path)
+        if index is not None:
+            self._sampler.set(index, self.get_weight(file_path))
+    
+    # ========================================
+    # Filtro
+    # ========================================
+    
+    def set_filter(self, file_filter: Optional[FileFilter] = None) -> int:
+        """
+        Restringir la selección aleatoria a los archivos que cumplen el filtro
+        
+        Votos, historial y cooldowns no cambian: al quitar o cambiar el
+        filtro la navegación sigue donde estaba. El primer filtro construye
+        el índice en O(N); después cambiar de filtro es intersecar bitsets.
+        
+        Args:
+            file_filter: Criterios (None o NO_FILTER = todo el catálogo)
+        
+        Returns:
+            Número de archivos que cumplen el filtro
+        """
+        self.file_filter = file_filter or NO_FILTER
+        self._refresh_filter()
+        return self.get_filter_count()
+    
+    def get_filter_count(self) -> int:
+        """Archivos que cumplen el filtro activo"""
+        if self._filter_member is None:
+            return len(self.all_files)
+        return self._filter_member.count()
+    
+    def set_file_mtimes(self, mtimes: Dict[str, float]):
+        """Registrar fechas de modificación (para filtrar por fecha)"""
+        self.file_mtimes.update(mtimes)
+        if self._filter_index is None:
+            return
+        
+        file_index = self._file_index
+        self._filter_index.set_mtimes(
+            (file_index[path], mtime) for path, mtime in mtimes.items() if path in file_index
+        )
+        if self.file_filter.uses_dates:
+            self._refresh_filter()
+    
+    def _get_filter_index(self) -> FilterIndex:
+        """Índice de filtrado (se construye en O(N) con el primer filtro)"""
+        if self._filter_index is None:
+            self._filter_index = FilterIndex()
+            self._filter_index.extend(self.all_files, self.votes, self.file_mtimes)
+        return self._filter_index
+    
+    def _refresh_filter(self):
+        """Recalcular los candidatos del filtro y empezar ronda nueva"""
+        if self.file_filter.is_empty:
+            self._filter_member = None
+        else:
+            bits = self._get_filter_index().resolve(self.file_filter)
+            self._filter_member = BitArray.from_int(bits)
+        self._filter_files = None
+        self._invalidate_sampler()
+        self._bag = None
+    
+    def _candidate_files(self) -> List[str]:
+        """Archivos que cumplen el filtro (todo el catálogo si no hay filtro)"""
+        if self._filter_member is None:
+            return self.all_files
+        if self._filter_files is None:
+            files = self.all_files
+            if self._filter_member.count() == len(files):
+                self._filter_files = list(files)  # Lo cumplen todos
+            else:
+                self._filter_files = [files[row] for row in bit_rows(self._filter_member.to_int())]
+        return self._filter_files
+    
+    def _in_filter(self, file_path: str) -> bool:
+        if self._filter_member is None:
+            return True
+        row = self._file_index.get(file_path)
+        return row is not None and row in self._filter_member
+    
+    def _vote_changed(self, file_path: str):
+        """Propagar un voto al índice de filtrado y al árbol de pesos"""
+        index = self._filter_index
+        row = self._file_index.get(file_path)
+        if index is not None and row is not None:
+            index.set_vote(row, self.get_vote(file_path))
+            
+            # Filtro por voto: el archivo puede entrar o salir de los candidatos
+            if self._filter_member is not None and self.file_filter.votes is not None:
+                member = index.matches(row, self.file_filter)
+                if member != (row in self._filter_member):
+                    self._filter_member.set(row, member)
+                    self._filter_files = None
+                    self._invalidate_sampler()
+                    if member and self._bag is not None:
+                        self._bag_extra.append(file_path)
+        
+        self._refresh_weight(file_path)
+    
+    def _sync_filter_votes(self):
+        """Votos sustituidos o borrados en bloque: rehacer sus bitsets"""
+        if self._filter_index is None:
+            return
+        file_index = self._file_index
+        self._filter_index.reset_votes(
+            (file_index[path], vote) for path, vote in self._votes.items() if path in file_index
+        )
+        if self.file_filter.votes is not None:
+            self._refresh_filter()
     
     # ========================================
     # Navegación
@@ -160,6 +480,7 @@ class NavigationSystem:
     
     def go_back(self) -> Optional[str]:
         """Volver al archivo anterior"""
+        self._drop_skipped()
         if self.can_go_back():
             self.history_position -= 1
             return self.get_current()
@@ -172,54 +493,302 @@ class NavigationSystem:
             return self.get_current()
         return None
     
+    @traced("navigation.next_random")
     def next_random(self) -> Optional[str]:
         """Obtener siguiente archivo (historial o aleatorio)"""
+        self._drop_skipped()
         # Si hay futuro en el historial, avanzar por ahí
         if self.can_go_forward_in_history():
             return self.go_forward_in_history()
         
         # Si no hay futuro, generar aleatorio
+        next_file = self._pick()
+        if next_file is None:
+            return None
+        self._push_shown(next_file)
+        return next_file
+    
+    def _pick(self) -> Optional[str]:
+        """Elegir un archivo según el modo, sin registrarlo"""
+        if self.selection_mode == self.MODE_WEIGHTED:
+            return self._pick_weighted()
+        elif self.selection_mode == self.MODE_SHUFFLE:
+            return self._pick_shuffle()
+        return self._pick_uniform()
+    
+    def _push_shown(self, next_file: str):
+        """Añadir al final del historial y registrarlo como mostrado"""
+        # Como estamos al final del historial, añadir normalmente
+        self.history.append(next_file)
+        self.history_position = len(self.history) - 1
+        
+        # Limitar tamaño del historial
+        if len(self.history) > self.max_history:
+            overflow = len(self.history) - self.max_history
+            self.history = self.history[overflow:]
+            self.history_position -= overflow
+        
+        self._mark_shown(next_file)
+    
+    # ---------------- Saltos (tecla mantenida) ----------------
+    
+    def skip(self, direction: int) -> Optional[str]:
+        """
+        Un paso de autorrepetición: mover la navegación sin registrar nada
+        
+        Hacia atrás y por el futuro del historial solo se mueve la
+        posición. Más allá, se elige un candidato (O(1) esperado, O(log N)
+        ponderado) que no entra en el historial ni en los cooldowns: cada
+        paso nuevo lo sustituye. commit_skip() registra el que se muestre.
+        
+        Returns:
+            El archivo en el que queda la navegación, o None si no se movió
+        """
+        if direction < 0:
+            if self._skipped is not None:
+                self._drop_skipped()
+                return self.get_current()
+            return self.go_back()
+        if self._skipped is None and self.can_go_forward_in_history():
+            return self.go_forward_in_history()
+        
+        candidate = self._pick()
+        if candidate is None:
+            return None
+        self._drop_skipped()
+        self._skipped = candidate
+        return candidate
+    
+    def commit_skip(self) -> Optional[str]:
+        """Fin del salto: el elegido se muestra y entra en el historial"""
+        if self._skipped is not None:
+            skipped, self._skipped = self._skipped, None
+            self._push_shown(skipped)
+        return self.get_current()
+    
+    def _drop_skipped(self):
+        """Olvidar el elegido al saltar (en modo bolsa vuelve a la ronda)"""
+        if self._skipped is not None:
+            if self.selection_mode == self.MODE_SHUFFLE and self._bag is not None:
+                self._bag_extra.append(self._skipped)
+            self._skipped = None
+    
+    def lookahead(self, count: int) -> List[str]:
+        """
+        Decidir ya los próximos `count` archivos sin avanzar
+
+        Quedan como futuro del historial: next_random() los devolverá en
+        ese orden (y ya cuentan como mostrados para los cooldowns). Sirve
+        para decodificarlos con antelación.
+        """
+        steps = 0
+        while steps < count and self.next_random() is not None:
+            steps += 1
+        # Sin recortar a 0: con el historial vacío la posición vuelve a -1
+        # (si no, history[0] quedaría como ya visto). Restar los pasos, y no
+        # restaurar la posición guardada, sigue valiendo si se recortó el
+        # principio del historial por max_history
+        self.history_position -= steps
+        start = self.history_position + 1
+        return self.history[start:start + count]
+    
+    UNIFORM_TRIES = 32  # Intentos de muestreo por rechazo antes de recorrer el catálogo
+    
+    def _pick_uniform(self) -> Optional[str]:
+        """
+        Selección uniforme entre los archivos elegibles
+        
+        Por rechazo: un candidato al azar vale si es elegible (la
+        distribución sigue siendo uniforme entre los elegibles). Los
+        cooldowns son pocos frente al catálogo, así que casi siempre
+        basta un intento; solo si fallan todos se recorre la lista.
+        """
+        files = self._candidate_files()
+        if files:
+            for _ in range(self.UNIFORM_TRIES):
+                file_path = self.rng.choice(files)
+                if self._is_eligible(file_path):
+                    return file_path
+        
         candidates = self._get_eligible_files()
         
         if not candidates:
             # Resetear caches y reintentar
-            self.recent_positive.clear()
-            self.recent_neutral.clear()
-            self.recent_negative.clear()
+            self._clear_cooldowns()
             candidates = self._get_eligible_files()
             
             if not candidates:
                 return None
         
-        # Selección aleatoria
-        next_file = random.choice(candidates)
+        return self.rng.choice(candidates)
+    
+    def _pick_weighted(self) -> Optional[str]:
+        """Selección proporcional al peso en O(log N)"""
+        sampler = self._get_sampler()
+        total = sampler.total()
         
-        # Como estamos al final del historial, añadir normalmente
-        self.history.append(next_file)
-        self.history_position = len(self.history) - 1
+        if total <= 0:
+            # Resetear caches y reintentar
+            self._clear_cooldowns()
+            sampler = self._get_sampler()
+            total = sampler.total()
+            
+            if total <= 0:
+                return None
         
-        # Limitar tamaño del historial
-        if len(self.history) > self.max_history:
-            overflow = len(self.history) - self.max_history
-            self.history = self.history[overflow:]
-            self.history_position -= overflow
+        return self._sampler_files[sampler.find(self.rng.random() * total)]
+    
+    def _pick_shuffle(self) -> Optional[str]:
+        """Siguiente archivo de la bolsa aleatoria"""
+        next_file = self._draw_from_bag()
+        
+        if next_file is None:
+            # Ronda completa: empezar otra
+            self._start_bag_round()
+            next_file = self._draw_from_bag()
+        
+        if next_file is None:
+            # Resetear caches y reintentar
+            self._clear_cooldowns()
+            self._start_bag_round()
+            next_file = self._draw_from_bag()
+        
+        return next_file
+    
+    def _start_bag_round(self):
+        """Nueva ronda: nueva permutación del catálogo (o del filtro) en O(1)"""
+        self._bag_files = self._candidate_files()
+        self._bag_key = self.rng.getrandbits(64)
+        self._bag = FeistelPermutation(len(self._bag_files), self._bag_key)
+        self._bag_cursor = 0
+        self._bag_extra = []
+        self._bag_deferred.clear()
+    
+    def _draw_from_bag(self) -> Optional[str]:
+        """
+        Sacar el siguiente candidato de la ronda actual
+        
+        Cada archivo sale como mucho una vez por ronda. Los bloqueados se
+        descartan y los que están en cooldown se aplazan hasta que salgan
+        de él. Devuelve None cuando la ronda se agota.
+        """
+        if self._bag is None:
+            self._start_bag_round()
+        
+        # 1. Aplazados que ya salieron del cooldown
+        for _ in range(len(self._bag_deferred)):
+            file_path = self._bag_deferred.popleft()
+            if self._bag_accepts(file_path):
+                return file_path
         
-        # Añadir a cache correspondiente
-        vote = self.get_vote(next_file)
+        # 2. Recorrer la permutación, intercalando los añadidos durante la ronda
+        extra = self._bag_extra
+        while True:
+            remaining = self._bag.size - self._bag_cursor
+            if extra and self.rng.randrange(remaining + len(extra)) < len(extra):
+                i = self.rng.randrange(len(extra))
+                extra[i], extra[-1] = extra[-1], extra[i]
+                file_path = extra.pop()
+            elif remaining > 0:
+                file_path = self._bag_files[self._bag[self._bag_cursor]]
+                self._bag_cursor += 1
+            else:
+                return None
+            
+            if self._bag_accepts(file_path):
+                return file_path
+    
+    def _bag_accepts(self, file_path: str) -> bool:
+        """¿Servir ahora este archivo de la bolsa? Si está en cooldown, se aplaza"""
+        if file_path not in self._file_index:
+            return False  # Eliminado del catálogo durante la ronda
+        if not self._in_filter(file_path):
+            return False  # Salió del filtro durante la ronda
+        if self._is_eligible(file_path):
+            return True
+        
+        blocked = (
+            (self.duplicate_of and self.duplicate_of.get(file_path, file_path) != file_path)
+            or (self.get_vote(file_path) == -1 and self.negative_cooldown == 0)
+        )
+        if not blocked:
+            self._bag_deferred.append(file_path)
+        return False
+    
+    def _mark_shown(self, file_path: str):
+        """Registrar archivo mostrado en su cache de cooldown y en el decaimiento"""
+        vote = self.get_vote(file_path)
+        recent = None
         if vote == 1 and self.positive_cooldown > 0:
-            self.recent_positive.append(next_file)
+            recent = self.recent_positive
         elif vote == -1 and self.negative_cooldown > 0:
-            self.recent_negative.append(next_file)
+            recent = self.recent_negative
         elif vote == 0 and self.neutral_cooldown > 0:
-            self.recent_neutral.append(next_file)
+            recent = self.recent_neutral
         
-        return next_file
+        # El más antiguo sale del cooldown al añadir uno nuevo
+        released = None
+        if recent is not None:
+            if len(recent) == recent.maxlen:
+                released = recent[0]
+            recent.append(file_path)
+        
+        self._step += 1
+        
+        decaying = []
+        if self.decay_steps > 0:
+            self._last_shown.pop(file_path, None)
+            self._last_shown[file_path] = self._step
+            # Sacar de la ventana los que ya recuperaron el peso completo
+            while self._last_shown:
+                oldest, shown = next(iter(self._last_shown.items()))
+                if self._step - shown < self.decay_steps:
+                    break
+                del self._last_shown[oldest]
+                decaying.append(oldest)
+            decaying.extend(self._last_shown)
+        
+        if self._sampler is not None:
+            self._refresh_weight(file_path)
+            if released is not None:
+                self._refresh_weight(released)
+            for path in decaying:
+                self._refresh_weight(path)
+    
+    def _clear_cooldowns(self):
+        """Vaciar caches de cooldown y ventana de decaimiento"""
+        self.recent_positive.clear()
+        self.recent_neutral.clear()
+        self.recent_negative.clear()
+        self._last_shown.clear()
+        self._invalidate_sampler()
+    
+    def _is_eligible(self, file_path: str) -> bool:
+        """¿Puede mostrarse este archivo ahora?"""
+        if self._filter_member is not None and not self._in_filter(file_path):
+            return False
+        
+        if self.duplicate_of and self.duplicate_of.get(file_path, file_path) != file_path:
+            return False
+        
+        vote = self.get_vote(file_path)
+        if vote == -1:
+            return self.negative_cooldown > 0 and file_path not in self.recent_negative
+        elif vote == 1:
+            return not (self.positive_cooldown > 0 and file_path in self.recent_positive)
+        else:
+            return not (self.neutral_cooldown > 0 and file_path in self.recent_neutral)
     
     def _get_eligible_files(self) -> List[str]:
         """Obtener archivos que pueden mostrarse"""
         eligible = []
+        duplicate_of = self.duplicate_of
         
-        for file_path in self.all_files:
+        for file_path in self._candidate_files():
+            # Cada grupo de duplicados cuenta como un único candidato
+            if duplicate_of and duplicate_of.get(file_path, file_path) != file_path:
+                continue
+            
             vote = self.get_vote(file_path)
             
             # Negativos
@@ -243,18 +812,269 @@ class NavigationSystem:
         
         return eligible
     
+    # ========================================
+    # Recurrencia (prioridades de caché)
+    # ========================================
+    
+    def is_blocked(self, file_path: str) -> bool:
+        """¿Excluido para siempre de la selección? (negativo bloqueado o duplicado oculto)"""
+        if self.duplicate_of and self.duplicate_of.get(file_path, file_path) != file_path:
+            return True
+        return self.get_vote(file_path) == -1 and self.negative_cooldown == 0
+    
+    def _cooldown_remaining(self, file_path: str) -> int:
+        """Apariciones de su categoría que faltan para que salga del cooldown (0 = elegible)"""
+        vote = self.get_vote(file_path)
+        if vote == 1:
+            recent, cooldown = self.recent_positive, self.positive_cooldown
+        elif vote == -1:
+            recent, cooldown = self.recent_negative, self.negative_cooldown
+        else:
+            recent, cooldown = self.recent_neutral, self.neutral_cooldown
+        if cooldown <= 0:
+            return 0
+        try:
+            position = recent.index(file_path)  # 0 = el próximo en salir
+        except ValueError:
+            return 0
+        # Mientras la ventana no está llena nadie sale de ella
+        return recent.maxlen - len(recent) + position + 1
+    
+    def recurrence_priority(self, file_path: str) -> float:
+        """
+        Prioridad para conservar un archivo ya mostrado en las cachés
+        
+        Inversa de los pasos estimados hasta que vuelva a salir: lo que
+        le falta de cooldown más la espera media una vez elegible
+        (peso total / su peso). Un positivo con peso alto que sale pronto
+        del cooldown vale más que un neutral recién visto en una
+        biblioteca grande. 0 = no volverá a salir. Es una estimación
+        para comparar archivos entre sí, no una probabilidad.
+        """
+        if self.is_blocked(file_path) or not self._in_filter(file_path):
+            return 0.0
+        
+        weight, total = 1.0, float(len(self._candidate_files()) or 1)
+        if self.selection_mode == self.MODE_WEIGHTED:
+            weight = (
+                self.category_weights.get(self.get_vote(file_path), 1.0)
+                * self.file_weights.get(file_path, 1.0)
+            )
+            if weight <= 0:
+                return 0.0
+            if self._sampler is not None:
+                total = max(self._sampler.total(), weight)
+        
+        waiting = self._cooldown_remaining(file_path)
+        if self.selection_mode == self.MODE_SHUFFLE and self._bag is not None:
+            # Ya mostrado en esta ronda: no vuelve hasta la siguiente
+            waiting += self._bag.size - self._bag_cursor
+        return 1.0 / (waiting + total / weight)
+    
+    def upcoming(self, limit: int = 4) -> List[str]:
+        """Archivos a punto de salir del cooldown, por prioridad (para precargar)"""
+        candidates = []
+        for recent in (self.recent_positive, self.recent_neutral, self.recent_negative):
+            candidates.extend(list(recent)[:limit])  # Los primeros son los próximos en salir
+        
+        scored = [(self.recurrence_priority(f), f) for f in dict.fromkeys(candidates)]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [f for priority, f in scored[:limit] if priority > 0]
+    
     # ========================================
     # Gestión
     # ========================================
     
     def update_file_list(self, new_file_list: List[str]):
-        """Actualizar lista de archivos"""
-        self.all_files = new_file_list.copy()
+        """Actualizar lista de archivos (sin duplicados)"""
+        old_index = self._file_index
+        self.all_files = list(dict.fromkeys(new_file_list))
+        self._file_index = {f: i for i, f in enumerate(self.all_files)}
+        self._invalidate_sampler()
+        
+        # Las filas cambian: el índice de filtrado se rehace si hay filtro
+        self._filter_index = None
+        if not self.file_filter.is_empty:
+            self._refresh_filter()
+        
+        # La ronda en curso sigue: los eliminados se saltan al llegar su
+        # turno y los nuevos se intercalan en lo que queda de ronda
+        if self._bag is not None:
+            self._bag_extra.extend(f for f in self.all_files if f not in old_index)
+    
+    def add_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Añadir archivos nuevos (p. ej. lotes de un escaneo en curso)
+        
+        Sin reconstrucciones: índice y árbol de pesos crecen en O(log N)
+        por archivo, y en modo shuffle entran en la ronda actual.
+        
+        Returns:
+            Archivos que no estaban ya en la lista
+        """
+        added = []
+        for file_path in file_paths:
+            if file_path in self._file_index:
+                continue
+            self._file_index[file_path] = len(self.all_files)
+            self.all_files.append(file_path)
+            added.append(file_path)
+        
+        if not added:
+            return added
+        
+        candidates = added
+        if self._filter_index is not None:
+            rows = self._filter_index.extend(added, self.votes, self.file_mtimes)
+            if self._filter_member is not None:
+                # Solo los que cumplen el filtro entran en la selección
+                candidates = [
+                    f for f, row in zip(added, rows)
+                    if self._filter_index.matches(row, self.file_filter)
+                ]
+                for file_path in candidates:
+                    self._filter_member.set(self._file_index[file_path])
+                if self._filter_files is not None:
+                    self._filter_files.extend(candidates)
+        
+        if self._sampler is not None:
+            # Con filtro, _sampler_files es la lista de candidatos (ya ampliada)
+            for file_path in candidates:
+                if self._sampler_index is not self._file_index:
+                    self._sampler_index[file_path] = len(self._sampler)
+                self._sampler.append(self.get_weight(file_path))
+        
+        if self._bag is not None:
+            self._bag_extra.extend(candidates)
+        return added
+    
+    def set_duplicate_groups(self, groups: List[List[str]]):
+        """
+        Establecer grupos de archivos duplicados
+        
+        Cada grupo se trata como un único candidato: solo se sortea su
+        representante. Se elige primero un miembro votado negativo (así el
+        grupo entero hereda el bloqueo), después uno positivo y si no el
+        primero del grupo.
+        """
+        self.duplicate_of = {}
+        for group in groups:
+            if len(group) < 2:
+                continue
+            votes = [self.get_vote(f) for f in group]
+            if -1 in votes:
+                representative = group[votes.index(-1)]
+            elif 1 in votes:
+                representative = group[votes.index(1)]
+            else:
+                representative = group[0]
+            for file_path in group:
+                self.duplicate_of[file_path] = representative
+        self._invalidate_sampler()
+    
+    # ========================================
+    # Sesión (semilla, historial, cooldowns, RNG)
+    # ========================================
+    
+    SESSION_MAGIC = b'VSES'
+    SESSION_VERSION = 1
+    
+    def reseed(self, seed: Optional[int] = None):
+        """Reiniciar el generador aleatorio con una semilla (None = aleatoria)"""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'little')
+        self.seed = seed
+        self.rng = random.Random(seed)
+    
+    def export_session(self) -> bytes:
+        """
+        Instantánea binaria de la sesión
+        
+        Incluye historial, posición, ventanas de cooldown, estado del RNG
+        y la ronda del modo shuffle. Usa marshal: solo tipos básicos, sin
+        ejecución de código al cargar y muy rápido en ambos sentidos.
+        """
+        payload = {
+            'seed': self.seed,
+            'rng_state': self.rng.getstate(),
+            'history': self.history,
+            'history_position': self.history_position,
+            'recent_positive': list(self.recent_positive),
+            'recent_neutral': list(self.recent_neutral),
+            'recent_negative': list(self.recent_negative),
+            'step': self._step,
+            'last_shown': self._last_shown,
+            'bag': None if self._bag is None else {
+                'key': self._bag_key,
+                'size': self._bag.size,
+                'cursor': self._bag_cursor,
+                'extra': self._bag_extra,
+                'deferred': list(self._bag_deferred),
+            },
+        }
+        return self.SESSION_MAGIC + bytes([self.SESSION_VERSION]) + marshal.dumps(payload)
+    
+    def import_session(self, data: bytes) -> bool:
+        """Restaurar una instantánea de export_session(); False si no es válida"""
+        header = len(self.SESSION_MAGIC) + 1
+        if (len(data) < header or not data.startswith(self.SESSION_MAGIC)
+                or data[header - 1] != self.SESSION_VERSION):
+            return False
+        
+        # Decodificar todo antes de tocar el estado: una instantánea
+        # incompleta no deja la sesión a medio restaurar
+        try:
+            payload = marshal.loads(data[header:])
+            rng = random.Random()
+            rng.setstate(payload['rng_state'])
+            seed = payload['seed']
+            saved_history = list(payload['history'])
+            position = int(payload['history_position'])
+            recent = [list(payload[key]) for key in ('recent_positive', 'recent_neutral', 'recent_negative')]
+            step = int(payload['step'])
+            last_shown = dict(payload['last_shown'])
+            bag = payload['bag']
+        except (ValueError, EOFError, TypeError, KeyError):
+            return False
+        self.seed = seed
+        self.rng = rng
+        
+        # Historial: descartar archivos que ya no están en el catálogo
+        history = []
+        for i, file_path in enumerate(saved_history):
+            if file_path in self._file_index:
+                history.append(file_path)
+            elif i <= position:
+                position -= 1
+        self.history = history[-self.max_history:]
+        position -= len(history) - len(self.history)
+        self.history_position = min(max(position, -1 if not self.history else 0), len(self.history) - 1)
+        
+        self.recent_positive = deque(recent[0], maxlen=self.recent_positive.maxlen)
+        self.recent_neutral = deque(recent[1], maxlen=self.recent_neutral.maxlen)
+        self.recent_negative = deque(recent[2], maxlen=self.recent_negative.maxlen)
+        self._step = step
+        self._last_shown = last_shown
+        
+        # La ronda solo es válida si el catálogo tiene el mismo tamaño
+        if bag and bag['size'] == len(self._candidate_files()):
+            self._bag_files = self._candidate_files()
+            self._bag_key = bag['key']
+            self._bag = FeistelPermutation(bag['size'], bag['key'])
+            self._bag_cursor = bag['cursor']
+            self._bag_extra = list(bag['extra'])
+            self._bag_deferred = deque(bag['deferred'])
+        else:
+            self._bag = None
+        
+        self._invalidate_sampler()
+        return True
     
     # ========================================
     # Estadísticas
     # ========================================
     
+    @traced("navigation.get_stats")
     def get_stats(self) -> Dict:
         """Obtener estadísticas"""
         positive = sum(1 for v in self.votes.values() if v == 1)
@@ -274,6 +1094,7 @@ class NavigationSystem:
             'neutral_voted': neutral,
             'negative_voted': negative,
             'eligible_now': eligible,
+            'filtered_files': self.get_filter_count(),
             'positive_cooldown': self.positive_cooldown,
             'neutral_cooldown': self.neutral_cooldown,
             'negative_cooldown': self.negative_cooldown,
@@ -305,7 +1126,9 @@ class NavigationSystem:
             'cooldown': cooldown,
             'is_blocked': vote == -1 and self.negative_cooldown == 0,
             'in_cooldown': in_cooldown,
-            'can_show_now': file_path in self._get_eligible_files()
+            'can_show_now': self._is_eligible(file_path),
+            'in_filter': self._in_filter(file_path),
+            'weight': self.get_weight(file_path)
         }
     
     # ========================================
@@ -319,33 +1142,50 @@ class NavigationSystem:
             'positive_cooldown': self.positive_cooldown,
             'neutral_cooldown': self.neutral_cooldown,
             'negative_cooldown': self.negative_cooldown,
-            'max_history': self.max_history
+            'max_history': self.max_history,
+            'selection_mode': self.selection_mode,
+            'positive_weight': self.category_weights[1],
+            'neutral_weight': self.category_weights[0],
+            'negative_weight': self.category_weights[-1],
+            'decay_steps': self.decay_steps,
+            'file_weights': self.file_weights.copy()
         }
     
     def import_data(self, data: Dict):
         """Importar datos guardados"""
         if 'votes' in data:
             self.votes = data['votes'].copy()
-        if 'positive_cooldown' in data:
-            self.set_positive_cooldown(data['positive_cooldown'])
-        if 'neutral_cooldown' in data:
-            self.set_neutral_cooldown(data['neutral_cooldown'])
-        if 'negative_cooldown' in data:
-            self.set_negative_cooldown(data['negative_cooldown'])
-        if 'max_history' in data:
-            self.set_max_history(data['max_history'])
+            self._invalidate_sampler()
+        self.apply_config(
+            positive_cooldown=data.get('positive_cooldown'),
+            neutral_cooldown=data.get('neutral_cooldown'),
+            negative_cooldown=data.get('negative_cooldown'),
+            max_history=data.get('max_history'),
+            selection_mode=(
+                data['selection_mode']
+                if data.get('selection_mode') in self.SELECTION_MODES else None
+            ),
+            positive_weight=data.get('positive_weight'),
+            neutral_weight=data.get('neutral_weight'),
+            negative_weight=data.get('negative_weight'),
+            decay_steps=data.get('decay_steps')
+        )
+        if 'file_weights' in data:
+            self.file_weights = data['file_weights'].copy()
+            self._invalidate_sampler()
     
     def reset_history(self):
         """Limpiar historial"""
         self.history.clear()
         self.history_position = -1
-        self.recent_positive.clear()
-        self.recent_neutral.clear()
-        self.recent_negative.clear()
+        self._skipped = None
+        self._clear_cooldowns()
     
     def reset_votes(self):
         """Limpiar votos"""
         self.votes.clear()
+        self._sync_filter_votes()
+        self._invalidate_sampler()
     
     def reset_all(self):
         """Reset completo"""
@@ -359,6 +1199,8 @@ class NavigationSystem:
         
         # Limpiar cache de positivos
         self.recent_positive.clear()
+        self._sync_filter_votes()
+        self._invalidate_sampler()
 
     def reset_negative_votes(self):
         """Reset only negative votes to neutral"""
@@ -368,11 +1210,14 @@ class NavigationSystem:
         
         # Limpiar cache de negativos
         self.recent_negative.clear()
+        self._sync_filter_votes()
+        self._invalidate_sampler()
 
     def reset_neutral_votes(self):
         """Remove all neutral votes (keep only voted files)"""
         # Los neutrales no están en self.votes, así que no hay nada que hacer
         self.recent_neutral.clear()
+        self._invalidate_sampler()
 
 
 # ========================================
@@ -0,0 +1,74 @@
+class FeistelPermutation:
+    """
+    Permutación pseudoaleatoria de [0, size) con memoria O(1)
+
+    Red de Feistel balanceada sobre un dominio de 2^(2k) >= size con
+    cycle-walking para quedarse dentro del rango. Es una biyección, así
+    que recorrer i = 0..size-1 visita cada elemento exactamente una vez,
+    y `inverse` permite saber en qué posición aparece un elemento.
+    """
+
+    ROUNDS = 4
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, size: int, key: int):
+        """
+        Args:
+            size: Tamaño del rango a permutar
+            key: Semilla de la permutación
+        """
+        self.size = max(0, size)
+        half_bits = max(1, ((max(1, self.size - 1)).bit_length() + 1) // 2)
+        self._half_bits = half_bits
+        self._half_mask = (1 << half_bits) - 1
+        # Subclaves por ronda derivadas de la clave
+        self._round_keys = [
+            self._mix((key & self._MASK64) ^ (r * 0x9E3779B97F4A7C15))
+            for r in range(self.ROUNDS)
+        ]
+
+    @classmethod
+    def _mix(cls, x: int) -> int:
+        """Mezclador de 64 bits (splitmix64)"""
+        x = (x + 0x9E3779B97F4A7C15) & cls._MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & cls._MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & cls._MASK64
+        return x ^ (x >> 31)
+
+    def _round(self, value: int, round_key: int) -> int:
+        return self._mix(value ^ round_key) & self._half_mask
+
+    def _encrypt(self, value: int) -> int:
+        left = value >> self._half_bits
+        right = value & self._half_mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ self._round(right, round_key)
+        return (left << self._half_bits) | right
+
+    def _decrypt(self, value: int) -> int:
+        left = value >> self._half_bits
+        right = value & self._half_mask
+        for round_key in reversed(self._round_keys):
+            left, right = right ^ self._round(left, round_key), left
+        return (left << self._half_bits) | right
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> int:
+        """Elemento en la posición `index` de la permutación"""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        value = self._encrypt(index)
+        while value >= self.size:  # Cycle-walking
+            value = self._encrypt(value)
+        return value
+
+    def inverse(self, value: int) -> int:
+        """Posición en la que aparece `value`"""
+        if not 0 <= value < self.size:
+            raise IndexError(value)
+        index = self._decrypt(value)
+        while index >= self.size:
+            index = self._decrypt(index)
+        return index
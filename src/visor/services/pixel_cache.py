@@ -0,0 +1,390 @@
+import os
+import mmap
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .profiler import traced
+
+
+DEFAULT_ARENA_PATH = Path.home() / ".cache" / "visor_multimedia" / "pixels.arena"
+DEFAULT_CAPACITY_MB = 1024  # Archivo disperso: solo ocupa disco lo escrito
+BYTES_PER_PIXEL = 4  # RGBA / ARGB32: lo que pinta Qt sin convertir
+
+_PAGE = mmap.PAGESIZE
+_FILE_HEADER = struct.Struct("<8sIIII")  # magic, versión, ancho, alto, nº de huecos
+_SLOT_HEADER = struct.Struct("<4sI16sIIIIQ")  # magic, válido, clave, ancho, alto, bpl, formato, uso
+_SLOT_HEADER_SIZE = 64
+_MAGIC = b"VISORPX1"
+_SLOT_MAGIC = b"SLOT"
+_VERSION = 1
+
+
+def pixel_key(file_path: str, size: int, mtime_ns: int) -> bytes:
+    """Clave de un archivo: cambia si el archivo cambia en disco"""
+    raw = f"{file_path}\0{size}\0{mtime_ns}".encode('utf-8', 'surrogateescape')
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class PixelSlot:
+    """
+    Píxeles de un hueco del arena, fijado mientras se usa
+
+    `view` apunta directamente al archivo mapeado: hay que llamar a
+    release() (o usar `with`) antes de que el hueco pueda reutilizarse.
+    """
+
+    __slots__ = ('view', 'width', 'height', 'bytes_per_line', 'format', '_cache', '_index')
+
+    def __init__(self, cache: 'PixelCache', index: int, view: memoryview,
+                 width: int, height: int, bytes_per_line: int, fmt: int):
+        self._cache = cache
+        self._index = index
+        self.view = view
+        self.width = width
+        self.height = height
+        self.bytes_per_line = bytes_per_line
+        self.format = fmt
+
+    def release(self):
+        if self._cache is not None:
+            self.view.release()
+            self._cache._unpin(self._index)
+            self._cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class PixelCache:
+    """
+    Caché de segundo nivel de píxeles ya decodificados
+
+    Un archivo mapeado en memoria dividido en huecos de tamaño fijo
+    (ancho x alto de pantalla en 32 bits): cada hueco guarda una imagen
+    a resolución de visualización con su cabecera (clave, dimensiones,
+    formato y marca de uso). Revisitar una imagen es mapear su hueco
+    en un QImage, sin decodificar ni copiar. Los huecos en uso están
+    fijados. El índice se reconstruye al abrir leyendo las cabeceras,
+    así que la caché sobrevive entre sesiones.
+
+    Expulsión: LRU, salvo que las entradas tengan prioridad (p. ej.
+    NavigationSystem.recurrence_priority). Entonces, fuera de las
+    RECENT_PROTECTED más recientes (ir atrás en el historial), se
+    expulsa la de menor prioridad; prioridad 0 = no se admite. Un LRU
+    fantasma (solo claves) con la misma capacidad da la tasa de
+    aciertos de referencia.
+    """
+
+    RECENT_PROTECTED = 8
+
+    def __init__(
+        self,
+        slot_width: int,
+        slot_height: int,
+        path: Optional[Path] = None,
+        capacity_mb: float = DEFAULT_CAPACITY_MB
+    ):
+        """
+        Args:
+            slot_width, slot_height: Resolución máxima de una entrada (la pantalla)
+            path: Archivo del arena (por defecto en ~/.cache)
+            capacity_mb: Tamaño total del arena
+        """
+        self.path = Path(path) if path else DEFAULT_ARENA_PATH
+        self.slot_width = slot_width
+        self.slot_height = slot_height
+        pixel_bytes = slot_width * slot_height * BYTES_PER_PIXEL
+        # Huecos alineados a página: la cabecera y los píxeles no comparten página con el vecino
+        self.slot_bytes = -(-(_SLOT_HEADER_SIZE + pixel_bytes) // _PAGE) * _PAGE
+        self.slot_count = max(1, int(capacity_mb * 1024 * 1024) // self.slot_bytes)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._lru: 'OrderedDict[bytes, int]' = OrderedDict()  # clave -> hueco (más reciente al final)
+        self._free: List[int] = []
+        self._pins: Dict[int, int] = {}
+        self._stamp = 0
+        self._paths: Dict[bytes, str] = {}  # Solo las vistas en esta sesión
+        self._priority: Dict[bytes, float] = {}
+        self._shadow: 'OrderedDict[bytes, None]' = OrderedDict()  # LRU de referencia
+        self.shadow_hits = 0
+        self._mm: Optional[mmap.mmap] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._lock_file()
+            self._open_arena()
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    # ========================================
+    # Arena
+    # ========================================
+
+    def _lock_file(self):
+        # Dos instancias escribiendo el mismo arena lo corromperían
+        try:
+            import fcntl
+        except ImportError:
+            return  # Sin flock (Windows)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise RuntimeError(f"Caché de píxeles en uso por otra instancia: {self.path}")
+
+    def _open_arena(self):
+        size = _PAGE + self.slot_count * self.slot_bytes
+        header = os.pread(self._fd, _FILE_HEADER.size, 0)
+        expected = (_MAGIC, _VERSION, self.slot_width, self.slot_height, self.slot_count)
+        valid = len(header) == _FILE_HEADER.size and _FILE_HEADER.unpack(header) == expected
+
+        if not valid:
+            # Otra geometría (cambio de pantalla) o archivo nuevo: empezar vacío
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+            os.pwrite(self._fd, _FILE_HEADER.pack(*expected), 0)
+
+        self._mm = mmap.mmap(self._fd, size)
+        entries = []
+        for index in range(self.slot_count):
+            offset = self._slot_offset(index)
+            magic, valid_flag, key, *_, stamp = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if magic == _SLOT_MAGIC and valid_flag == 1:
+                entries.append((stamp, key, index))
+            else:
+                self._free.append(index)
+
+        for stamp, key, index in sorted(entries):
+            self._lru[key] = index
+            self._stamp = stamp
+        self._shadow.update(dict.fromkeys(self._lru))  # Misma situación de partida
+        self._free.reverse()  # pop() reparte desde el principio del archivo
+
+    def _slot_offset(self, index: int) -> int:
+        return _PAGE + index * self.slot_bytes
+
+    def _touch(self, index: int):
+        """Actualizar la marca de uso en la cabecera (orden LRU persistente)"""
+        self._stamp += 1
+        offset = self._slot_offset(index) + _SLOT_HEADER.size - 8
+        struct.pack_into("<Q", self._mm, offset, self._stamp)
+
+    def _unpin(self, index: int):
+        with self._lock:
+            count = self._pins.get(index, 0) - 1
+            if count > 0:
+                self._pins[index] = count
+            else:
+                self._pins.pop(index, None)
+
+    # ========================================
+    # API
+    # ========================================
+
+    @staticmethod
+    def key_for(file_path: str) -> Optional[bytes]:
+        """Clave actual del archivo (None si ya no existe)"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return pixel_key(file_path, st.st_size, st.st_mtime_ns)
+
+    def __contains__(self, file_path: str) -> bool:
+        key = self.key_for(file_path)
+        with self._lock:
+            return key is not None and key in self._lru
+
+    @traced("pixel_cache.get")
+    def get(self, file_path: str, count: bool = True) -> Optional[PixelSlot]:
+        """
+        Píxeles cacheados de `file_path` (fijados hasta release()), o None
+
+        Args:
+            count: Contar en las estadísticas (False para precargas)
+        """
+        key = self.key_for(file_path)
+        with self._lock:
+            if key in self._shadow:
+                self.shadow_hits += count
+                self._shadow.move_to_end(key)
+            index = self._lru.get(key) if key is not None and self._mm else None
+            if index is None:
+                self.misses += count
+                return None
+            self.hits += count
+            self._paths[key] = file_path
+            self._lru.move_to_end(key)
+            self._touch(index)
+            self._pins[index] = self._pins.get(index, 0) + 1
+
+            offset = self._slot_offset(index)
+            _, _, _, width, height, bpl, fmt, _ = _SLOT_HEADER.unpack_from(self._mm, offset)
+            start = offset + _SLOT_HEADER_SIZE
+            view = memoryview(self._mm)[start:start + bpl * height]
+        return PixelSlot(self, index, view, width, height, bpl, fmt)
+
+    @traced("pixel_cache.put")
+    def put(self, file_path: str, width: int, height: int,
+            bytes_per_line: int, fmt: int, data,
+            priority: Optional[float] = None) -> bool:
+        """
+        Guardar píxeles de `file_path`
+
+        Args:
+            data: Buffer de bytes_per_line * height bytes
+            fmt: Formato de los píxeles (el valor de QImage.Format)
+            priority: Prioridad de retención (None = solo LRU; 0 = no admitir)
+        Returns:
+            False si no se admite, no cabe en un hueco o no hay hueco libre
+        """
+        nbytes = bytes_per_line * height
+        if nbytes > self.slot_bytes - _SLOT_HEADER_SIZE:
+            return False
+        key = self.key_for(file_path)
+        if key is None:
+            return False
+
+        with self._lock:
+            if self._mm is None:
+                return False  # Ya cerrada
+            self._shadow[key] = None
+            self._shadow.move_to_end(key)
+            if len(self._shadow) > self.slot_count:
+                self._shadow.popitem(last=False)
+            if priority is not None and priority <= 0:
+                self._discard_key(key)
+                return False
+
+            self._paths[key] = file_path
+            if priority is not None:
+                self._priority[key] = priority
+            index = self._lru.pop(key, None)
+            if index is not None and index in self._pins:
+                self._lru[key] = index  # En pantalla: ya está y no se puede pisar
+                return True
+            if index is None:
+                index = self._allocate()
+                if index is None:
+                    return False
+
+            offset = self._slot_offset(index)
+            # Inválido mientras se escribe: un cierre a medias no deja basura válida
+            struct.pack_into("<4sI", self._mm, offset, _SLOT_MAGIC, 0)
+            start = offset + _SLOT_HEADER_SIZE
+            self._mm[start:start + nbytes] = memoryview(data).cast('B')[:nbytes]
+            self._stamp += 1
+            _SLOT_HEADER.pack_into(
+                self._mm, offset, _SLOT_MAGIC, 1, key,
+                width, height, bytes_per_line, fmt, self._stamp
+            )
+            self._lru[key] = index
+        return True
+
+    def _allocate(self) -> Optional[int]:
+        """Hueco libre, o el de la víctima elegida (nunca uno fijado)"""
+        if self._free:
+            return self._free.pop()
+
+        victim = None
+        if self._priority:
+            # El orden del LRU desempata: entre iguales sale la más antigua;
+            # sin prioridad conocida (p. ej. de otra sesión) sale antes
+            evictable = len(self._lru) - self.RECENT_PROTECTED
+            best = None
+            for position, (key, index) in enumerate(self._lru.items()):
+                if position >= evictable:
+                    break
+                if index in self._pins:
+                    continue
+                priority = self._priority.get(key, -1.0)
+                if best is None or priority < best:
+                    best, victim = priority, key
+        if victim is None:
+            victim = next((k for k, i in self._lru.items() if i not in self._pins), None)
+        if victim is None:
+            return None
+        self._forget(victim)
+        return self._lru.pop(victim)
+
+    def _forget(self, key: bytes):
+        self._paths.pop(key, None)
+        self._priority.pop(key, None)
+
+    def _discard_key(self, key: bytes) -> bool:
+        index = self._lru.get(key)
+        if index is None or index in self._pins:
+            return False
+        del self._lru[key]
+        self._forget(key)
+        struct.pack_into("<4sI", self._mm, self._slot_offset(index), _SLOT_MAGIC, 0)
+        self._free.append(index)
+        return True
+
+    def discard(self, file_path: str):
+        """Olvidar la entrada de `file_path`"""
+        key = self.key_for(file_path)
+        with self._lock:
+            if key is not None and self._mm is not None:
+                self._discard_key(key)
+
+    def reprioritize(self, priority: Callable[[str], float]) -> int:
+        """
+        Recalcular la prioridad de las entradas con ruta conocida
+
+        Las de prioridad 0 (p. ej. negativos bloqueados) se expulsan ya.
+        Llamar desde el thread dueño del estado que consulta `priority`.
+
+        Returns:
+            Entradas expulsadas
+        """
+        with self._lock:
+            if self._mm is None:
+                return 0
+            entries = [(key, path) for key, path in self._paths.items() if key in self._lru]
+        scores = [(key, priority(path)) for key, path in entries]
+
+        evicted = 0
+        with self._lock:
+            if self._mm is None:
+                return 0
+            for key, score in scores:
+                if key not in self._lru:
+                    continue
+                if score <= 0 and self._discard_key(key):
+                    evicted += 1
+                else:
+                    self._priority[key] = score
+        return evicted
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._lru),
+                'slots': self.slot_count,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'lru_hits': self.shadow_hits,
+                'lru_hit_rate': self.shadow_hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        """Cerrar el arena (las entradas quedan en disco para la próxima sesión)"""
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._mm = None
+        os.close(self._fd)
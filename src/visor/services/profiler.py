@@ -0,0 +1,267 @@
+import os
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+
+HISTOGRAM_WINDOW = 1000  # Duraciones recientes por span para los percentiles
+TRACE_CAPACITY = 100_000  # Eventos guardados para el trace de Chrome
+STARTUP_BUDGET_MS = 1500  # Presupuesto hasta el primer pintado de la ventana
+
+
+class RollingHistogram:
+    """Ventana de las últimas duraciones (ns) de un span"""
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ns = 0
+        self.last_ns = 0
+
+    def add(self, duration_ns: int):
+        self._samples.append(duration_ns)
+        self.count += 1
+        self.total_ns += duration_ns
+        self.last_ns = duration_ns
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        """Percentiles (nearest-rank) de la ventana, en ns"""
+        # copy() es atómico frente a appends desde otros threads
+        samples = sorted(self._samples.copy())
+        if not samples:
+            return [0.0 for _ in quantiles]
+        n = len(samples)
+        return [samples[min(n - 1, max(0, int(q * n + 0.5) - 1))] for q in quantiles]
+
+
+class _Span:
+    """Context manager de un span (clase con __slots__: menos coste que contextmanager)"""
+
+    __slots__ = ('_profiler', '_name', '_args', '_start')
+
+    def __init__(self, profiler: 'Profiler', name: str, args: Optional[Dict]):
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.record(self._name, self._start, time.perf_counter_ns(), self._args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Instrumentación ligera de los caminos calientes
+
+    - span(nombre): context manager que mide con perf_counter_ns
+    - traced(nombre): decorador equivalente
+    - Histogramas deslizantes por span (p50/p95/p99)
+    - Eventos en un buffer circular exportable como trace de Chrome
+      (chrome://tracing, Perfetto)
+
+    Se desactiva con VISOR_PROFILE=0 (los spans pasan a no hacer nada).
+    """
+
+    def __init__(self, enabled: bool = True, trace_capacity: int = TRACE_CAPACITY):
+        self.enabled = enabled
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._events = deque(maxlen=trace_capacity)
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    # ========================================
+    # Medición
+    # ========================================
+
+    def span(self, name: str, **args):
+        """Medir un bloque: `with profiler.span("decode", path=p): ...`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorador que mide cada llamada a la función"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(span_name, start, time.perf_counter_ns())
+            return wrapper
+        return decorator
+
+    def record(self, name: str, start_ns: int, end_ns: Optional[int] = None, args: Optional[Dict] = None):
+        """Registrar un span medido a mano (p. ej. lotes dentro de un bucle)"""
+        if not self.enabled:
+            return
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, RollingHistogram())
+        duration = end_ns - start_ns
+        histogram.add(duration)
+        # append en deque es atómico: válido desde los threads de carga
+        self._events.append((name, start_ns, duration, threading.get_ident(), args))
+
+    # ========================================
+    # Consulta
+    # ========================================
+
+    def stats(self) -> Dict[str, Dict]:
+        """Resumen por span en milisegundos"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        result = {}
+        for name, histogram in histograms:
+            p50, p95, p99 = histogram.percentiles(0.50, 0.95, 0.99)
+            result[name] = {
+                'count': histogram.count,
+                'last_ms': histogram.last_ns / 1e6,
+                'mean_ms': histogram.total_ns / histogram.count / 1e6,
+                'p50_ms': p50 / 1e6,
+                'p95_ms': p95 / 1e6,
+                'p99_ms': p99 / 1e6,
+            }
+        return result
+
+    def format_stats(self) -> str:
+        """Tabla de texto para el HUD o la consola"""
+        lines = [f"{'span':<28}{'n':>7}{'último':>9}{'p50':>9}{'p95':>9}{'p99':>9}"]
+        for name, s in self.stats().items():
+            lines.append(
+                f"{name[:27]:<28}{s['count']:>7}{s['last_ms']:>9.2f}"
+                f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """Olvidar histogramas y eventos"""
+        with self._lock:
+            self._histograms.clear()
+            self._events.clear()
+
+    # ========================================
+    # Exportación
+    # ========================================
+
+    def dump_chrome_trace(self, path) -> int:
+        """
+        Guardar los eventos como JSON de trace de Chrome
+
+        Returns:
+            Número de eventos escritos
+        """
+        pid = os.getpid()
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        events = []
+        for name, start_ns, duration_ns, tid, args in self._events.copy():
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': (start_ns - self._origin_ns) / 1000,
+                'dur': duration_ns / 1000,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = {k: str(v) for k, v in args.items()}
+            events.append(event)
+
+        for tid in {e['tid'] for e in events}:
+            events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                'args': {'name': thread_names.get(tid, f"thread-{tid}")},
+            })
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+
+class StartupTimer:
+    """
+    Hitos del arranque, al estilo de `python -X importtime`
+
+    El origen es la importación de este módulo (lo primero que hace
+    visor.main), así que el informe no incluye el arranque del intérprete.
+    """
+
+    FIRST_PAINT = "first paint"
+
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self.marks: List[Tuple[str, int]] = []
+
+    def mark(self, phase: str):
+        """Registrar el final de una fase"""
+        self.marks.append((phase, time.perf_counter_ns()))
+
+    def elapsed_ms(self, phase: str) -> Optional[float]:
+        """Milisegundos desde el origen hasta el final de `phase`"""
+        for name, t in self.marks:
+            if name == phase:
+                return (t - self.origin_ns) / 1e6
+        return None
+
+    def budget_ms(self) -> float:
+        return float(os.environ.get('VISOR_STARTUP_BUDGET_MS', STARTUP_BUDGET_MS))
+
+    def within_budget(self) -> bool:
+        """¿Se pintó la ventana dentro del presupuesto?"""
+        first_paint = self.elapsed_ms(self.FIRST_PAINT)
+        return first_paint is not None and first_paint <= self.budget_ms()
+
+    def format_report(self) -> str:
+        lines = ["startup: self [ms] | cumulative | phase"]
+        previous = self.origin_ns
+        for name, t in self.marks:
+            lines.append(
+                f"startup: {(t - previous) / 1e6:9.1f} | "
+                f"{(t - self.origin_ns) / 1e6:10.1f} | {name}"
+            )
+            previous = t
+
+        first_paint = self.elapsed_ms(self.FIRST_PAINT)
+        budget = self.budget_ms()
+        if first_paint is None:
+            lines.append("⚠ La ventana no llegó a pintarse")
+        elif first_paint <= budget:
+            lines.append(f"✓ Primer pintado en {first_paint:.0f} ms (presupuesto {budget:.0f} ms)")
+        else:
+            lines.append(f"⚠ Primer pintado en {first_paint:.0f} ms: supera el presupuesto de {budget:.0f} ms")
+        return "\n".join(lines)
+
+
+# Instancias globales usadas por toda la aplicación
+profiler = Profiler(enabled=os.environ.get('VISOR_PROFILE', '1') != '0')
+startup = StartupTimer()
+span = profiler.span
+traced = profiler.traced
@@ -0,0 +1,63 @@
+import time
+from collections import deque
+from typing import Optional
+
+
+class ProgressMeter:
+    """
+    Ritmo (elementos/s) y tiempo restante de un trabajo largo
+
+    El ritmo se mide sobre una ventana de los últimos segundos, así
+    refleja la velocidad actual y no la media desde el principio
+    (p. ej. al reanudar un trabajo con la mitad ya en caché).
+    """
+
+    WINDOW_SECONDS = 10.0
+
+    def __init__(self, total: int, done: int = 0):
+        self.total = total
+        self.done = done
+        self.started = time.monotonic()
+        self._samples = deque([(self.started, done)])
+
+    def update(self, done: int):
+        """Registrar el número de elementos terminados"""
+        now = time.monotonic()
+        self.done = done
+        self._samples.append((now, done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.WINDOW_SECONDS:
+            self._samples.popleft()
+
+    def rate(self) -> float:
+        """Elementos por segundo (ventana reciente)"""
+        (t0, d0), (t1, d1) = self._samples[0], self._samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return (d1 - d0) / (t1 - t0)
+
+    def eta(self) -> Optional[float]:
+        """Segundos restantes estimados (None si aún no hay ritmo)"""
+        rate = self.rate()
+        if rate <= 0:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def percent(self) -> float:
+        return 100.0 * self.done / self.total if self.total else 100.0
+
+    def format(self) -> str:
+        """'1234/5000 (24.7%) · 312/s · quedan 12s'"""
+        text = f"{self.done}/{self.total} ({self.percent():.1f}%) · {self.rate():.0f}/s"
+        eta = self.eta()
+        if eta is not None and self.done < self.total:
+            text += f" · quedan {format_duration(eta)}"
+        return text
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
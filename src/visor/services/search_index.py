@@ -0,0 +1,303 @@
+import os
+import marshal
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+
+class SearchIndex:
+    """
+    Índice de trigramas sobre los nombres de archivo
+
+    Cada nombre (en minúsculas) aporta sus trigramas; cada trigrama
+    guarda la lista ordenada de ids que lo contienen. Una búsqueda
+    verifica solo los candidatos del trigrama más raro de la consulta,
+    sin recorrer el catálogo.
+
+    - Los archivos nuevos quedan pendientes e index_pending() los indexa
+      por tramos (sin bloquear la UI); mientras, se buscan por fuerza bruta.
+    - Los eliminados se marcan y se compactan al serializar si pesan; si
+      vuelven (carpeta quitada y añadida, disco que reaparece) recuperan
+      su id, que sigue en las listas de sus trigramas.
+    - snapshot() congela el estado en O(archivos + trigramas) sin copiar
+      las listas de ids: dumps() de la copia puede ir en otro thread.
+    - Se serializa con sus rutas: no depende del orden del catálogo.
+    - search() es un generador de lotes: quien lo consume puede dejarlo
+      a medias (nueva tecla) sin coste.
+    """
+
+    FORMAT_VERSION = 1
+    GRAM = 3
+    BATCH = 4096  # Candidatos verificados por lote
+    FUZZY_MIN_SCORE = 0.6  # Fracción de trigramas compartidos para un resultado aproximado
+    FUZZY_BUDGET = 200_000  # Entradas de listas contadas como máximo en la búsqueda aproximada
+    FUZZY_LIMIT = 500  # Resultados aproximados como máximo
+
+    def __init__(self):
+        self._paths: List[str] = []
+        self._names: List[str] = []  # Nombre en minúsculas de cada id
+        self._ids: Dict[str, int] = {}
+        self._grams: Dict[str, array] = {}
+        self._indexed = 0  # Ids < _indexed ya están en _grams
+        self._removed: Set[int] = set()
+        self._dead: Dict[str, int] = {}  # Ruta eliminada -> su id (si vuelve, se reutiliza)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ========================================
+    # Construcción
+    # ========================================
+
+    def add(self, paths: Iterable[str]):
+        """Añadir archivos (quedan pendientes de indexar)"""
+        for path in paths:
+            if path in self._ids:
+                continue
+            doc = self._dead.pop(path, None)
+            if doc is not None:
+                self._removed.discard(doc)
+                self._ids[path] = doc
+                continue
+            self._ids[path] = len(self._paths)
+            self._paths.append(path)
+            self._names.append(os.path.basename(path).lower())
+
+    def remove(self, paths: Iterable[str]):
+        """Quitar archivos (se compactan al serializar)"""
+        for path in paths:
+            doc = self._ids.pop(path, None)
+            if doc is not None:
+                self._removed.add(doc)
+                self._dead[path] = doc
+
+    def clear(self):
+        self.__init__()
+
+    @property
+    def pending(self) -> int:
+        """Archivos añadidos aún sin indexar"""
+        return len(self._paths) - self._indexed
+
+    def index_pending(self, limit: Optional[int] = None) -> int:
+        """
+        Indexar hasta `limit` archivos pendientes (None = todos)
+
+        Returns:
+            Archivos que siguen pendientes
+        """
+        start = self._indexed
+        end = len(self._paths) if limit is None else min(len(self._paths), start + limit)
+        grams, names, n = self._grams, self._names, self.GRAM
+        for doc in range(start, end):
+            name = names[doc]
+            for gram in {name[i:i + n] for i in range(len(name) - n + 1)}:
+                posting = grams.get(gram)
+                if posting is None:
+                    posting = grams[gram] = array('I')
+                posting.append(doc)  # Ids crecientes: las listas quedan ordenadas
+        self._indexed = end
+        return self.pending
+
+    # ========================================
+    # Persistencia
+    # ========================================
+
+    # Separador: NUL es el único carácter que no puede aparecer en una ruta
+    _SEP = "\0"
+
+    def snapshot(self) -> 'SearchIndex':
+        """
+        Copia para serializar fuera del thread de la UI (solo vale para dumps())
+
+        Copia las rutas, los eliminados y el diccionario de trigramas, pero
+        comparte las listas de ids: indexar solo les añade ids mayores que
+        los ya indexados, y dumps() las recorta a lo indexado en la copia.
+        """
+        frozen = SearchIndex()
+        frozen._paths = list(self._paths)
+        frozen._removed = set(self._removed)
+        frozen._indexed = self._indexed
+        frozen._grams = dict(self._grams)
+        return frozen
+
+    def dumps(self) -> bytes:
+        """
+        Serializar el índice junto con sus rutas
+
+        No indexa lo pendiente: se guarda como pendiente y se indexa
+        después de cargar. Si los eliminados pesan, se guarda compactado
+        (ids renumerados); el índice en memoria no cambia.
+        """
+        paths, removed, indexed = self._paths, self._removed, self._indexed
+        grams = {}
+        if len(removed) > len(paths) // 4:
+            remap = array('I')  # Id viejo -> id nuevo
+            kept = []
+            for doc, path in enumerate(paths):
+                remap.append(len(kept))
+                if doc not in removed:
+                    kept.append(path)
+            for gram, posting in self._grams.items():
+                docs = posting[:bisect_left(posting, indexed)]
+                compacted = array('I', [remap[doc] for doc in docs if doc not in removed])
+                if compacted:
+                    grams[gram] = compacted.tobytes()
+            indexed -= sum(1 for doc in removed if doc < indexed)
+            paths, removed = kept, ()
+        else:
+            for gram, posting in self._grams.items():
+                cut = bisect_left(posting, indexed)
+                grams[gram] = (posting if cut == len(posting) else posting[:cut]).tobytes()
+
+        payload = {
+            'version': self.FORMAT_VERSION,
+            'paths': self._SEP.join(paths).encode('utf-8', 'surrogateescape'),
+            'removed': array('I', sorted(removed)).tobytes(),
+            'indexed': indexed,
+            'grams': grams,
+        }
+        return marshal.dumps(payload)
+
+    @classmethod
+    def loads(cls, data: bytes) -> Optional['SearchIndex']:
+        """Restaurar un índice de dumps(); None si los datos no son válidos"""
+        try:
+            payload = marshal.loads(data)
+            if payload['version'] != cls.FORMAT_VERSION:
+                return None
+            blob = payload['paths']
+            paths = blob.decode('utf-8', 'surrogateescape').split(cls._SEP) if blob else []
+            removed = array('I')
+            removed.frombytes(payload['removed'])
+            grams = {}
+            for gram, raw in payload['grams'].items():
+                posting = array('I')
+                posting.frombytes(raw)
+                grams[gram] = posting
+            indexed = payload['indexed']
+        except (ValueError, EOFError, TypeError, KeyError, UnicodeDecodeError):
+            return None
+
+        dead = set(removed)
+        if indexed > len(paths) or (dead and max(dead) >= len(paths)):
+            return None  # Datos incoherentes
+        index = cls()
+        index._paths = paths
+        index._names = [os.path.basename(p).lower() for p in paths]
+        # Una ruta puede repetirse entre los eliminados, no entre los vivos
+        index._ids = {p: doc for doc, p in enumerate(paths) if doc not in dead}
+        if len(index._ids) != len(paths) - len(dead):
+            return None
+        index._removed = dead
+        index._dead = {paths[doc]: doc for doc in removed if paths[doc] not in index._ids}
+        index._grams = grams
+        index._indexed = indexed
+        return index
+
+    def sync(self, files: Iterable[str], present: Callable[[str], bool]):
+        """
+        Ajustar a la lista actual de archivos
+
+        Args:
+            files: Archivos actuales (los que falten se añaden)
+            present: ¿Sigue `path` en la biblioteca? (los demás se quitan)
+        """
+        self.remove([p for p in self._ids if not present(p)])
+        self.add(files)
+
+    # ========================================
+    # Búsqueda
+    # ========================================
+
+    def _trigrams(self, term: str) -> Set[str]:
+        n = self.GRAM
+        return {term[i:i + n] for i in range(len(term) - n + 1)}
+
+    def _candidates(self, terms: List[str]) -> Optional[Sequence[int]]:
+        """
+        Ids indexados que pueden contener la consulta
+
+        La lista del trigrama más raro: intersecar con las demás cuesta
+        más que verificar sus nombres, y la verificación es exacta de
+        todos modos. [] = algún trigrama no existe (no hay coincidencias);
+        None = ningún término tiene trigramas (hay que recorrerlo todo).
+        """
+        grams = set()
+        for term in terms:
+            grams |= self._trigrams(term)
+        if not grams:
+            return None
+
+        rarest = None
+        for gram in grams:
+            posting = self._grams.get(gram)
+            if posting is None:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        return rarest
+
+    def search(self, query: str) -> Iterator[List[str]]:
+        """
+        Buscar archivos cuyo nombre contiene todas las palabras de `query`
+
+        Genera lotes de rutas: primero las coincidencias exactas (en orden
+        del catálogo) y, si no hay ninguna, las aproximadas por trigramas
+        compartidos, de más a menos parecidas.
+        """
+        terms = query.lower().split()
+        if not terms:
+            return
+
+        names, removed = self._names, self._removed
+        candidates = self._candidates(terms)
+        if candidates is None:
+            candidates = range(self._indexed)  # Términos de 1-2 letras: recorrer
+        # Los pendientes de indexar se verifican todos
+        pending = range(self._indexed, len(self._paths))
+
+        found = 0
+        for docs in (candidates, pending):
+            for start in range(0, len(docs), self.BATCH):
+                batch = [
+                    self._paths[doc] for doc in docs[start:start + self.BATCH]
+                    if doc not in removed and all(term in names[doc] for term in terms)
+                ]
+                found += len(batch)
+                yield batch
+
+        if not found:
+            yield from self._search_fuzzy(terms)
+
+    def _search_fuzzy(self, terms: List[str]) -> Iterator[List[str]]:
+        """Nombres que comparten la mayoría de trigramas (erratas, letras de más o de menos)"""
+        grams = set()
+        for term in terms:
+            grams |= self._trigrams(term)
+        if not grams:
+            return
+
+        # Los trigramas más raros primero, hasta agotar el presupuesto: los
+        # muy comunes apenas discriminan y son los que más cuestan de contar
+        hits = Counter()
+        budget = self.FUZZY_BUDGET
+        counted = len(grams)  # Los trigramas inexistentes cuentan como fallos
+        postings = sorted((p for p in map(self._grams.get, grams) if p is not None), key=len)
+        for posting in postings:
+            if len(posting) > budget:
+                counted -= 1  # Fuera del presupuesto: ni acierto ni fallo
+                continue
+            budget -= len(posting)
+            hits.update(posting)
+        needed = max(1, round(counted * self.FUZZY_MIN_SCORE))
+
+        results = []
+        for doc, count in hits.most_common(self.FUZZY_LIMIT):
+            if count < needed or len(results) >= self.FUZZY_LIMIT:
+                break
+            if doc not in self._removed:
+                results.append(self._paths[doc])
+        for start in range(0, len(results), self.BATCH):
+            yield results[start:start + self.BATCH]
@@ -0,0 +1,66 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SettingsStore:
+    """
+    Persistencia en el home del usuario
+
+    - Configuración y votos: JSON legible
+    - Sesión de navegación: instantánea binaria (NavigationSystem.export_session)
+
+    Las escrituras son atómicas (archivo temporal + os.replace), así un
+    cierre inesperado nunca deja un archivo a medias.
+    """
+
+    def __init__(self, settings_path: Optional[Path] = None, session_path: Optional[Path] = None):
+        home = Path.home()
+        self.settings_path = Path(settings_path) if settings_path else home / ".visor_multimedia_settings.json"
+        self.session_path = Path(session_path) if session_path else home / ".visor_multimedia_session.bin"
+
+    # ========================================
+    # Configuración y votos
+    # ========================================
+
+    def load(self) -> Optional[Dict]:
+        """Cargar configuración guardada (None si no existe)"""
+        if not self.settings_path.exists():
+            return None
+
+        with open(self.settings_path, 'r') as f:
+            return json.load(f)
+
+    def save(self, data: Dict):
+        """Guardar configuración y votos"""
+        self._write_atomic(
+            self.settings_path,
+            json.dumps(data, indent=2).encode('utf-8')
+        )
+
+    # ========================================
+    # Sesión
+    # ========================================
+
+    def load_session(self) -> Optional[bytes]:
+        """Cargar instantánea de sesión (None si no existe)"""
+        if not self.session_path.exists():
+            return None
+
+        with open(self.session_path, 'rb') as f:
+            return f.read()
+
+    def save_session(self, data: bytes):
+        """Guardar instantánea de sesión"""
+        self._write_atomic(self.session_path, data)
+
+    # ========================================
+    # Internos
+    # ========================================
+
+    def _write_atomic(self, path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
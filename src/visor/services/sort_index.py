@@ -0,0 +1,222 @@
+import os
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+SORT_SCAN = 'scan'
+SORT_NAME = 'name'
+SORT_MTIME = 'mtime'
+SORT_SIZE = 'size'
+SORT_VOTE = 'vote'
+SORT_TYPE = 'type'
+SORT_KEYS = (SORT_SCAN, SORT_NAME, SORT_MTIME, SORT_SIZE, SORT_VOTE, SORT_TYPE)
+
+# Orden de los grupos al ordenar por voto: 👍, ⚪, 👎
+VOTE_GROUPS = (1, 0, -1)
+
+
+class SortIndex:
+    """
+    Permutaciones del catálogo por cada criterio de orden
+
+    Cada permutación es un array('I') de filas del catálogo, calculada
+    una vez con sorted() sobre una columna de claves (comparaciones en C,
+    ninguna función Python de comparación) y guardada: cambiar de orden
+    es cambiar de array, y el orden inverso se lee del revés sin copiar.
+
+    - Orden de escaneo: None (identidad, sin array).
+    - Por voto: grupos 👍/⚪/👎 en orden de escaneo; un voto nuevo mueve
+      una sola fila (find_vote_move/move_vote) en lugar de reordenar.
+    - Archivos añadidos: van al final de cada permutación y la dejan
+      marcada como desactualizada hasta refresh() (fin del escaneo).
+    - Archivos quitados: las filas cambian, se descarta todo (invalidate).
+    """
+
+    def __init__(self, files: List[str]):
+        self._files = files  # Lista viva del catálogo
+        self._perms: Dict[str, array] = {}
+        self._stale = set()  # Permutaciones con archivos sin ordenar al final
+        self._votes: Mapping[str, int] = {}
+        self._vote_group = bytearray()  # Grupo (índice en VOTE_GROUPS) de cada fila
+        self._vote_starts = [0, 0, 0]  # Inicio de cada grupo en la permutación por voto
+        self._rows: Optional[Dict[str, int]] = None  # Ruta -> fila (para move_vote)
+        self._sizes: Mapping[str, int] = {}
+        self._mtimes: Mapping[str, float] = {}
+
+    # ========================================
+    # Columnas
+    # ========================================
+
+    def set_votes(self, votes: Mapping[str, int]):
+        """Votos de los que leer el grupo de cada archivo (se reagrupa todo)"""
+        self._votes = votes
+        self._drop(SORT_VOTE)
+
+    def set_stats(self, sizes: Mapping[str, int], mtimes: Mapping[str, float]):
+        """Tamaños y fechas del stat (los que falten van al final)"""
+        self._sizes = sizes
+        self._mtimes = mtimes
+        self._drop(SORT_SIZE)
+        self._drop(SORT_MTIME)
+
+    def _drop(self, key: str):
+        self._perms.pop(key, None)
+        self._stale.discard(key)
+
+    # ========================================
+    # Cambios en el catálogo
+    # ========================================
+
+    def extend(self, count: int):
+        """Se añadieron `count` archivos al final del catálogo"""
+        total = len(self._files)
+        new_rows = range(total - count, total)
+        for key, perm in self._perms.items():
+            if key == SORT_VOTE:
+                self._extend_votes(new_rows)
+            else:
+                perm.extend(new_rows)
+                self._stale.add(key)
+        if self._rows is not None:
+            for row in new_rows:
+                self._rows[self._files[row]] = row
+
+    def invalidate(self):
+        """Las filas del catálogo cambiaron (borrado o restauración)"""
+        self._perms.clear()
+        self._stale.clear()
+        self._rows = None
+
+    def refresh(self):
+        """Reordenar las permutaciones con archivos añadidos sin colocar"""
+        for key in list(self._stale):
+            self._drop(key)
+
+    def is_stale(self, key: str) -> bool:
+        return key in self._stale
+
+    # ========================================
+    # Permutaciones
+    # ========================================
+
+    def order(self, key: str) -> Optional[array]:
+        """Filas del catálogo en el orden `key` (None = orden de escaneo)"""
+        if key == SORT_SCAN:
+            return None
+        perm = self._perms.get(key)
+        if perm is None:
+            perm = self._perms[key] = self._build(key)
+        return perm
+
+    def _build(self, key: str) -> array:
+        files = self._files
+        rows = range(len(files))
+        if key == SORT_VOTE:
+            return self._build_votes()
+        if key == SORT_MTIME:
+            inf = float('inf')
+            column = [self._mtimes.get(p, inf) for p in files]
+            return array('I', sorted(rows, key=column.__getitem__))
+        if key == SORT_SIZE:
+            inf = float('inf')
+            column = [self._sizes.get(p, inf) for p in files]
+            return array('I', sorted(rows, key=column.__getitem__))
+
+        sep = os.sep
+        names = [p.rpartition(sep)[2].lower() for p in files]
+        by_name = sorted(rows, key=names.__getitem__)
+        if key == SORT_NAME:
+            return array('I', by_name)
+        if key == SORT_TYPE:
+            # sorted() es estable: por extensión y, dentro, por nombre
+            extensions = [n.rpartition('.')[2] for n in names]
+            return array('I', sorted(by_name, key=extensions.__getitem__))
+        raise ValueError(f"Criterio de orden desconocido: {key}")
+
+    # ---------------- Por voto ----------------
+
+    def _group_of(self, path: str) -> int:
+        vote = self._votes.get(path, 0)
+        return 0 if vote == 1 else 2 if vote == -1 else 1
+
+    def _build_votes(self) -> array:
+        groups = [array('I') for _ in VOTE_GROUPS]
+        group_rows = self._vote_group = bytearray(len(self._files))
+        get = self._votes.get
+        for row, path in enumerate(self._files):
+            vote = get(path, 0)
+            group = 0 if vote == 1 else 2 if vote == -1 else 1
+            group_rows[row] = group
+            groups[group].append(row)
+        self._vote_starts = [0, len(groups[0]), len(groups[0]) + len(groups[1])]
+        perm = groups[0]
+        perm.extend(groups[1])
+        perm.extend(groups[2])
+        return perm
+
+    def _extend_votes(self, rows: range):
+        """Filas nuevas al final de su grupo (son las mayores: sin bisect)"""
+        groups = [array('I') for _ in VOTE_GROUPS]
+        files = self._files
+        for row in rows:
+            group = self._group_of(files[row])
+            self._vote_group.append(group)
+            groups[group].append(row)
+        perm = self._perms[SORT_VOTE]
+        starts = self._vote_starts
+        # Del último grupo al primero: insertar no desplaza los huecos pendientes
+        for group in reversed(range(len(groups))):
+            end = self._group_range(group)[1]
+            perm[end:end] = groups[group]
+        for group in range(1, len(starts)):
+            starts[group] += sum(len(g) for g in groups[:group])
+
+    def find_vote_move(self, path: str) -> Optional[Tuple[int, int]]:
+        """
+        Dónde mover un archivo cuyo voto cambió, sin moverlo todavía
+
+        Returns:
+            (posición actual, posición final) en la permutación por voto,
+            o None si no hay que moverlo (sin esa permutación calculada,
+            o el voto sigue en el mismo grupo)
+        """
+        if SORT_VOTE not in self._perms:
+            return None
+        if self._rows is None:
+            self._rows = {p: row for row, p in enumerate(self._files)}
+        row = self._rows.get(path)
+        if row is None:
+            return None
+        old_group = self._vote_group[row]
+        new_group = self._group_of(path)
+        if old_group == new_group:
+            return None
+
+        perm = self._perms[SORT_VOTE]
+        old_pos = bisect_left(perm, row, *self._group_range(old_group))
+        new_pos = bisect_left(perm, row, *self._group_range(new_group))
+        if new_group > old_group:
+            new_pos -= 1  # Tras quitar la fila, lo posterior retrocede una posición
+        return old_pos, new_pos
+
+    def move_vote(self, path: str, old_pos: int, new_pos: int):
+        """Aplicar el movimiento calculado por find_vote_move()"""
+        perm = self._perms[SORT_VOTE]
+        row = perm[old_pos]
+        old_group, new_group = self._vote_group[row], self._group_of(path)
+        del perm[old_pos]
+        perm.insert(new_pos, row)
+        starts = self._vote_starts
+        if new_group > old_group:
+            for g in range(old_group + 1, new_group + 1):
+                starts[g] -= 1
+        else:
+            for g in range(new_group + 1, old_group + 1):
+                starts[g] += 1
+        self._vote_group[row] = new_group
+
+    def _group_range(self, group: int) -> Tuple[int, int]:
+        starts = self._vote_starts
+        end = starts[group + 1] if group + 1 < len(starts) else len(self._perms[SORT_VOTE])
+        return starts[group], end
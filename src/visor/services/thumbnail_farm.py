@@ -0,0 +1,277 @@
+import os
+import multiprocessing
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+)
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .file_catalog import IMAGE_EXTENSIONS
+from .media_index import MediaIndex
+from .progress import ProgressMeter
+from .exif import ExifInfo, NO_EXIF, read_exif
+from .thumbnails import EXIF_FORMATS, ThumbnailCache, embedded_thumbnail, save_thumbnail
+
+
+CHUNK_SIZE = 32  # Imágenes por tarea (y por segmento de memoria compartida)
+ENCODER_THREADS = 2  # Pillow libera el GIL al codificar JPEG
+
+# Resultado de un worker por imagen:
+# (path, estado, size, mtime_ns, ancho, alto, formato, ancho_miniatura, alto_miniatura, exif)
+# estado: 'decoded' (píxeles en el segmento), 'cached', 'failed' o 'missing'
+ChunkResult = Tuple[str, str, int, int, Optional[int], Optional[int], Optional[str], int, int, ExifInfo]
+
+
+# ========================================
+# Worker (nivel de módulo para poder usarlo en procesos)
+# ========================================
+
+_segments: Dict[str, shared_memory.SharedMemory] = {}  # Segmentos abiertos en este proceso
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Con spawn los workers comparten el resource_tracker del padre, que
+    # es quien libera los segmentos: aquí solo se mapean
+    segment = _segments.get(name)
+    if segment is None:
+        segment = _segments[name] = shared_memory.SharedMemory(name=name)
+    return segment
+
+
+def _decode_chunk(
+    segment_name: str, paths: Sequence[str],
+    cache_dir: str, max_side: int, force: bool
+) -> List[ChunkResult]:
+    """
+    Decodificar un bloque de imágenes a miniaturas RGB
+
+    Los píxeles de la imagen i se escriben en el segmento compartido a
+    partir de i * max_side² * 3; por el pipe solo vuelven metadatos.
+    """
+    from PIL import Image
+
+    buf = _attach(segment_name).buf
+    slot_bytes = max_side * max_side * 3
+    cache = ThumbnailCache(cache_dir, max_side)
+    results = []
+
+    for i, path in enumerate(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            results.append((path, 'missing', 0, 0, None, None, None, 0, 0, NO_EXIF))
+            continue
+
+        try:
+            with Image.open(path) as img:
+                # open() solo lee la cabecera: tamaño y formato sin decodificar
+                fmt = img.format
+                width, height = img.size
+                exif = read_exif(path) if fmt in EXIF_FORMATS else NO_EXIF
+                target = cache.path_for_stat(path, st.st_size, st.st_mtime_ns)
+                if not force and target.exists():
+                    results.append((path, 'cached', st.st_size, st.st_mtime_ns,
+                                    width, height, fmt, 0, 0, exif))
+                    continue
+
+                # Preview EXIF suficientemente grande: sin decodificar la imagen
+                thumb = embedded_thumbnail(path, exif, (width, height), max_side)
+                if thumb is None:
+                    img.draft('RGB', (max_side, max_side))
+                    img.thumbnail((max_side, max_side))
+                    thumb = img.convert('RGB')
+
+            offset = i * slot_bytes
+            tw, th = thumb.size
+            buf[offset:offset + tw * th * 3] = thumb.tobytes()
+            results.append((path, 'decoded', st.st_size, st.st_mtime_ns,
+                            width, height, fmt, tw, th, exif))
+        except Exception:
+            results.append((path, 'failed', st.st_size, st.st_mtime_ns,
+                            None, None, None, 0, 0, NO_EXIF))
+
+    return results
+
+
+def _encode_slot(segment: shared_memory.SharedMemory, offset: int, size: Tuple[int, int], target):
+    """Codificar a JPEG los píxeles de un hueco del segmento, sin copiarlos"""
+    from PIL import Image
+
+    view = segment.buf[offset:offset + size[0] * size[1] * 3]
+    try:
+        image = Image.frombuffer('RGB', size, view, 'raw', 'RGB', 0, 1)
+        save_thumbnail(image, target)
+        del image  # Suelta el buffer antes de liberar la vista
+        return True
+    except Exception:
+        return False
+    finally:
+        view.release()
+
+
+# ========================================
+# Granja
+# ========================================
+
+class ThumbnailFarm:
+    """
+    Generación de miniaturas y metadatos en un pool de procesos
+
+    - El catálogo se reparte en bloques de CHUNK_SIZE imágenes
+    - Cada worker decodifica con Pillow (draft() en JPEG) y deja los
+      píxeles en un segmento de memoria compartida: el proceso principal
+      los lee sin deserializar y los codifica/escribe en la caché
+    - El progreso se guarda en el índice por bloque (tabla media_metadata):
+      si se interrumpe, la siguiente ejecución continúa donde quedó
+    - El EXIF leído por el camino (orientación, preview) queda en exif_info
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ThumbnailCache] = None,
+        index: Optional[MediaIndex] = None,
+        max_workers: Optional[int] = None,
+        force: bool = False,
+        verify: bool = False,
+        progress: Optional[Callable[[int, int, float, float], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Args:
+            cache: Caché de miniaturas (por defecto la del usuario)
+            index: Índice donde guardar metadatos y progreso (None = sin reanudar)
+            max_workers: Procesos del pool (None = nº de CPUs)
+            force: Regenerar aunque existan
+            verify: Revisar también lo ya procesado (archivos cambiados)
+            progress: Callback (hechos, total, archivos/s, segundos restantes o -1)
+            should_cancel: Callback que devuelve True para abortar
+        """
+        self.cache = cache or ThumbnailCache()
+        self.index = index
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.force = force
+        self.verify = verify
+        self._progress = progress or (lambda done, total, rate, eta: None)
+        self._should_cancel = should_cancel or (lambda: False)
+        self.meter: Optional[ProgressMeter] = None
+
+    def run(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        Procesar las imágenes de `paths`
+
+        Returns:
+            Contadores {'created', 'cached', 'failed', 'cancelled'}
+        """
+        images = [p for p in paths if os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS]
+        counts = {'created': 0, 'cached': 0, 'failed': 0, 'cancelled': 0}
+
+        # Reanudar: lo procesado en ejecuciones anteriores no se vuelve a tocar
+        pending = images
+        if self.index is not None and not (self.force or self.verify):
+            states = self.index.get_thumbnail_states()
+            side = self.cache.max_side
+            pending = []
+            for path in images:
+                state = states.get(path)
+                if state is None or state[2] not in (0, side):
+                    pending.append(path)
+                elif state[2] == 0:
+                    counts['failed'] += 1
+                else:
+                    counts['cached'] += 1
+
+        total = len(images)
+        done = total - len(pending)
+        self.meter = ProgressMeter(total, done)
+        self._report()
+        if not pending:
+            return counts
+
+        chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+        slot_bytes = self.cache.max_side * self.cache.max_side * 3
+        # Dos bloques en vuelo por worker: mientras uno se codifica, el otro decodifica
+        segments = [
+            shared_memory.SharedMemory(create=True, size=CHUNK_SIZE * slot_bytes)
+            for _ in range(min(len(chunks), self.max_workers * 2))
+        ]
+
+        ctx = multiprocessing.get_context('spawn')  # No heredar threads de Qt
+        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        encoders = ThreadPoolExecutor(max_workers=ENCODER_THREADS)
+        try:
+            queue = iter(chunks)
+            in_flight = {}
+
+            def submit(segment) -> bool:
+                chunk = next(queue, None)
+                if chunk is None:
+                    return False
+                future = pool.submit(
+                    _decode_chunk, segment.name, chunk,
+                    str(self.cache.cache_dir), self.cache.max_side, self.force
+                )
+                in_flight[future] = segment
+                return True
+
+            for segment in segments:
+                submit(segment)
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    segment = in_flight.pop(future)
+                    results = future.result()
+                    self._store_chunk(segment, results, encoders, counts)
+                    done += len(results)
+                    self.meter.update(done)
+                    self._report()
+
+                    if self._should_cancel():
+                        counts['cancelled'] = total - done
+                        return counts
+                    submit(segment)
+        finally:
+            encoders.shutdown()
+            pool.shutdown(wait=True, cancel_futures=True)
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+        return counts
+
+    def _store_chunk(self, segment, results: List[ChunkResult], encoders, counts: Dict[str, int]):
+        """Escribir las miniaturas de un bloque y registrar su progreso"""
+        side = self.cache.max_side
+        slot_bytes = side * side * 3
+
+        encoding = {}
+        for i, (path, status, size, mtime_ns, _, _, _, tw, th, _) in enumerate(results):
+            if status == 'decoded':
+                target = self.cache.path_for_stat(path, size, mtime_ns)
+                encoding[path] = encoders.submit(
+                    _encode_slot, segment, i * slot_bytes, (tw, th), target
+                )
+
+        rows, exif_rows = [], []
+        for path, status, size, mtime_ns, width, height, fmt, _, _, exif in results:
+            if status == 'decoded':
+                status = 'created' if encoding[path].result() else 'failed'
+            if status == 'missing':
+                counts['failed'] += 1
+                continue  # Ya no existe: nada que recordar
+            counts[status] += 1
+            rows.append((path, size, mtime_ns, {
+                'width': width, 'height': height, 'format': fmt,
+                'thumb_side': side if status != 'failed' else 0,
+            }))
+            if status != 'failed':
+                exif_rows.append((path, size, mtime_ns, exif))
+
+        if self.index is not None and rows:
+            self.index.store_media_metadata(rows)
+            self.index.store_exif_info(exif_rows)
+
+    def _report(self):
+        meter = self.meter
+        eta = meter.eta()
+        self._progress(meter.done, meter.total, meter.rate(), -1.0 if eta is None else eta)
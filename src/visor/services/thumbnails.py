@@ -0,0 +1,118 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .exif import ExifInfo, read_exif, read_preview
+
+
+THUMBNAIL_SIZE = 256  # Lado mayor en píxeles
+THUMBNAIL_QUALITY = 85
+DEFAULT_THUMBNAIL_DIR = Path.home() / ".cache" / "visor_multimedia" / "thumbnails"
+
+
+def thumbnail_key(file_path: str, size: int, mtime_ns: int, max_side: int) -> str:
+    """Clave de caché: cambia si el archivo cambia en disco"""
+    raw = f"{file_path}\0{size}\0{mtime_ns}\0{max_side}".encode('utf-8', 'surrogateescape')
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class ThumbnailCache:
+    """
+    Miniaturas JPEG en disco
+
+    Una miniatura por (ruta, tamaño, mtime): si el archivo cambia, la
+    antigua queda huérfana en lugar de servirse obsoleta.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_side: int = THUMBNAIL_SIZE):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_THUMBNAIL_DIR
+        self.max_side = max_side
+
+    def path_for(self, file_path: str, st: Optional[os.stat_result] = None) -> Optional[Path]:
+        """Ruta de la miniatura de `file_path` (None si no existe el archivo)"""
+        try:
+            st = st or os.stat(file_path)
+        except OSError:
+            return None
+        return self.path_for_stat(file_path, st.st_size, st.st_mtime_ns)
+
+    def path_for_stat(self, file_path: str, size: int, mtime_ns: int) -> Path:
+        """Ruta de la miniatura a partir de un stat ya hecho (p. ej. en otro proceso)"""
+        key = thumbnail_key(file_path, size, mtime_ns, self.max_side)
+        return self.cache_dir / key[:2] / f"{key}.jpg"
+
+    def get(self, file_path: str) -> Optional[Path]:
+        """Miniatura ya generada, o None"""
+        path = self.path_for(file_path)
+        return path if path is not None and path.exists() else None
+
+    def generate(self, file_path: str, force: bool = False) -> str:
+        """
+        Generar la miniatura de una imagen
+
+        Returns:
+            'created', 'cached' o 'failed'
+        """
+        target = self.path_for(file_path)
+        if target is None:
+            return 'failed'
+        if target.exists() and not force:
+            return 'cached'
+        return 'created' if write_thumbnail(file_path, target, self.max_side) else 'failed'
+
+
+EXIF_FORMATS = {'JPEG', 'MPO', 'TIFF'}  # Formatos de Pillow que pueden llevar preview EXIF
+
+
+def embedded_thumbnail(path: str, info: ExifInfo, size: Tuple[int, int], max_side: int):
+    """
+    Preview EXIF reducido a miniatura, si sirve: lado mayor >= max_side y
+    la misma proporción que la imagen (hay cámaras que lo rellenan con bandas)
+
+    Returns:
+        Imagen PIL RGB, o None
+    """
+    data = read_preview(path, info)
+    if data is None:
+        return None
+    from io import BytesIO
+    from PIL import Image
+    try:
+        with Image.open(BytesIO(data)) as preview:
+            pw, ph = preview.size
+            if max(pw, ph) < max_side or abs(pw * size[1] - ph * size[0]) > 0.02 * pw * size[1]:
+                return None
+            preview.draft('RGB', (max_side, max_side))
+            preview.thumbnail((max_side, max_side))
+            return preview.convert('RGB')
+    except Exception:
+        return None
+
+
+def write_thumbnail(source: str, target: Path, max_side: int) -> bool:
+    """Decodificar `source` con Pillow y guardar la miniatura (escritura atómica)"""
+    try:
+        from PIL import Image
+        with Image.open(source) as img:
+            thumb = None
+            if img.format in EXIF_FORMATS:
+                thumb = embedded_thumbnail(source, read_exif(source), img.size, max_side)
+            if thumb is None:
+                # draft(): JPEG decodifica directamente a escala reducida
+                img.draft('RGB', (max_side, max_side))
+                img.thumbnail((max_side, max_side))
+                thumb = img.convert('RGB')
+        save_thumbnail(thumb, target)
+        return True
+    except Exception:
+        return False
+
+
+def save_thumbnail(image, target: Path):
+    """Guardar una imagen PIL ya reducida como miniatura JPEG (escritura atómica)"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    image.save(tmp, 'JPEG', quality=THUMBNAIL_QUALITY)
+    os.replace(tmp, target)
@@ -0,0 +1,110 @@
+from typing import List
+
+
+class FenwickTree:
+    """
+    Árbol de Fenwick (Binary Indexed Tree) sobre pesos no negativos
+
+    - Construcción: O(N)
+    - Cambiar o añadir un peso: O(log N)
+    - Muestrear un índice proporcional a su peso: O(log N)
+    """
+
+    # Reconstruir tras tantas actualizaciones para acotar el error de coma flotante
+    REBUILD_EVERY = 1 << 16
+
+    def __init__(self, weights: List[float]):
+        self._build(list(weights))
+
+    def _build(self, weights: List[float]):
+        """Construir el árbol en O(N)"""
+        n = len(weights)
+        self._weights = weights
+        tree = [0.0] * (n + 1)
+        for i, w in enumerate(weights, 1):
+            tree[i] += w
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._updates = 0
+
+        # Mayor potencia de 2 <= n (para el descenso en find)
+        self._top_bit = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def get(self, index: int) -> float:
+        """Peso actual de `index`"""
+        return self._weights[index]
+
+    def set(self, index: int, weight: float):
+        """Cambiar el peso de `index`"""
+        delta = weight - self._weights[index]
+        if delta == 0:
+            return
+        self._weights[index] = weight
+
+        i = index + 1
+        n = len(self._weights)
+        tree = self._tree
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+        self._updates += 1
+        if self._updates >= max(self.REBUILD_EVERY, n):
+            self._build(self._weights)
+
+    def append(self, weight: float):
+        """Añadir un peso al final en O(log N)"""
+        self._weights.append(weight)
+        n = len(self._weights)
+        tree = self._tree
+
+        # El nodo n cubre (n - lowbit(n), n]: su peso más los nodos que
+        # ya resumen el resto de ese intervalo
+        value = weight
+        stop = n - (n & -n)
+        j = n - 1
+        while j > stop:
+            value += tree[j]
+            j -= j & -j
+        tree.append(value)
+
+        self._top_bit = 1 << (n.bit_length() - 1)
+
+    def total(self) -> float:
+        """Suma de todos los pesos"""
+        total = 0.0
+        i = len(self._weights)
+        tree = self._tree
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target: float) -> int:
+        """
+        Índice cuyo intervalo acumulado contiene `target`
+
+        Con target uniforme en [0, total) devuelve índices con
+        probabilidad proporcional a su peso.
+        """
+        pos = 0
+        n = len(self._weights)
+        tree = self._tree
+        step = self._top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+
+        # Saltar pesos nulos por error de redondeo en el borde
+        index = min(pos, n - 1)
+        while index > 0 and self._weights[index] <= 0:
+            index -= 1
+        return index
@@ -1,5 +1,13 @@
-from .app import VisorApp
-from .main_window import MainWindow
+# Importación perezosa: las herramientas sin GUI (benchmarks, CLI) pueden
+# usar módulos de visor.ui sin cargar toda la interfaz ni QtMultimedia
+__all__ = ["VisorApp", "MainWindow"]
 
 
-__all__ = ["VisorApp", "MainWindow"]
+def __getattr__(name):
+    if name == "VisorApp":
+        from .app import VisorApp
+        return VisorApp
+    if name == "MainWindow":
+        from .main_window import MainWindow
+        return MainWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
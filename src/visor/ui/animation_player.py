@@ -0,0 +1,236 @@
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import (
+    Qt, QObject, QThread, QTimer, QSize, Signal,
+    QMutex, QMutexLocker, QWaitCondition
+)
+from PySide6.QtGui import QImage, QImageReader
+
+from ..services.profiler import profiler
+
+
+ANIMATED_EXTENSIONS = {".gif", ".webp"}
+ANIMATION_BUDGET_MB = 64  # Memoria máxima de fotogramas decodificados por animación
+DEFAULT_FRAME_DELAY_MS = 100  # Como los navegadores: retardos de 0-10 ms se tratan como 100
+MIN_FRAME_DELAY_MS = 20
+STALL_RETRY_MS = 5  # Reintento si el fotograma aún no está decodificado
+
+
+def is_animated(path: str) -> bool:
+    """¿Es una animación con más de un fotograma? (solo lee la cabecera)"""
+    reader = QImageReader(path)
+    return reader.supportsAnimation() and reader.imageCount() != 1
+
+
+def _frame_delay(reader: QImageReader) -> int:
+    delay = reader.nextImageDelay()
+    return delay if delay > 10 else DEFAULT_FRAME_DELAY_MS
+
+
+class FrameDecoder(QThread):
+    """
+    Decodificar los fotogramas de una animación a resolución de pantalla
+
+    Si la animación completa cabe en el presupuesto se decodifica una
+    sola vez y el reproductor la repite desde memoria. Si no, se decodifica
+    en streaming sobre un buffer circular acotado: el thread espera cuando
+    está lleno y reabre el archivo para cada vuelta.
+    """
+
+    def __init__(self, path: str, target_size: QSize, budget_bytes: int):
+        super().__init__()
+        self.path = path
+        self.target_size = target_size
+        self.budget_bytes = budget_bytes
+
+        self._mutex = QMutex()
+        self._not_full = QWaitCondition()
+        self._stopped = False
+        self._ended = False  # No habrá más fotogramas (sin bucle o error)
+
+        self.cached = False  # Animación completa en memoria
+        self.capacity = 2
+        self.loops = -1
+        self._frames: List[Tuple[QImage, int]] = []  # Modo completo: todos los fotogramas
+        self._ring: deque = deque()  # Modo streaming
+        self._complete = False
+
+    # ========================================
+    # Thread de decodificación
+    # ========================================
+
+    def _open(self) -> QImageReader:
+        reader = QImageReader(self.path)
+        if self.target_size.isValid():
+            reader.setScaledSize(self.target_size)
+        return reader
+
+    def run(self):
+        reader = self._open()
+        frame_bytes = max(1, self.target_size.width() * self.target_size.height() * 4)
+        count = reader.imageCount()
+        loops = reader.loopCount()  # -1 = infinito, 0 = una sola vez
+
+        with QMutexLocker(self._mutex):
+            self.loops = loops
+            self.cached = 0 < count * frame_bytes <= self.budget_bytes
+            self.capacity = count if self.cached else max(2, self.budget_bytes // frame_bytes)
+
+        played = 0
+        while not self._is_stopped():
+            decoded = 0
+            while reader.canRead() and not self._is_stopped():
+                with profiler.span("animation.decode_frame"):
+                    image = reader.read()
+                if image.isNull():
+                    break
+                delay = _frame_delay(reader)
+                # Formato de pintado nativo: QPixmap.fromImage sin conversión
+                image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+                if not self._push(image, delay):
+                    return
+                decoded += 1
+
+            played += 1
+            if self.cached or decoded == 0 or (0 <= loops < played):
+                break
+            reader = self._open()  # Streaming: otra vuelta desde el principio
+
+        with QMutexLocker(self._mutex):
+            if self.cached and self._frames:
+                self._complete = True
+            else:
+                self._ended = True
+
+    def _push(self, image: QImage, delay: int) -> bool:
+        """Añadir un fotograma; en streaming espera hueco. False si se detuvo"""
+        with QMutexLocker(self._mutex):
+            if self.cached:
+                self._frames.append((image, delay))
+                return not self._stopped
+            while len(self._ring) >= self.capacity and not self._stopped:
+                self._not_full.wait(self._mutex)
+            if self._stopped:
+                return False
+            self._ring.append((image, delay))
+            return True
+
+    def _is_stopped(self) -> bool:
+        with QMutexLocker(self._mutex):
+            return self._stopped
+
+    # ========================================
+    # API para el reproductor (thread de la UI)
+    # ========================================
+
+    def take(self, index: int) -> Tuple[Optional[Tuple[QImage, int]], bool]:
+        """
+        Fotograma número `index` de la reproducción
+
+        Returns:
+            (fotograma o None si aún no está listo, ¿terminó la animación?)
+        """
+        with QMutexLocker(self._mutex):
+            if self.cached:
+                if self._complete:
+                    count = len(self._frames)
+                    if 0 <= self.loops and index >= count * (self.loops + 1):
+                        return None, True
+                    return self._frames[index % count], False
+                if index < len(self._frames):
+                    return self._frames[index], False
+                return None, self._ended
+            if self._ring:
+                frame = self._ring.popleft()
+                self._not_full.wakeOne()
+                return frame, False
+            return None, self._ended
+
+    def stop(self):
+        """Detener el thread y liberar los fotogramas"""
+        with QMutexLocker(self._mutex):
+            self._stopped = True
+            self._not_full.wakeAll()
+        self.wait()
+        self._frames = []
+        self._ring.clear()
+
+
+class AnimationPlayer(QObject):
+    """
+    Reproductor de GIF/WebP animados
+
+    Los fotogramas llegan ya escalados desde FrameDecoder; el calendario
+    se calcula sobre tiempos absolutos (inicio + suma de retardos) para
+    que los retrasos de un fotograma no se acumulen.
+    """
+
+    frameReady = Signal(QImage)
+
+    def __init__(self, parent=None, budget_mb: int = ANIMATION_BUDGET_MB):
+        super().__init__(parent)
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self._decoder: Optional[FrameDecoder] = None
+        self._index = 0
+        self._due = 0.0  # Instante (monotonic) del próximo fotograma
+        self.stalls = 0  # Fotogramas que no estaban listos a tiempo
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def play(self, path: str, max_size: QSize) -> bool:
+        """Reproducir `path` escalado para caber en `max_size`; False si no se puede leer"""
+        self.stop()
+        reader = QImageReader(path)
+        size = reader.size()
+        if not size.isValid():
+            return False
+        if size.width() > max_size.width() or size.height() > max_size.height():
+            size = size.scaled(max_size, Qt.KeepAspectRatio)
+
+        self._decoder = FrameDecoder(path, size, self.budget_bytes)
+        self._decoder.start()
+        self._index = 0
+        self.stalls = 0
+        self._due = time.monotonic()
+        self._timer.start(0)
+        return True
+
+    def is_playing(self) -> bool:
+        return self._decoder is not None
+
+    def is_cached(self) -> bool:
+        """¿Animación completa en memoria (se repite sin decodificar)?"""
+        return self._decoder is not None and self._decoder.cached
+
+    def _tick(self):
+        if self._decoder is None:
+            return
+        frame, ended = self._decoder.take(self._index)
+        if frame is None:
+            if not ended:
+                # El decodificador va por detrás: esperar sin adelantar el calendario
+                self.stalls += 1
+                self._timer.start(STALL_RETRY_MS)
+            return
+
+        image, delay = frame
+        self.frameReady.emit(image)
+        self._index += 1
+
+        now = time.monotonic()
+        self._due += max(delay, MIN_FRAME_DELAY_MS) / 1000
+        if self._due < now:
+            self._due = now  # Muy atrasados: no intentar recuperar a ráfagas
+        self._timer.start(int((self._due - now) * 1000))
+
+    def stop(self):
+        """Detener la reproducción y el decodificador"""
+        self._timer.stop()
+        if self._decoder is not None:
+            self._decoder.stop()
+            self._decoder = None
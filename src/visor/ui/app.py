@@ -1,34 +1,80 @@
 import os
 import sys
+import json
 import platform
 from pathlib import Path
 
-# Configuración específica por plataforma
-if platform.system() == "Linux":
-    # Verificar si libxcb-cursor está disponible
-    xcb_cursor_available = False
-    
-    # Rutas comunes donde buscar la librería
-    lib_paths = [
-        "/usr/lib/x86_64-linux-gnu",
-        "/usr/lib",
-        "/usr/lib64",
-        "/lib/x86_64-linux-gnu",
-        "/lib",
-        "/lib64"
-    ]
-    
-    for lib_path in lib_paths:
+from PySide6.QtWidgets import QApplication
+
+from ..services.profiler import startup
+
+
+# Rutas comunes donde buscar libxcb-cursor
+XCB_LIB_PATHS = [
+    "/usr/lib/x86_64-linux-gnu",
+    "/usr/lib",
+    "/usr/lib64",
+    "/lib/x86_64-linux-gnu",
+    "/lib",
+    "/lib64"
+]
+
+PLATFORM_CACHE_PATH = Path.home() / ".visor_multimedia_platform.json"
+
+
+def _lib_dirs_signature() -> list:
+    """mtime de los directorios de librerías: cambia al instalar o borrar una"""
+    signature = []
+    for lib_path in XCB_LIB_PATHS:
+        try:
+            signature.append([lib_path, os.stat(lib_path).st_mtime_ns])
+        except OSError:
+            continue
+    return signature
+
+
+def _find_xcb_cursor() -> bool:
+    """Buscar libxcb-cursor.so* en los directorios conocidos"""
+    for lib_path in XCB_LIB_PATHS:
         if Path(lib_path).exists():
-            # Buscar libxcb-cursor.so*
-            for file in Path(lib_path).glob("libxcb-cursor.so*"):
-                xcb_cursor_available = True
-                break
-        if xcb_cursor_available:
-            break
-    
+            for _ in Path(lib_path).glob("libxcb-cursor.so*"):
+                return True
+    return False
+
+
+def probe_xcb_cursor() -> bool:
+    """
+    ¿Está disponible libxcb-cursor?
+
+    El resultado se cachea en disco junto con los mtime de los
+    directorios de librerías; solo se vuelve a buscar si alguno cambia.
+    """
+    signature = _lib_dirs_signature()
+    try:
+        with open(PLATFORM_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        if cached.get('signature') == signature:
+            return bool(cached['xcb_cursor'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    available = _find_xcb_cursor()
+    try:
+        with open(PLATFORM_CACHE_PATH, 'w') as f:
+            json.dump({'signature': signature, 'xcb_cursor': available}, f)
+    except OSError:
+        pass
+    return available
+
+
+def configure_platform():
+    """Elegir plataforma Qt antes de crear la QApplication"""
+    # Respetar una plataforma elegida por el usuario (p. ej. offscreen)
+    if platform.system() != "Linux" or os.environ.get('QT_QPA_PLATFORM'):
+        return
+
     # Solo usar X11 si la librería está disponible
-    if xcb_cursor_available:
+    if probe_xcb_cursor():
         os.environ['QT_QPA_PLATFORM'] = 'xcb'
         print("✓ Usando X11 (xcb)")
     else:
@@ -36,24 +82,29 @@ if platform.system() == "Linux":
         print("⚠ libxcb-cursor no encontrada, usando Wayland")
         # No establecer QT_QPA_PLATFORM, Qt elegirá automáticamente
 
-from PySide6.QtWidgets import QApplication
-from .main_window import MainWindow
-
 
 class VisorApp(QApplication):
     def __init__(self, argv):
+        configure_platform()
+        startup.mark("platform probe")
+
         super().__init__(argv)
-        
+        startup.mark("QApplication")
+
         # Configuraciones multiplataforma
         self.setApplicationName("Visor Multimedia")
         self.setOrganizationName("TuNombre")
-        
+
         # Información de depuración
         print(f"Sistema: {platform.system()}")
         print(f"Plataforma Qt: {self.platformName()}")
-        
+
+        from .main_window import MainWindow
+        startup.mark("import main_window")
+
         self.main_window = MainWindow()
-    
+        startup.mark("MainWindow")
+
     def run(self):
         self.main_window.show()
         return self.exec()
@@ -61,4 +112,4 @@ class VisorApp(QApplication):
 
 if __name__ == "__main__":
     app = VisorApp(sys.argv)
-    sys.exit(app.run())
\ No newline at end of file
+    sys.exit(app.run())
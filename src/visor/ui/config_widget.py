@@ -1,21 +1,30 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QSpinBox, QPushButton, QGroupBox, QFrame
+    QSpinBox, QDoubleSpinBox, QComboBox, QPushButton, QGroupBox, QFrame
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer
 
 
 class ConfigWidget(QWidget):
     """Widget para configurar cooldowns de navegación"""
     
     # Señales
-    configChanged = Signal(int, int, int)  # (positive, neutral, negative)
-
-    historyLimitChanged = Signal(int)
+    # Configuración completa, emitida una sola vez cuando el usuario deja
+    # de editar (claves de NavigationSystem.apply_config)
+    configCommitted = Signal(dict)
+    
+    COMMIT_DELAY_MS = 400  # Espera tras la última edición antes de aplicar
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
+        # Debounce: mantener pulsada una flecha del spin box no dispara
+        # una aplicación + guardado por cada tick
+        self._commit_timer = QTimer(self)
+        self._commit_timer.setSingleShot(True)
+        self._commit_timer.setInterval(self.COMMIT_DELAY_MS)
+        self._commit_timer.timeout.connect(self._commit)
+        
         self._setup_ui()
         
     def _setup_ui(self):
@@ -55,7 +64,7 @@ class ConfigWidget(QWidget):
         self.positive_spin.setValue(5)
         self.positive_spin.setSuffix(" archivos")
         self.positive_spin.setSpecialValueText("Nunca")
-        self.positive_spin.valueChanged.connect(self._on_config_changed)
+        self.positive_spin.valueChanged.connect(self._schedule_commit)
         positive_layout.addWidget(self.positive_spin)
         
         layout.addWidget(positive_group)
@@ -71,7 +80,7 @@ class ConfigWidget(QWidget):
         self.neutral_spin.setValue(20)
         self.neutral_spin.setSuffix(" archivos")
         self.neutral_spin.setSpecialValueText("Nunca")
-        self.neutral_spin.valueChanged.connect(self._on_config_changed)
+        self.neutral_spin.valueChanged.connect(self._schedule_commit)
         neutral_layout.addWidget(self.neutral_spin)
         
         layout.addWidget(neutral_group)
@@ -87,7 +96,7 @@ class ConfigWidget(QWidget):
         self.negative_spin.setValue(0)
         self.negative_spin.setSuffix(" archivos")
         self.negative_spin.setSpecialValueText("Nunca")
-        self.negative_spin.valueChanged.connect(self._on_config_changed)
+        self.negative_spin.valueChanged.connect(self._schedule_commit)
         negative_layout.addWidget(self.negative_spin)
         
         layout.addWidget(negative_group)
@@ -103,11 +112,55 @@ class ConfigWidget(QWidget):
         self.history_spin.setValue(1000)
         self.history_spin.setSingleStep(100)
         self.history_spin.setToolTip("Cuántos archivos recordar al navegar hacia atrás")
-        self.history_spin.valueChanged.connect(self._on_history_changed)
+        self.history_spin.valueChanged.connect(self._schedule_commit)
         history_layout.addWidget(self.history_spin)
 
         layout.addWidget(history_group)
         
+        # --- Selección ---
+        selection_group = QGroupBox("🎲 Selección")
+        selection_layout = QVBoxLayout(selection_group)
+        
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Modo:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Uniforme", "uniform")
+        self.mode_combo.addItem("Ponderada por votos", "weighted")
+        self.mode_combo.addItem("Bolsa (todos antes de repetir)", "shuffle")
+        self.mode_combo.setToolTip(
+            "Ponderada: los positivos aparecen más a menudo\n"
+            "Bolsa: se muestra toda la biblioteca antes de repetir"
+        )
+        self.mode_combo.currentIndexChanged.connect(self._schedule_commit)
+        mode_layout.addWidget(self.mode_combo)
+        selection_layout.addLayout(mode_layout)
+        
+        weight_layout = QHBoxLayout()
+        weight_layout.addWidget(QLabel("Peso 👍:"))
+        self.positive_weight_spin = QDoubleSpinBox()
+        self.positive_weight_spin.setRange(0.1, 20.0)
+        self.positive_weight_spin.setSingleStep(0.5)
+        self.positive_weight_spin.setValue(3.0)
+        self.positive_weight_spin.setSuffix(" x")
+        self.positive_weight_spin.setToolTip("Probabilidad de un positivo respecto a un neutral")
+        self.positive_weight_spin.valueChanged.connect(self._schedule_commit)
+        weight_layout.addWidget(self.positive_weight_spin)
+        selection_layout.addLayout(weight_layout)
+        
+        decay_layout = QHBoxLayout()
+        decay_layout.addWidget(QLabel("Recuperar peso en:"))
+        self.decay_spin = QSpinBox()
+        self.decay_spin.setRange(0, 1000)
+        self.decay_spin.setValue(0)
+        self.decay_spin.setSuffix(" archivos")
+        self.decay_spin.setSpecialValueText("Inmediato")
+        self.decay_spin.setToolTip("Tras mostrarse, el peso se recupera gradualmente")
+        self.decay_spin.valueChanged.connect(self._schedule_commit)
+        decay_layout.addWidget(self.decay_spin)
+        selection_layout.addLayout(decay_layout)
+        
+        layout.addWidget(selection_group)
+        
         # Separador
         line2 = QFrame()
         line2.setFrameShape(QFrame.HLine)
@@ -220,26 +273,41 @@ class ConfigWidget(QWidget):
         
 
     
-    def _on_config_changed(self):
-        """Emitir señal cuando cambia la configuración"""
-        self.configChanged.emit(
-            self.positive_spin.value(),
-            self.neutral_spin.value(),
-            self.negative_spin.value()
-        )
-        self.historyLimitChanged.emit(self.history_spin.value())
-
-    def _on_history_changed(self, value):
-        """Emitir señal cuando cambia el límite de historial"""
-        self.historyLimitChanged.emit(value)
+    def _schedule_commit(self):
+        """Reiniciar la espera; se aplica cuando cesan las ediciones"""
+        self._commit_timer.start()
+    
+    def _commit(self):
+        """Emitir la configuración completa de una vez"""
+        self._commit_timer.stop()
+        self.configCommitted.emit(self.get_config_dict())
+    
+    def flush(self):
+        """Aplicar ya las ediciones pendientes (p. ej. al cerrar)"""
+        if self._commit_timer.isActive():
+            self._commit()
+    
+    def _set_values_silently(self, values):
+        """Cambiar varios controles sin disparar una aplicación por cada uno"""
+        for widget, value in values:
+            widget.blockSignals(True)
+            if isinstance(widget, QComboBox):
+                index = widget.findData(value)
+                if index >= 0:
+                    widget.setCurrentIndex(index)
+            else:
+                widget.setValue(value)
+            widget.blockSignals(False)
     
     def set_config(self, positive: int, neutral: int, negative: int, history: int = 1000):
-        """Establecer configuración"""
-        self.positive_spin.setValue(positive)
-        self.neutral_spin.setValue(neutral)
-        self.negative_spin.setValue(negative)
-        self.history_spin.setValue(history)
-        self._on_config_changed()
+        """Establecer configuración (se aplica inmediatamente)"""
+        self._set_values_silently([
+            (self.positive_spin, positive),
+            (self.neutral_spin, neutral),
+            (self.negative_spin, negative),
+            (self.history_spin, history),
+        ])
+        self._commit()
 
     def set_history_limit(self, limit: int):
         """Establecer límite de historial"""
@@ -249,6 +317,36 @@ class ConfigWidget(QWidget):
         """Obtener límite de historial"""
         return self.history_spin.value()
     
+    def set_selection_config(self, mode: str, positive_weight: float = 3.0, decay_steps: int = 0):
+        """Establecer modo de selección (sin aplicar)"""
+        self._set_values_silently([
+            (self.mode_combo, mode),
+            (self.positive_weight_spin, positive_weight),
+            (self.decay_spin, decay_steps),
+        ])
+
+    def get_selection_config(self) -> tuple:
+        """Obtener modo de selección actual"""
+        return (
+            self.mode_combo.currentData(),
+            self.positive_weight_spin.value(),
+            self.decay_spin.value()
+        )
+    
+    def get_config_dict(self) -> dict:
+        """Configuración completa con las claves de NavigationSystem.apply_config"""
+        pos, neu, neg, hist = self.get_config()
+        mode, positive_weight, decay_steps = self.get_selection_config()
+        return {
+            'positive_cooldown': pos,
+            'neutral_cooldown': neu,
+            'negative_cooldown': neg,
+            'max_history': hist,
+            'selection_mode': mode,
+            'positive_weight': positive_weight,
+            'decay_steps': decay_steps,
+        }
+    
     def get_config(self) -> tuple:
         """Obtener configuración actual"""
         return (
@@ -0,0 +1,121 @@
+from typing import Optional
+
+from PySide6.QtGui import QImage
+
+
+# Modo Pillow -> (modo que Pillow puede mapear sobre memoria ajena, formato QImage
+# con la misma disposición de bytes). Pillow guarda RGB en 4 bytes por píxel
+# (R, G, B, 255): exactamente Format_RGBX8888
+_SHARED_LAYOUTS = {
+    'RGB': ('RGBX', QImage.Format_RGBX8888),
+    'RGBA': ('RGBA', QImage.Format_RGBA8888),
+    'L': ('L', QImage.Format_Grayscale8),
+}
+
+
+class ImageBuffer:
+    """
+    Píxeles de un QImage compartidos con Pillow y NumPy sin copiar
+
+    El QImage es el propietario de la memoria: Pillow decodifica sobre
+    ella (Image.frombuffer mapeado sobre QImage.bits()) y NumPy puede
+    verla con np.frombuffer(buffer.memory(), np.uint8). Como la memoria
+    es del QImage, se puede pasar a otro thread por señal sin riesgo.
+
+    `copies` cuenta las copias completas de los píxeles hechas hasta
+    ahora; el visor suma la conversión a QPixmap al mostrarla.
+    """
+
+    def __init__(self, image: QImage, copies: int = 0, owner=None):
+        self.image = image
+        self.copies = copies
+        self._owner = owner  # Buffer externo que mantener vivo (from_buffer)
+
+    @classmethod
+    def from_buffer(cls, data, width: int, height: int, bytes_per_line: int,
+                    fmt: QImage.Format) -> 'ImageBuffer':
+        """
+        Ver un buffer ajeno (array de NumPy, bytearray, mmap) como QImage
+
+        El QImage solo es válido mientras viva este ImageBuffer; para
+        entregarlo a otro thread, usar detach().
+        """
+        view = memoryview(data)
+        return cls(QImage(view, width, height, bytes_per_line, fmt), owner=view)
+
+    def detach(self) -> 'ImageBuffer':
+        """Copia con memoria propia (necesaria si los píxeles son de otro)"""
+        if self._owner is None:
+            return self
+        return ImageBuffer(self.image.copy(), self.copies + 1)
+
+    def memory(self) -> memoryview:
+        """Píxeles como memoryview escribible (filas de bytesPerLine bytes)"""
+        return self.image.bits()
+
+    # ========================================
+    # Pillow
+    # ========================================
+
+    @classmethod
+    def _allocate_for(cls, mode: str, size) -> Optional['ImageBuffer']:
+        layout = _SHARED_LAYOUTS.get(mode)
+        if layout is None:
+            return None
+        return cls(QImage(size[0], size[1], layout[1]))
+
+    def _pil_view(self, mode: str):
+        """Imagen Pillow (núcleo) mapeada sobre los píxeles del QImage"""
+        from PIL import Image
+
+        raw = _SHARED_LAYOUTS[mode][0]
+        view = Image.frombuffer(
+            raw, (self.image.width(), self.image.height()), self.memory(),
+            'raw', raw, self.image.bytesPerLine(), 1
+        )
+        core = view.im
+        if core.mode != mode:
+            core.setmode(mode)  # RGBX -> RGB: misma disposición en memoria
+        return core
+
+    @classmethod
+    def decode(cls, image) -> 'ImageBuffer':
+        """
+        Decodificar una imagen Pillow recién abierta (tras draft(), si
+        procede) directamente sobre la memoria de un QImage: cero copias
+
+        Si el modo no se puede compartir o Pillow no admite el mapeo,
+        decodifica normalmente y copia (from_pil).
+        """
+        buffer = cls._allocate_for(image.mode, image.size) if getattr(image, 'tile', None) else None
+        if buffer is not None:
+            try:
+                image.im = buffer._pil_view(image.mode)  # load() reutiliza este núcleo
+                image.load()
+                return buffer
+            except (AttributeError, ValueError, TypeError):
+                pass
+        image.load()
+        return cls.from_pil(image)
+
+    @classmethod
+    def from_pil(cls, image) -> 'ImageBuffer':
+        """Copiar una imagen Pillow ya decodificada a un QImage (una copia)"""
+        if image.mode not in _SHARED_LAYOUTS:
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+            copies = 1
+        else:
+            copies = 0
+
+        buffer = cls._allocate_for(image.mode, image.size)
+        try:
+            buffer._pil_view(image.mode).paste(image.im, (0, 0) + image.size)
+            buffer.copies = copies + 1
+            return buffer
+        except (AttributeError, ValueError, TypeError):
+            # Sin mapeo: tobytes() y copia a memoria propia del QImage
+            raw, fmt = _SHARED_LAYOUTS[image.mode]
+            data = image.tobytes('raw', raw)
+            qimage = QImage(data, image.width, image.height, len(data) // image.height, fmt)
+            return cls(qimage.copy(), copies + 2)
@@ -0,0 +1,107 @@
+from typing import Tuple
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QTransform
+
+
+# Dimensión máxima de decodificación (8K); las imágenes mayores se
+# decodifican ya reducidas para no disparar la memoria
+MAX_DIMENSION = 7680
+
+
+def read_image(path: str, max_dimension: int = MAX_DIMENSION) -> Tuple[QImage, str]:
+    """
+    Decodificar imagen limitando su tamaño
+
+    Returns:
+        (imagen, mensaje de error). La imagen es nula si falla.
+    """
+    reader = QImageReader(path)
+    if not reader.canRead():
+        return QImage(), f"No se puede leer la imagen:\n{path}"
+    
+    original_size = reader.size()
+    
+    # Escalar si es necesario (el decodificador reduce directamente)
+    if original_size.width() > max_dimension or original_size.height() > max_dimension:
+        if original_size.width() > original_size.height():
+            scale_factor = max_dimension / original_size.width()
+        else:
+            scale_factor = max_dimension / original_size.height()
+        
+        new_width = int(original_size.width() * scale_factor)
+        new_height = int(original_size.height() * scale_factor)
+        
+        reader.setScaledSize(QSize(new_width, new_height))
+        print(f"Imagen redimensionada de {original_size.width()}x{original_size.height()} a {new_width}x{new_height}")
+    
+    image = reader.read()
+    
+    if image.isNull():
+        return image, f"Error al cargar imagen:\n{reader.errorString()}"
+    
+    return image, ""
+
+
+# Orientación EXIF (1-8) -> matriz (m11, m12, m21, m22) que la corrige
+_ORIENTATION_MATRICES = {
+    2: (-1, 0, 0, 1),   # Espejo horizontal
+    3: (-1, 0, 0, -1),  # 180°
+    4: (1, 0, 0, -1),   # Espejo vertical
+    5: (0, 1, 1, 0),    # Trasponer
+    6: (0, 1, -1, 0),   # 90° horario
+    7: (0, -1, -1, 0),  # Trasponer en la otra diagonal
+    8: (0, -1, 1, 0),   # 90° antihorario
+}
+
+
+def orientation_transform(orientation: int) -> QTransform:
+    """Transformación que endereza una imagen con la orientación EXIF dada"""
+    m11, m12, m21, m22 = _ORIENTATION_MATRICES.get(orientation, (1, 0, 0, 1))
+    return QTransform(m11, m12, m21, m22, 0, 0)
+
+
+def fit_pixmap(pixmap: QPixmap, size: QSize, orientation: int = 1) -> QPixmap:
+    """
+    Escalar `pixmap` para caber en `size` y aplicar la orientación EXIF
+
+    Se escala primero y se gira después: el giro solo copia la versión
+    ya reducida, nunca la imagen completa.
+    """
+    if orientation >= 5:
+        size = size.transposed()
+    scaled = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    if orientation in _ORIENTATION_MATRICES:
+        scaled = scaled.transformed(orientation_transform(orientation))
+    return scaled
+
+
+# Formatos de 32 bits que se pintan sin conversión
+_PIXEL_CACHE_FORMATS = (
+    QImage.Format_RGB32, QImage.Format_ARGB32, QImage.Format_ARGB32_Premultiplied
+)
+
+
+def image_from_slot(slot) -> QImage:
+    """
+    QImage sobre los píxeles de un hueco de PixelCache, sin copiarlos
+
+    Solo es válido mientras el hueco siga fijado (antes de slot.release()).
+    """
+    return QImage(slot.view, slot.width, slot.height, slot.bytes_per_line, QImage.Format(slot.format))
+
+
+def store_in_pixel_cache(cache, path: str, image: QImage, priority=None) -> bool:
+    """Guardar `image` en la caché de píxeles a resolución de pantalla"""
+    if priority is not None and priority <= 0:
+        return cache.put(path, 0, 0, 0, 0, b"", priority)  # No se admite: sin escalar
+    if image.width() > cache.slot_width or image.height() > cache.slot_height:
+        image = image.scaled(
+            cache.slot_width, cache.slot_height, Qt.KeepAspectRatio, Qt.SmoothTransformation
+        )
+    if image.format() not in _PIXEL_CACHE_FORMATS:
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return cache.put(
+        path, image.width(), image.height(), image.bytesPerLine(),
+        image.format().value, image.constBits(), priority
+    )
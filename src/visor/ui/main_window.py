@@ -2,19 +2,25 @@ from PySide6.QtWidgets import (
     QMainWindow, QWidget, QSplitter, QVBoxLayout,
     QTabWidget, QMessageBox
 )
-from PySide6.QtCore import Qt
-import json
+import os
+from PySide6.QtCore import Qt, QTimer, QEvent, Signal
 from pathlib import Path
 
 from .viewer_container import ViewerContainer
 from .sidebar_widget import SidebarWidget
 from .config_widget import ConfigWidget
+from .slideshow import SlideshowScheduler
 from ..services.navigation_system import NavigationSystem
+from ..services.settings_store import SettingsStore
+from ..services.profiler import profiler, startup, traced
 
 
 class MainWindow(QMainWindow):
     """Ventana principal con sistema de navegación integrado"""
     
+    # Configuración y votos cargados (tras el primer pintado)
+    startupFinished = Signal()
+    
     def __init__(self):
         super().__init__()
         
@@ -24,12 +30,82 @@ class MainWindow(QMainWindow):
         # Sistema de navegación
         self.nav_system = None
         self._loaded_settings = None
+        self._settings_store = SettingsStore()
+        self._duplicate_groups = []
+        self._file_mtimes = {}  # Fechas llegadas antes de crear la navegación
+        
+        # Guardado diferido de la sesión (agrupa navegaciones seguidas)
+        self._session_timer = QTimer(self)
+        self._session_timer.setSingleShot(True)
+        self._session_timer.setInterval(2000)
+        self._session_timer.timeout.connect(self._save_session)
 
-        # CARGAR CONFIGURACIÓN ANTES DE SETUP UI
-        self._load_settings()
+        # La configuración y los votos (JSON potencialmente grande) se
+        # cargan después del primer pintado: la ventana aparece antes
+        self._settings_applied = False
+        self._first_paint_seen = False
         
         self._setup_ui()
+        
+        # Presentación automática (P para iniciar/detener, +/- ritmo)
+        self._slideshow = SlideshowScheduler(
+            lookahead=self._slideshow_lookahead,
+            advance=self._slideshow_advance,
+            prefetch=lambda paths, deadlines: self.viewer.prefetch_neighbors(paths, (), deadlines),
+            is_ready=self.viewer.is_decoded,
+            latency=self.viewer.decode_latency,
+            give_up=self.viewer.drop_neighbor,
+            parent=self
+        )
+        
+        # →/← mantenidos: los pasos se acumulan y solo se decodifica el
+        # archivo en el que está la navegación cuando vence este plazo
+        self._skip_timer = QTimer(self)
+        self._skip_timer.setSingleShot(True)
+        self._skip_timer.setInterval(self.SKIP_RENDER_MS)
+        self._skip_timer.timeout.connect(self._render_skipped)
+        self._skip_forward = True
+        
         self._connect_signals()
+        self.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        """Detectar el primer pintado para diferir la carga de configuración"""
+        if obj is self and event.type() == QEvent.Paint and not self._first_paint_seen:
+            self._first_paint_seen = True
+            self.removeEventFilter(self)
+            startup.mark(startup.FIRST_PAINT)
+            QTimer.singleShot(0, self._finish_startup)
+        return super().eventFilter(obj, event)
+    
+    def _finish_startup(self):
+        """Cargar configuración y votos guardados (idempotente)"""
+        if self._settings_applied:
+            return
+        self._settings_applied = True
+        
+        self._load_settings()
+        startup.mark("load settings")
+        self._apply_loaded_settings()
+        startup.mark("apply settings")
+        
+        # Biblioteca de la sesión anterior: disponible al instante
+        if self.sidebar.restore_library():
+            startup.mark("restore library")
+            self._resume_last_file()
+        self.startupFinished.emit()
+    
+    def _resume_last_file(self):
+        """Volver a mostrar el archivo en el que se quedó la sesión anterior"""
+        if not self._create_nav_system():
+            return
+        
+        current = self.nav_system.get_current()
+        if current and os.path.exists(current):
+            self.viewer.show_file(current)
+            self.viewer.set_current_vote(self.nav_system.get_vote(current))
+            startup.mark("first image")
+        self._update_status()
     
     def _setup_ui(self):
         """Configurar interfaz"""
@@ -48,24 +124,9 @@ class MainWindow(QMainWindow):
         
         self.sidebar = SidebarWidget()
         sidebar_tabs.addTab(self.sidebar, "📁 Archivos")
-
-        # CREAR NAV_SYSTEM TEMPORAL CON VOTOS GUARDADOS
-        if self._loaded_settings and 'votes' in self._loaded_settings:
-            temp_nav = NavigationSystem([], max_history=100)
-            temp_nav.votes = self._loaded_settings['votes'].copy()
-            self.sidebar.set_navigation_system(temp_nav)
         
         self.config_widget = ConfigWidget()
         sidebar_tabs.addTab(self.config_widget, "⚙️ Configuración")
-
-        if self._loaded_settings:
-            if 'positive_cooldown' in self._loaded_settings:
-                self.config_widget.set_config(
-                    self._loaded_settings.get('positive_cooldown', 5),
-                    self._loaded_settings.get('neutral_cooldown', 20),
-                    self._loaded_settings.get('negative_cooldown', 0),
-                    self._loaded_settings.get('max_history', 1000)
-                )
         
         # Visor
         self.viewer = ViewerContainer()
@@ -79,52 +140,155 @@ class MainWindow(QMainWindow):
         
         self.statusBar().showMessage("Listo - Añade directorios para comenzar")
     
+    def _apply_loaded_settings(self):
+        """Volcar la configuración cargada en el sidebar y el panel de configuración"""
+        if not self._loaded_settings:
+            return
+        
+        # CREAR NAV_SYSTEM TEMPORAL CON VOTOS GUARDADOS
+        if 'votes' in self._loaded_settings and self.nav_system is None:
+            temp_nav = NavigationSystem([], max_history=100)
+            temp_nav.votes = self._loaded_settings['votes'].copy()
+            self.sidebar.set_navigation_system(temp_nav)
+        
+        # Sin señales: es la configuración ya guardada, no hay que re-guardarla
+        self.config_widget.blockSignals(True)
+        try:
+            if 'positive_cooldown' in self._loaded_settings:
+                self.config_widget.set_config(
+                    self._loaded_settings.get('positive_cooldown', 5),
+                    self._loaded_settings.get('neutral_cooldown', 20),
+                    self._loaded_settings.get('negative_cooldown', 0),
+                    self._loaded_settings.get('max_history', 1000)
+                )
+            if 'selection_mode' in self._loaded_settings:
+                self.config_widget.set_selection_config(
+                    self._loaded_settings.get('selection_mode', 'uniform'),
+                    self._loaded_settings.get('positive_weight', 3.0),
+                    self._loaded_settings.get('decay_steps', 0)
+                )
+        finally:
+            self.config_widget.blockSignals(False)
+    
     def _connect_signals(self):
         """Conectar señales"""
         self.sidebar.fileSelected.connect(self._on_file_selected_from_list)
+        self.sidebar.duplicatesFound.connect(self._on_duplicates_found)
+        self.sidebar.mtimesFound.connect(self._on_mtimes_found)
+        self.sidebar.filterChanged.connect(self._on_filter_changed)
+        self.sidebar.filesAdded.connect(self._on_files_added)
+        self.sidebar.libraryChanged.connect(self._on_library_changed)
+        self.sidebar.sequentialChanged.connect(self._on_sequential_changed)
         self.viewer.requestNext.connect(self._next_random)
         self.viewer.requestPrevious.connect(self._go_back)
+        self.viewer.requestSkip.connect(self._skip)
         self.viewer.voteChanged.connect(self._on_vote_changed)
-        self.config_widget.configChanged.connect(self._on_config_changed)
+        self.viewer.slideshowToggled.connect(self._toggle_slideshow)
+        self.viewer.slideshowSpeed.connect(self._slideshow.step_period)
+        self._slideshow.statsChanged.connect(self._on_slideshow_stats)
+        self._slideshow.stopped.connect(self._on_slideshow_stopped)
+        self.config_widget.configCommitted.connect(self._on_config_committed)
         self.config_widget.resetPositive.connect(self._on_reset_positive)
         self.config_widget.resetNegative.connect(self._on_reset_negative)
         self.config_widget.resetAll.connect(self._on_reset_all)
-        self.config_widget.historyLimitChanged.connect(self._on_history_limit_changed)
     
-    def _on_file_selected_from_list(self, file_path: str):
-        """Archivo seleccionado desde la lista"""
-        if self.nav_system is None:
-            files = self.sidebar.get_all_files()
-            if not files:
-                return
+    def _create_nav_system(self) -> bool:
+        """Crear el sistema de navegación con los archivos del sidebar"""
+        files = self.sidebar.get_all_files()
+        if not files:
+            return False
+        
+        # Los votos guardados deben estar cargados antes de crear el sistema
+        self._finish_startup()
+        
+        # Verificar si el sidebar ya tiene un nav_system temporal
+        if self.sidebar._nav_system is not None:
+            # Reutilizar el temporal (que ya tiene los votos)
+            self.nav_system = self.sidebar._nav_system
+            self.nav_system.update_file_list(files)
+        else:
+            # Crear nuevo
+            self.nav_system = NavigationSystem(files)
             
-            pos, neu, neg, hist = self.config_widget.get_config()
+            # Cargar votos guardados si existen
+            if self._loaded_settings and 'votes' in self._loaded_settings:
+                self.nav_system.import_data(self._loaded_settings)
             
-            # Verificar si el sidebar ya tiene un nav_system temporal
-            if self.sidebar._nav_system is not None:
-                # Reutilizar el temporal (que ya tiene los votos)
-                self.nav_system = self.sidebar._nav_system
-                self.nav_system.update_file_list(files)
-                self.nav_system.max_history = hist
-                self.nav_system.set_positive_cooldown(pos)
-                self.nav_system.set_neutral_cooldown(neu)
-                self.nav_system.set_negative_cooldown(neg)
-            else:
-                # Crear nuevo
-                self.nav_system = NavigationSystem(
-                    files,
-                    positive_cooldown=pos,
-                    neutral_cooldown=neu,
-                    negative_cooldown=neg,
-                    max_history=hist
-                )
-                
-                # Cargar votos guardados si existen
-                if self._loaded_settings and 'votes' in self._loaded_settings:
-                    self.nav_system.import_data(self._loaded_settings)
-                
-                # Conectar sidebar con nav_system
-                self.sidebar.set_navigation_system(self.nav_system)
+            # Conectar sidebar con nav_system
+            self.sidebar.set_navigation_system(self.nav_system)
+        
+        # La configuración vigente es la del widget (una sola transacción)
+        self.nav_system.apply_config(**self.config_widget.get_config_dict())
+        
+        if self._duplicate_groups:
+            self.nav_system.set_duplicate_groups(self._duplicate_groups)
+        
+        if self._file_mtimes:
+            self.nav_system.set_file_mtimes(self._file_mtimes)
+            self._file_mtimes = {}
+        self.nav_system.set_filter(self.sidebar.current_filter())
+        
+        # Retomar la sesión anterior (historial, posición, cooldowns, RNG)
+        self._load_session()
+        
+        # Las cachés de imágenes retienen lo que la navegación volverá a mostrar
+        self.viewer.set_cache_priority(self.nav_system.recurrence_priority)
+        
+        return True
+    
+    def _on_duplicates_found(self, groups: list):
+        """Grupos de duplicados detectados en segundo plano"""
+        self._duplicate_groups = groups
+        if self.nav_system:
+            self.nav_system.set_duplicate_groups(groups)
+        
+        if groups:
+            redundant = sum(len(g) - 1 for g in groups)
+            self.statusBar().showMessage(
+                f"Duplicados: {len(groups)} grupos ({redundant} archivos repetidos)",
+                5000
+            )
+    
+    def _on_mtimes_found(self, mtimes: dict):
+        """Fechas de modificación (del stat de la detección de duplicados)"""
+        if self.nav_system is None:
+            self._file_mtimes.update(mtimes)
+        else:
+            self.nav_system.set_file_mtimes(mtimes)
+    
+    def _on_filter_changed(self, file_filter):
+        """Nuevo filtro de la navegación aleatoria (votos e historial intactos)"""
+        if self.nav_system is None and not self._create_nav_system():
+            return
+        
+        count = self.nav_system.set_filter(file_filter)
+        self._update_status()
+        if not file_filter.is_empty:
+            self.statusBar().showMessage(f"Filtro: {count} archivos", 3000)
+    
+    def _on_files_added(self, files: list):
+        """Lote nuevo del escaneo en curso: elegible desde ya"""
+        if self.nav_system is None:
+            return
+        
+        self.nav_system.add_files(files)
+    
+    def _on_library_changed(self):
+        """Escaneo o verificación terminados: sincronizar la navegación"""
+        if self.nav_system is None:
+            return
+        
+        # Los lotes ya llegaron por add_files; solo hace falta reconstruir
+        # si la verificación quitó archivos (o se vació la biblioteca)
+        files = self.sidebar.get_all_files()
+        if len(files) != len(self.nav_system.all_files):
+            self.nav_system.update_file_list(files)
+        self._update_status()
+    
+    def _on_file_selected_from_list(self, file_path: str):
+        """Archivo seleccionado desde la lista"""
+        if self.nav_system is None and not self._create_nav_system():
+            return
         
         self.viewer.show_file(file_path)
         
@@ -132,58 +296,180 @@ class MainWindow(QMainWindow):
             vote = self.nav_system.get_vote(file_path)
             self.viewer.set_current_vote(vote)
         
+        # En la presentación, la ventana la gestiona el planificador (con plazos)
+        if self.sidebar.is_sequential() and not self._slideshow.running:
+            self._prefetch_neighbors()
         self._update_status()
     
+    # ========================================
+    # Navegación secuencial
+    # ========================================
+    
+    def _on_sequential_changed(self, sequential: bool):
+        """→/← pasan a recorrer la lista (o vuelven a la navegación aleatoria)"""
+        if sequential:
+            self._prefetch_neighbors()
+            self.statusBar().showMessage("Navegación secuencial: → y ← siguen la lista", 3000)
+        else:
+            self.viewer.clear_neighbors()
+            self.statusBar().showMessage("Navegación aleatoria", 3000)
+    
+    def _step_sequential(self, forward: bool):
+        """Avanzar o retroceder una fila de la lista (emite fileSelected)"""
+        if not self.nav_system and not self._create_nav_system():
+            QMessageBox.warning(self, "Sin archivos", "Añade directorios primero")
+            return
+        moved = self.sidebar.select_next() if forward else self.sidebar.select_previous()
+        if not moved:
+            self.statusBar().showMessage(
+                "Fin de la lista" if forward else "Principio de la lista", 2000
+            )
+    
+    def _prefetch_neighbors(self):
+        """Ventana de vecinos decodificados alrededor del archivo actual"""
+        ahead, behind = self.sidebar.neighbors(
+            self.viewer.NEIGHBORS_AHEAD, self.viewer.NEIGHBORS_BEHIND
+        )
+        self.viewer.prefetch_neighbors(ahead, behind)
+    
+    # ========================================
+    # Autorrepetición de →/←
+    # ========================================
+    
+    SKIP_RENDER_MS = 100  # Con la tecla mantenida, un fotograma decodificado cada…
+    
+    def _skip(self, direction: int):
+        """
+        Un paso de autorrepetición: mover solo la navegación
+        
+        Sin decodificar, sin votos ni estadísticas completas: eso lo hace
+        _render_skipped() con el archivo en el que se esté al vencer el
+        plazo. Lo pedido para los archivos saltados se cancela, y los
+        saltados no cuentan como vistos (ni historial ni cooldowns).
+        """
+        if self.nav_system is None and not self._create_nav_system():
+            return
+        self._slideshow.postpone()
+        self.viewer.cancel_pending()
+        self._skip_forward = direction > 0
+        
+        if self.sidebar.is_sequential():
+            moved = self.sidebar.step(direction, emit=False)
+            current = self.sidebar.current_file() if moved else None
+        else:
+            current = self.nav_system.skip(direction)
+        
+        if current:
+            self.statusBar().showMessage(f"⏩ {Path(current).name}")
+        if not self._skip_timer.isActive():
+            self._skip_timer.start()
+    
+    def _render_skipped(self):
+        """Vence el plazo: mostrar el archivo actual (el único que se decodifica)"""
+        self._slideshow.navigated()
+        if self.sidebar.is_sequential():
+            self.sidebar.emit_current()  # _on_file_selected_from_list desliza la ventana
+            return
+        current = self.nav_system.commit_skip() if self.nav_system else None
+        if current:  # Aunque sea el de antes: su carga se canceló en el primer paso
+            self._show_nav_file(current)
+            if self._skip_forward:
+                self._preload_upcoming()
+    
+    def _show_nav_file(self, path: str):
+        """Mostrar el archivo actual de la navegación aleatoria"""
+        self.viewer.show_file(path)
+        self.viewer.set_current_vote(self.nav_system.get_vote(path))
+        self._update_status()
+        self._session_timer.start()
+    
+    def _preload_upcoming(self):
+        """Pre-cargar lo que probablemente venga después del actual"""
+        if self.nav_system.can_go_forward_in_history():
+            future_pos = self.nav_system.history_position + 1
+            if future_pos < len(self.nav_system.history):
+                next_to_preload = self.nav_system.history[future_pos]
+                self.viewer.preload_next(next_to_preload)
+        else:
+            # Los que están a punto de salir del cooldown, a la caché de píxeles
+            self.viewer.prefetch(self.nav_system.upcoming())
+    
+    # ========================================
+    # Presentación
+    # ========================================
+    
+    def _toggle_slideshow(self):
+        if self._slideshow.running:
+            self._slideshow.stop()
+            return
+        if self.nav_system is None and not self._create_nav_system():
+            QMessageBox.warning(self, "Sin archivos", "Añade directorios primero")
+            return
+        self._slideshow.start()
+        self.statusBar().showMessage(f"▶ Presentación: {self._slideshow.period:g} s por archivo", 3000)
+    
+    def _slideshow_lookahead(self, count: int) -> list:
+        """Próximos archivos de la presentación, sin avanzar"""
+        if self.sidebar.is_sequential():
+            return self.sidebar.neighbors(count, 0)[0]
+        return self.nav_system.lookahead(count) if self.nav_system else []
+    
+    def _slideshow_advance(self, count: int) -> bool:
+        """Avanzar `count` archivos mostrando solo el último"""
+        if self.sidebar.is_sequential():
+            return self.sidebar.step(count)  # Emite fileSelected del último
+        
+        next_file = None
+        for _ in range(count):
+            next_file = self.nav_system.next_random() or next_file
+        if next_file is None:
+            return False
+        self._show_nav_file(next_file)
+        return True
+    
+    def _on_slideshow_stats(self, stats: dict):
+        self.statusBar().showMessage(
+            f"▶ {stats['period']:g} s | a tiempo {stats['on_time']}/{stats['shown']} | "
+            f"tarde {stats['degraded']} | saltados {stats['skipped']} | "
+            f"decodificación {stats['decode_latency_ms']:.0f} ms | por delante {stats['depth']}"
+        )
+    
+    def _on_slideshow_stopped(self):
+        stats = self._slideshow.stats()
+        print(
+            f"✓ Presentación: {stats['shown']} mostrados, {stats['on_time']} a tiempo, "
+            f"{stats['degraded']} tarde, {stats['skipped']} saltados "
+            f"({stats['missed_ratio']:.0%} de plazos incumplidos), "
+            f"decodificación {stats['decode_latency_ms']:.0f} ms, "
+            f"retraso del temporizador p95 {stats['timer_late_p95_ms']:.1f} ms"
+        )
+        self.statusBar().showMessage("⏹ Presentación detenida", 3000)
+        if not self.sidebar.is_sequential():
+            self.viewer.clear_neighbors()
+    
     def _next_random(self):
         """Siguiente archivo aleatorio"""
-        if not self.nav_system:
-            files = self.sidebar.get_all_files()
-            if not files:
-                QMessageBox.warning(self, "Sin archivos", "Añade directorios primero")
-                return
-            
-            pos, neu, neg, hist = self.config_widget.get_config()
-            
-            # Verificar si el sidebar ya tiene un nav_system temporal
-            if self.sidebar._nav_system is not None:
-                # Reutilizar el temporal (que ya tiene los votos)
-                self.nav_system = self.sidebar._nav_system
-                self.nav_system.update_file_list(files)
-                self.nav_system.max_history = hist
-                self.nav_system.set_positive_cooldown(pos)
-                self.nav_system.set_neutral_cooldown(neu)
-                self.nav_system.set_negative_cooldown(neg)
-            else:
-                # Crear nuevo
-                self.nav_system = NavigationSystem(
-                    files,
-                    positive_cooldown=pos,
-                    neutral_cooldown=neu,
-                    negative_cooldown=neg,
-                    max_history=hist
-                )
-                
-                # Cargar votos guardados si existen
-                if self._loaded_settings and 'votes' in self._loaded_settings:
-                    self.nav_system.import_data(self._loaded_settings)
-                
-                # Conectar sidebar con nav_system
-                self.sidebar.set_navigation_system(self.nav_system)
+        self._slideshow.navigated()
+        self._skip_timer.stop()
+        if self.sidebar.is_sequential():
+            self._step_sequential(forward=True)
+            return
+        
+        if not self.nav_system and not self._create_nav_system():
+            QMessageBox.warning(self, "Sin archivos", "Añade directorios primero")
+            return
         
         next_file = self.nav_system.next_random()
         
         if next_file:
-            self.viewer.show_file(next_file)
-            vote = self.nav_system.get_vote(next_file)
-            self.viewer.set_current_vote(vote)
-            self._update_status()
-            
-            # Pre-cargar siguiente
-            if self.nav_system.can_go_forward_in_history():
-                future_pos = self.nav_system.history_position + 1
-                if future_pos < len(self.nav_system.history):
-                    next_to_preload = self.nav_system.history[future_pos]
-                    self.viewer.preload_next(next_to_preload)
+            self._show_nav_file(next_file)
+            self._preload_upcoming()
+        elif not self.nav_system.file_filter.is_empty and not self.nav_system.get_filter_count():
+            QMessageBox.information(
+                self,
+                "Sin archivos disponibles",
+                "Ningún archivo cumple el filtro.\n\nCambia o quita el filtro."
+            )
         else:
             QMessageBox.information(
                 self,
@@ -193,16 +479,19 @@ class MainWindow(QMainWindow):
     
     def _go_back(self):
         """Volver al archivo anterior"""
+        self._slideshow.navigated()
+        self._skip_timer.stop()
+        if self.sidebar.is_sequential():
+            self._step_sequential(forward=False)
+            return
+        
         if not self.nav_system:
             return
         
         prev_file = self.nav_system.go_back()
         
         if prev_file:
-            self.viewer.show_file(prev_file)
-            vote = self.nav_system.get_vote(prev_file)
-            self.viewer.set_current_vote(vote)
-            self._update_status()
+            self._show_nav_file(prev_file)
     
     def _on_vote_changed(self, file_path: str, vote: int):
         """Manejar cambio de voto"""
@@ -216,29 +505,22 @@ class MainWindow(QMainWindow):
         else:
             self.nav_system.clear_vote(file_path)
         
+        # Un negativo bloqueado no volverá a salir: fuera de las cachés
+        if self.nav_system.is_blocked(file_path):
+            self.viewer.forget(file_path)
+        
         self._update_status()
         self._save_settings()
-        self.sidebar.refresh_votes()
+        self.sidebar.refresh_votes(file_path)
     
-    def _on_config_changed(self, positive: int, neutral: int, negative: int):
-        """Aplicar nueva configuración"""
-        if self.nav_system:
-            self.nav_system.set_positive_cooldown(positive)
-            self.nav_system.set_neutral_cooldown(neutral)
-            self.nav_system.set_negative_cooldown(negative)
-            
-            self.statusBar().showMessage(
-                f"Configuración actualizada: 👍={positive}, ⚪={neutral}, 👎={negative}",
-                3000
-            )
-        self._save_settings()
-    
-    def _on_history_limit_changed(self, limit: int):
-        """Cambiar límite de historial"""
-        if self.nav_system:
-            self.nav_system.set_max_history(limit)
+    def _on_config_committed(self, config: dict):
+        """Aplicar nueva configuración (ya agrupada por el widget)"""
+        if self.nav_system and self.nav_system.apply_config(**config):
             self.statusBar().showMessage(
-                f"Límite de historial: {limit} archivos",
+                f"Configuración actualizada: 👍={config['positive_cooldown']}, "
+                f"⚪={config['neutral_cooldown']}, 👎={config['negative_cooldown']} | "
+                f"Historial: {config['max_history']} | "
+                f"Selección: {self.config_widget.mode_combo.currentText()}",
                 3000
             )
         self._save_settings()
@@ -258,65 +540,73 @@ class MainWindow(QMainWindow):
             total = stats['history_length']
             eligible = stats['eligible_now']
             
+            filtered = ""
+            if not self.nav_system.file_filter.is_empty:
+                filtered = f"Filtro: {stats['filtered_files']} | "
+            
             self.statusBar().showMessage(
                 f"{vote_symbol} {file_name} | "
                 f"Posición: {position}/{total} | "
+                f"{filtered}"
                 f"Disponibles: {eligible}/{stats['total_files']} | "
                 f"👍 {stats['positive_voted']} | "
                 f"⚪ {stats['neutral_voted']} | "
                 f"👎 {stats['negative_voted']}"
             )
     
+    @traced("settings.save")
     def _save_settings(self):
         """Guardar configuración y votos"""
-        settings_path = Path.home() / ".visor_multimedia_settings.json"
-        
         try:
-            # Leer datos existentes si existen
-            existing_data = {}
-            if settings_path.exists():
-                try:
-                    with open(settings_path, 'r') as f:
-                        existing_data = json.load(f)
-                except:
-                    pass
-            
             if self.nav_system:
                 # Si hay sistema de navegación, exportar todo
                 data = self.nav_system.export_data()
             else:
                 # Si no hay sistema, preservar votos existentes
-                pos, neu, neg, hist = self.config_widget.get_config()
+                try:
+                    existing_data = self._settings_store.load() or {}
+                except Exception:
+                    existing_data = {}
+                
                 data = {
+                    **self.config_widget.get_config_dict(),
                     'votes': existing_data.get('votes', {}),
-                    'positive_cooldown': pos,
-                    'neutral_cooldown': neu,
-                    'negative_cooldown': neg,
-                    'max_history': hist
+                    'file_weights': existing_data.get('file_weights', {})
                 }
             
-            with open(settings_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._settings_store.save(data)
         except Exception as e:
             print(f"Error guardando configuración: {e}")
     
     def _load_settings(self):
         """Cargar configuración guardada"""
-        settings_path = Path.home() / ".visor_multimedia_settings.json"
-        
-        if not settings_path.exists():
-            return
-        
         try:
-            with open(settings_path, 'r') as f:
-                data = json.load(f)
-            
             # Guardar los datos cargados
-            self._loaded_settings = data
-            
+            self._loaded_settings = self._settings_store.load()
         except Exception as e:
             print(f"Error cargando configuración: {e}")
     
+    def _save_session(self):
+        """Guardar instantánea binaria de la sesión de navegación"""
+        if not self.nav_system:
+            return
+        
+        try:
+            self._settings_store.save_session(self.nav_system.export_session())
+        except Exception as e:
+            print(f"Error guardando sesión: {e}")
+    
+    def _load_session(self):
+        """Restaurar la sesión de navegación guardada"""
+        try:
+            data = self._settings_store.load_session()
+        except Exception as e:
+            print(f"Error cargando sesión: {e}")
+            return
+        
+        if data and self.nav_system.import_session(data):
+            print(f"✓ Sesión restaurada (semilla {self.nav_system.seed})")
+    
     def _on_reset_positive(self):
         """Resetear votos positivos"""
         if not self.nav_system:
@@ -374,11 +664,26 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Guardar al cerrar"""
+        # Cerrar antes del primer pintado no debe sobrescribir lo guardado
+        self._finish_startup()
+        self._slideshow.stop()
+        self._session_timer.stop()
+        self.config_widget.flush()
         self._save_settings()
+        self._save_session()
         
         if hasattr(self, 'sidebar'):
             self.sidebar.cleanup()
         if hasattr(self, 'viewer'):
             self.viewer.cleanup()
+
+        # VISOR_TRACE=ruta.json: volcar el trace de la sesión al salir
+        trace_path = os.environ.get('VISOR_TRACE')
+        if trace_path:
+            try:
+                count = profiler.dump_chrome_trace(trace_path)
+                print(f"✓ Trace guardado: {trace_path} ({count} eventos)")
+            except OSError as e:
+                print(f"⚠ No se pudo guardar el trace: {e}")
         
         event.accept()
\ No newline at end of file
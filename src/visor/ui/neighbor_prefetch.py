@@ -0,0 +1,164 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from PySide6.QtCore import QObject, QSize, Qt, Signal
+from PySide6.QtGui import QImageReader
+
+from .animation_player import ANIMATED_EXTENSIONS
+from .image_buffer import ImageBuffer
+from ..services.file_catalog import IMAGE_EXTENSIONS
+from ..services.profiler import profiler
+
+
+class NeighborPrefetcher(QObject):
+    """
+    Ventana deslizante de imágenes decodificadas alrededor de la actual
+
+    En navegación secuencial los siguientes archivos se conocen de
+    antemano: se decodifican AHEAD por delante y BEHIND por detrás en
+    paralelo (pool de threads; QImageReader suelta el GIL), ya reducidos
+    al tamaño de la vista. Al avanzar, lo que sale de la ventana se
+    descarta y lo que aún no había empezado se cancela.
+
+    Las imágenes llegan por `imageReady` (QImage creado en el worker,
+    QPixmap solo en el thread de la UI).
+
+    Cada petición puede llevar un plazo (time.monotonic()): si al llegar
+    su turno ya no da tiempo a decodificarla, se descarta sin ocupar un
+    worker. `latency` es la media móvil de lo que tarda una decodificación.
+    """
+
+    imageReady = Signal(str, object)  # (path, ImageBuffer o None si falló o caducó)
+    _decoded = Signal(str, object, float)  # Del worker al thread de la UI (en cola)
+
+    AHEAD = 4
+    BEHIND = 2
+    WORKERS = 3
+    LATENCY_ALPHA = 0.2  # Peso de la última medida en la media móvil
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="prefetch")
+        self._window: Dict[str, Optional[ImageBuffer]] = {}  # None = decodificando
+        self._futures: Dict[str, Future] = {}
+        self._target = QSize()
+        self.latency = 0.0  # Segundos por decodificación (media móvil)
+        self.expired = 0  # Peticiones descartadas por plazo
+        self._decoded.connect(self._on_decoded)
+
+    @staticmethod
+    def accepts(path: str) -> bool:
+        """Imágenes fijas (las animaciones las decodifica su reproductor)"""
+        ext = Path(path).suffix.lower()
+        return ext in IMAGE_EXTENSIONS and ext not in ANIMATED_EXTENSIONS
+
+    def set_target_size(self, size: QSize):
+        """Tamaño de la vista; si cambia, lo decodificado ya no sirve"""
+        if size != self._target:
+            self._target = QSize(size)
+            self.clear()
+
+    def update(self, ahead: Sequence[str], behind: Sequence[str] = (),
+               deadlines: Optional[Dict[str, float]] = None,
+               pinned: Optional[str] = None):
+        """
+        Desplazar la ventana: `ahead` son los siguientes (el más cercano
+        primero) y `behind` los anteriores. Se encolan por cercanía, con
+        preferencia por la dirección de avance.
+
+        Args:
+            deadlines: Plazo de cada ruta (time.monotonic()); sin plazo
+                si no aparece
+            pinned: Ruta que no sale de la ventana aunque no esté en
+                ninguna lista (la que espera la pantalla: si se
+                descartara, su imagen no llegaría nunca)
+        """
+        deadlines = deadlines or {}
+        wanted: List[str] = []
+        for i in range(max(len(ahead), len(behind))):
+            for side in (ahead, behind):
+                if i < len(side) and self.accepts(side[i]):
+                    wanted.append(side[i])
+
+        keep = set(wanted)
+        if pinned is not None:
+            keep.add(pinned)
+        for path in [p for p in self._window if p not in keep]:
+            self._drop(path)
+        for path in wanted:
+            if path not in self._window:
+                self._window[path] = None
+                self._futures[path] = self._pool.submit(
+                    self._decode, path, QSize(self._target), deadlines.get(path)
+                )
+
+    def get(self, path: str) -> Optional[ImageBuffer]:
+        """Imagen ya decodificada de la ventana, o None"""
+        return self._window.get(path)
+
+    def is_ready(self, path: str) -> bool:
+        return self._window.get(path) is not None
+
+    def pending(self, path: str) -> bool:
+        """¿Se está decodificando `path`? (llegará por imageReady)"""
+        return path in self._window and self._window[path] is None
+
+    def discard(self, path: str):
+        """Sacar `path` de la ventana (si se estaba decodificando, se cancela)"""
+        self._drop(path)
+
+    def _drop(self, path: str):
+        self._window.pop(path, None)
+        future = self._futures.pop(path, None)
+        if future is not None:
+            future.cancel()  # Sin efecto si ya empezó: su resultado se ignora
+
+    def cancel_pending(self):
+        """Descartar lo que aún se decodifica (lo ya decodificado se queda)"""
+        for path in [p for p, buffer in self._window.items() if buffer is None]:
+            self._drop(path)
+
+    def clear(self):
+        for path in list(self._window):
+            self._drop(path)
+
+    def shutdown(self):
+        self.clear()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # ========================================
+    # Decodificación (workers)
+    # ========================================
+
+    def _decode(self, path: str, target: QSize, deadline: Optional[float]):
+        start = time.monotonic()
+        if deadline is not None and start + self.latency > deadline:
+            self._decoded.emit(path, None, -1.0)  # No llegaría a tiempo: no ocupar el worker
+            return
+        with profiler.span("prefetch.decode", path=path):
+            reader = QImageReader(path)
+            size = reader.size()
+            if target.isValid() and size.isValid():
+                # Caja cuadrada del lado mayor: vale aunque la orientación EXIF la gire
+                side = max(target.width(), target.height())
+                if size.width() > side or size.height() > side:
+                    reader.setScaledSize(size.scaled(side, side, Qt.KeepAspectRatio))
+            image = reader.read()
+        elapsed = time.monotonic() - start
+        self._decoded.emit(path, ImageBuffer(image) if not image.isNull() else None, elapsed)
+
+    def _on_decoded(self, path: str, buffer: Optional[ImageBuffer], elapsed: float):
+        if elapsed < 0:
+            self.expired += 1
+        elif buffer is not None:
+            alpha = self.LATENCY_ALPHA
+            self.latency = elapsed if not self.latency else (1 - alpha) * self.latency + alpha * elapsed
+        if self._futures.pop(path, None) is None:
+            return  # Salió de la ventana mientras se decodificaba
+        if buffer is None:
+            self._window.pop(path, None)  # Falló o caducó: la carga normal se encarga
+        else:
+            self._window[path] = buffer
+        self.imageReady.emit(path, buffer)
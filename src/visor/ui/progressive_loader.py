@@ -0,0 +1,195 @@
+import io
+import os
+from typing import Optional, Tuple
+
+from PySide6.QtCore import QThread, QSize, Signal, QMutex, QMutexLocker
+from PySide6.QtGui import QImage
+
+from .image_buffer import ImageBuffer
+from .image_io import MAX_DIMENSION
+from ..services.exif import ExifInfo, NO_EXIF, read_preview
+from ..services.profiler import profiler
+from ..services.thumbnails import ThumbnailCache
+
+
+PROGRESSIVE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+PROGRESSIVE_MIN_BYTES = 2 * 1024 * 1024  # Por debajo, la carga normal ya es rápida
+READ_CHUNK = 1024 * 1024
+# JPEG progresivo: fracciones del archivo tras las que se publica una pasada
+# (la primera exploración, solo coeficientes DC, suele ocupar < 5%)
+PASS_FRACTIONS = (0.1, 0.4)
+_JPEG_EOI = b"\xff\xd9"
+
+
+def _coarse_pass(data: bytes, scale: int, truncated: bool) -> ImageBuffer:
+    """
+    Decodificar una pasada de baja resolución de un JPEG
+
+    Con `truncated`, `data` es solo el principio del archivo: se cierra con
+    un marcador EOI y libjpeg entrega lo que tenga de las exploraciones
+    recibidas (en JPEG progresivo, la imagen entera con menos detalle).
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data + _JPEG_EOI if truncated else data)) as img:
+        width, height = img.size
+        img.draft("RGB", (max(1, width // scale), max(1, height // scale)))
+        return ImageBuffer.decode(img)
+
+
+class ProgressiveLoader(QThread):
+    """
+    Carga progresiva de JPEG/PNG grandes
+
+    Publica pasadas cada vez más detalladas mientras lee el archivo por
+    bloques (cancelable entre bloques):
+    - Preview EXIF embebido o miniatura de la caché, si existen (instantáneos)
+    - JPEG progresivo: pasadas sobre el principio del archivo (PASS_FRACTIONS)
+    - JPEG secuencial: pasada a 1/8 de escala con draft()
+    - Imagen completa: ImageFile.Parser acumula los bytes y se decodifica
+      directamente sobre el QImage (ImageBuffer)
+
+    Todas las pasadas tienen la misma proporción que la final, así que
+    el visor las sustituye sin saltos. PNG entrelazado no tiene pasadas
+    accesibles desde Pillow: solo miniatura y carga final.
+    """
+
+    passReady = Signal(str, object, bool)  # (path, ImageBuffer, ¿final?)
+    failed = Signal(str)  # path: usar la carga normal
+
+    def __init__(self, thumbnails: Optional[ThumbnailCache] = None):
+        super().__init__()
+        self.thumbnails = thumbnails
+        self._mutex = QMutex()
+        self._request: Optional[Tuple[str, QSize, ExifInfo]] = None
+        self._current: Optional[str] = None
+        self._should_stop = False
+
+    @staticmethod
+    def accepts(path: str) -> bool:
+        """¿Merece la pena cargar `path` de forma progresiva?"""
+        if os.path.splitext(path)[1].lower() not in PROGRESSIVE_EXTENSIONS:
+            return False
+        try:
+            return os.path.getsize(path) >= PROGRESSIVE_MIN_BYTES
+        except OSError:
+            return False
+
+    def load(self, path: str, view_size: QSize, exif: ExifInfo = NO_EXIF):
+        """Cargar `path` (cancela la carga en curso)"""
+        with QMutexLocker(self._mutex):
+            self._request = (path, view_size, exif)
+        if not self.isRunning():
+            self.start()
+
+    def cancel(self):
+        """Abandonar la carga en curso y la pendiente"""
+        with QMutexLocker(self._mutex):
+            self._request = None
+            self._current = None
+
+    def stop(self):
+        """Detener thread"""
+        with QMutexLocker(self._mutex):
+            self._request = None
+            self._current = None
+            self._should_stop = True
+        self.wait()
+
+    def _cancelled(self, path: str) -> bool:
+        with QMutexLocker(self._mutex):
+            return self._should_stop or self._request is not None or self._current != path
+
+    # ========================================
+    # Thread de carga
+    # ========================================
+
+    def run(self):
+        while True:
+            with QMutexLocker(self._mutex):
+                if self._should_stop or self._request is None:
+                    return
+                (path, view_size, exif), self._request = self._request, None
+                self._current = path
+            try:
+                with profiler.span("progressive.load", path=path):
+                    ok = self._load(path, view_size, exif)
+            except Exception as e:
+                print(f"⚠ Carga progresiva fallida ({os.path.basename(path)}): {e}")
+                ok = False
+            if not ok and not self._cancelled(path):
+                self.failed.emit(path)
+
+    def _emit(self, path: str, buffer: ImageBuffer, final: bool):
+        if not buffer.image.isNull() and not self._cancelled(path):
+            self.passReady.emit(path, buffer, final)
+
+    def _instant_pass(self, path: str, size: Tuple[int, int], exif: ExifInfo) -> ImageBuffer:
+        """Preview EXIF (si tiene la proporción de la imagen) o miniatura cacheada"""
+        data = read_preview(path, exif)
+        if data is not None:
+            preview = QImage.fromData(data)
+            if not preview.isNull() and abs(
+                preview.width() * size[1] - preview.height() * size[0]
+            ) <= 0.02 * preview.width() * size[1]:
+                return ImageBuffer(preview)
+        thumb = self.thumbnails.get(path) if self.thumbnails else None
+        return ImageBuffer(QImage(str(thumb)) if thumb is not None else QImage())
+
+    def _load(self, path: str, view_size: QSize, exif: ExifInfo) -> bool:
+        """Publicar las pasadas de `path`; False si hay que usar la carga normal"""
+        from PIL import Image, ImageFile
+
+        instant = False
+        with open(path, "rb") as f:
+            total = os.fstat(f.fileno()).st_size
+            parser = ImageFile.Parser()
+            header = None
+            passes = list(PASS_FRACTIONS)
+
+            while chunk := f.read(READ_CHUNK):
+                if self._cancelled(path):
+                    return True
+                parser.feed(chunk)
+                read = f.tell()
+
+                if header is None and parser.image is not None:
+                    img = parser.image
+                    header = (img.format, img.size, bool(img.info.get("progressive")))
+                    if max(img.size) > MAX_DIMENSION:
+                        return False  # read_image la decodifica ya reducida
+                    first = self._instant_pass(path, img.size, exif)
+                    instant = not first.image.isNull()
+                    self._emit(path, first, False)
+
+                # JPEG progresivo: cada pasada añade detalle a la imagen entera
+                if header and header[0] == "JPEG" and header[2]:
+                    while passes and read >= passes[0] * total:
+                        passes.pop(0)
+                        # Segunda pasada a resolución de pantalla (draft elige la escala)
+                        scale = 8 if len(passes) else max(
+                            1, min(header[1][0] // max(1, view_size.width()),
+                                   header[1][1] // max(1, view_size.height()))
+                        )
+                        with profiler.span("progressive.pass"):
+                            self._emit(path, _coarse_pass(parser.data, scale, read < total), False)
+
+            if header is None:
+                return False
+
+            if header[0] == "JPEG" and not header[2] and not instant:
+                with profiler.span("progressive.pass"):
+                    self._emit(path, _coarse_pass(parser.data, 8, False), False)
+
+            if self._cancelled(path):
+                return True
+            with profiler.span("progressive.final"):
+                if parser.decoder is None:
+                    # JPEG/PNG no son incrementales en Pillow: el Parser solo ha
+                    # acumulado los bytes y se decodifican sobre el QImage final
+                    with Image.open(io.BytesIO(parser.data)) as img:
+                        buffer = ImageBuffer.decode(img)
+                else:
+                    buffer = ImageBuffer.from_pil(parser.close())
+                self._emit(path, buffer, True)
+        return True
@@ -1,30 +1,48 @@
+import os
+import time
 from pathlib import Path
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QListWidget, QListWidgetItem, QFileDialog, QLabel,
-    QProgressBar, QMenu
+    QListWidget, QListView, QFileDialog, QLabel,
+    QProgressBar, QMenu, QComboBox, QSpinBox, QLineEdit
+)
+from PySide6.QtCore import (
+    Qt, Signal, QThread, QMutex, QMutexLocker,
+    QAbstractListModel, QModelIndex, QTimer
 )
-from PySide6.QtCore import Qt, Signal, QThread, QMutex, QMutexLocker
 from PySide6.QtGui import QAction, QColor
 
-
-# Extensiones soportadas
-IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif"}
-VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".webm", ".mov"}
-ALL_EXTENSIONS = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+from ..services.file_catalog import FileCatalog, iter_media_files, is_within
+from ..services.duplicate_detector import DuplicateDetector
+from ..services.filter_index import FileFilter, MEDIA_IMAGE, MEDIA_VIDEO, year_range
+from ..services.media_index import MediaIndex
+from ..services.profiler import profiler
+from ..services.progress import format_duration
+from ..services.search_index import SearchIndex
+from ..services.sort_index import (
+    SortIndex, SORT_SCAN, SORT_NAME, SORT_MTIME, SORT_SIZE, SORT_VOTE, SORT_TYPE
+)
+from ..services.thumbnail_farm import ThumbnailFarm
 
 
 class FileScanner(QThread):
     """Thread para escanear directorios sin bloquear la UI"""
     
     # Señales
-    fileFound = Signal(str)  # Emite cada archivo encontrado
+    filesFound = Signal(list)  # Lote de archivos encontrados
     progress = Signal(int, int)  # (current, total)
     finished = Signal(int)  # Total de archivos encontrados
     
-    def __init__(self, directories):
+    BATCH_SIZE = 512  # Archivos por lote
+    BATCH_INTERVAL_NS = 100_000_000  # Enviar al menos cada 100 ms
+    
+    def __init__(self, jobs):
+        """
+        Args:
+            jobs: Lista de (raíz canónica, subárboles ya indexados a omitir)
+        """
         super().__init__()
-        self.directories = directories
+        self.jobs = jobs
         self._is_cancelled = False
         self._mutex = QMutex()
     
@@ -36,54 +54,403 @@ class FileScanner(QThread):
     def run(self):
         """Escanear directorios de forma recursiva"""
         total_files = 0
-        processed = 0
+        batch = []
+        batch_start = time.perf_counter_ns()
         
-        # Primera pasada: contar archivos (opcional, para la barra de progreso)
-        # Comentada para mayor velocidad en directorios enormes
-        
-        # Segunda pasada: emitir archivos
-        for directory in self.directories:
-            path = Path(directory)
-            if not path.exists() or not path.is_dir():
-                continue
-            
+        for root, skip_roots in self.jobs:
             try:
-                # Usar rglob para búsqueda recursiva
-                for file_path in path.rglob("*"):
+                for file_path in iter_media_files(root, skip_roots):
                     # Verificar cancelación
                     with QMutexLocker(self._mutex):
                         if self._is_cancelled:
                             return
                     
-                    # Solo archivos con extensiones válidas
-                    if file_path.is_file() and file_path.suffix.lower() in ALL_EXTENSIONS:
-                        self.fileFound.emit(str(file_path))
-                        total_files += 1
-                        processed += 1
-                        
-                        # Emitir progreso cada 100 archivos
-                        if processed % 100 == 0:
-                            self.progress.emit(processed, processed)
+                    batch.append(file_path)
+                    total_files += 1
+                    
+                    # Un lote por señal: la UI y la navegación ingieren
+                    # miles de archivos por evento en lugar de uno
+                    if (len(batch) >= self.BATCH_SIZE or
+                            time.perf_counter_ns() - batch_start >= self.BATCH_INTERVAL_NS):
+                        self._emit_batch(batch, batch_start, total_files)
+                        batch = []
+                        batch_start = time.perf_counter_ns()
                 
             except PermissionError:
                 # Ignorar directorios sin permisos
                 continue
         
+        if batch:
+            self._emit_batch(batch, batch_start, total_files)
         self.finished.emit(total_files)
+    
+    def _emit_batch(self, batch, batch_start, total_files):
+        profiler.record("scanner.batch", batch_start, args={'files': len(batch)})
+        self.filesFound.emit(batch)
+        self.progress.emit(total_files, total_files)
+
+
+class DuplicateFinder(QThread):
+    """Thread para detectar duplicados por contenido en segundo plano"""
+    
+    # Señales
+    progress = Signal(str, int, int)  # (etapa, hechos, total)
+    duplicatesFound = Signal(list)  # Lista de grupos de rutas
+    mtimesFound = Signal(dict)  # {ruta: mtime} del stat inicial
+    sizesFound = Signal(dict)  # {ruta: tamaño} del stat inicial
+    
+    def __init__(self, files, perceptual=False):
+        super().__init__()
+        self.files = files
+        self.perceptual = perceptual
+        self._is_cancelled = False
+        self._mutex = QMutex()
+    
+    def cancel(self):
+        """Cancelar la detección"""
+        with QMutexLocker(self._mutex):
+            self._is_cancelled = True
+    
+    def _cancelled(self):
+        with QMutexLocker(self._mutex):
+            return self._is_cancelled
+    
+    def run(self):
+        """Ejecutar el pipeline de detección"""
+        try:
+            # La conexión SQLite debe crearse en el thread que la usa
+            with MediaIndex() as index:
+                detector = DuplicateDetector(
+                    index=index,
+                    perceptual=self.perceptual,
+                    progress=self.progress.emit,
+                    should_cancel=self._cancelled,
+                    mtimes_ready=self.mtimesFound.emit,
+                    sizes_ready=self.sizesFound.emit
+                )
+                groups = detector.find_groups(self.files)
+        except Exception as e:
+            print(f"Error detectando duplicados: {e}")
+            return
+        
+        if not self._cancelled():
+            self.duplicatesFound.emit(groups)
+
+
+class LibrarySaver(QThread):
+    """Thread que guarda la instantánea de la biblioteca (y serializa el índice de búsqueda)"""
+    
+    def __init__(self, roots, files, search=None):
+        """
+        Args:
+            roots, files: Copias de las listas del catálogo
+            search: SearchIndex.snapshot() o None (conservar el guardado)
+        """
+        super().__init__()
+        self.roots = roots
+        self.files = files
+        self.search = search
+        self.ok = False
+    
+    def run(self):
+        try:
+            data = self.search.dumps() if self.search is not None else None
+            # La conexión SQLite debe crearse en el thread que la usa
+            with MediaIndex() as index:
+                index.save_library_snapshot(self.roots, self.files, search_index=data)
+            self.ok = True
+        except Exception as e:
+            print(f"Error guardando biblioteca: {e}")
+
+
+class ThumbnailGenerator(QThread):
+    """Thread que alimenta la granja de miniaturas (pool de procesos)"""
+    
+    # Señales
+    progress = Signal(int, int, float, float)  # (hechos, total, archivos/s, segundos restantes o -1)
+    finished = Signal(dict)  # Contadores de la granja
+    
+    def __init__(self, files):
+        super().__init__()
+        self.files = files
+        self._is_cancelled = False
+        self._mutex = QMutex()
+    
+    def cancel(self):
+        """Detener tras el bloque en curso (el progreso queda guardado)"""
+        with QMutexLocker(self._mutex):
+            self._is_cancelled = True
+    
+    def _cancelled(self):
+        with QMutexLocker(self._mutex):
+            return self._is_cancelled
+    
+    def run(self):
+        """Generar las miniaturas que falten"""
+        counts = {}
+        try:
+            # La conexión SQLite debe crearse en el thread que la usa
+            with MediaIndex() as index:
+                farm = ThumbnailFarm(
+                    index=index,
+                    progress=self.progress.emit,
+                    should_cancel=self._cancelled
+                )
+                counts = farm.run(self.files)
+        except Exception as e:
+            print(f"Error generando miniaturas: {e}")
+        self.finished.emit(counts)
+
+
+VOTE_COLORS = {
+    1: QColor(76, 175, 80, 100),  # Verde claro
+    -1: QColor(244, 67, 54, 100),  # Rojo claro
+}
+
+
+class FileListModel(QAbstractListModel):
+    """
+    Modelo de la lista de archivos sobre el catálogo
+
+    No crea un objeto por fila: nombre y color se calculan al pintar,
+    así restaurar o refrescar 500k archivos es instantáneo. Con una
+    vista (resultados de búsqueda) muestra solo esas rutas, sin proxy.
+    El orden tampoco usa proxy: cada fila pasa por la permutación del
+    SortIndex (leída del revés en orden descendente).
+    """
+
+    def __init__(self, catalog: FileCatalog, parent=None):
+        super().__init__(parent)
+        self._catalog = catalog
+        self._nav_system = None
+        self._view = None  # Rutas mostradas en lugar del catálogo (búsqueda)
+        self._sort = SortIndex(catalog.files)
+        self._sort_key = SORT_SCAN
+        self._descending = False
+        self._order = None  # Permutación del orden actual (None = escaneo)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._catalog) if self._view is None else len(self._view)
+
+    def _path(self, row: int) -> str:
+        if self._view is not None:
+            return self._view[row]
+        if self._descending:
+            row = len(self._catalog) - 1 - row
+        if self._order is not None:
+            row = self._order[row]
+        return self._catalog.files[row]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self._path(index.row())
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.UserRole:
+            return path
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.BackgroundRole and self._nav_system:
+            return VOTE_COLORS.get(self._nav_system.get_vote(path))
+        return None
+
+    def path_at(self, row: int):
+        if 0 <= row < self.rowCount():
+            return self._path(row)
+        return None
+
+    def row_of(self, path: str) -> int:
+        """Fila de `path` en el orden actual (-1 si no está); búsquedas en C"""
+        try:
+            if self._view is not None:
+                return self._view.index(path)
+            row = self._catalog.files.index(path)
+            if self._order is not None:
+                row = self._order.index(row)
+        except ValueError:
+            return -1
+        return len(self._catalog) - 1 - row if self._descending else row
+
+    def set_navigation_system(self, nav_system):
+        """Sistema de navegación del que leer los votos al pintar"""
+        self._nav_system = nav_system
+        self.refresh_votes()
+
+    # ---------------- Orden ----------------
+
+    @property
+    def sort_key(self) -> str:
+        return self._sort_key
+
+    def set_order(self, key: str, descending: bool = False):
+        """Cambiar de orden: solo se cambia de permutación (calculada una vez)"""
+        self.beginResetModel()
+        self._sort_key = key
+        self._descending = descending
+        self._order = self._sort.order(key)
+        self.endResetModel()
+
+    def refresh_order(self):
+        """Colocar los archivos añadidos durante el escaneo en su sitio"""
+        self._sort.refresh()
+        if self._order is not None and self._order is not self._sort.order(self._sort_key):
+            self.set_order(self._sort_key, self._descending)
+
+    def set_stats(self, sizes: dict, mtimes: dict):
+        """Columnas de tamaño y fecha (del stat de la detección de duplicados)"""
+        self._sort.set_stats(sizes, mtimes)
+        if self._sort_key in (SORT_SIZE, SORT_MTIME):
+            self.set_order(self._sort_key, self._descending)
+
+    def refresh_votes(self, file_path=None):
+        """
+        Votos cambiados: con `file_path`, solo ese archivo (en orden por
+        voto se mueve una fila); sin él, se reagrupa todo
+        """
+        if file_path is None or self._nav_system is None:
+            self._sort.set_votes(self._nav_system.votes if self._nav_system else {})
+            if self._sort_key == SORT_VOTE:
+                self.set_order(SORT_VOTE, self._descending)
+            return
+
+        move = self._sort.find_vote_move(file_path)
+        if move is None:
+            return
+        if self._sort_key != SORT_VOTE or self._view is not None:
+            self._sort.move_vote(file_path, *move)  # Sin filas visibles que mover
+            return
+        old, new = move
+        if self._descending:
+            last = len(self._catalog) - 1
+            old, new = last - old, last - new
+        # beginMoveRows: destino = fila ante la que se inserta (antes de mover)
+        self.beginMoveRows(QModelIndex(), old, old, QModelIndex(), new + 1 if new > old else new)
+        self._sort.move_vote(file_path, *move)
+        self.endMoveRows()
+
+    # ---------------- Vista de resultados ----------------
+
+    def set_view(self, paths):
+        """Mostrar solo `paths` (None = volver al catálogo completo)"""
+        self.beginResetModel()
+        self._view = None if paths is None else list(paths)
+        self.endResetModel()
+
+    def append_view(self, paths):
+        """Añadir un lote de resultados al final de la vista"""
+        if self._view is None or not paths:
+            return
+        row = len(self._view)
+        self.beginInsertRows(QModelIndex(), row, row + len(paths) - 1)
+        self._view.extend(paths)
+        self.endInsertRows()
+
+    # ---------------- Cambios en el catálogo ----------------
+
+    def add_files(self, file_paths) -> list:
+        """Añadir archivos al final (una inserción por lote); devuelve los nuevos"""
+        new_files = [p for p in dict.fromkeys(file_paths) if p not in self._catalog]
+        if not new_files:
+            return new_files
+        if self._view is not None:
+            self._catalog.add_files(new_files)  # No cambian las filas visibles
+            self._sort.extend(len(new_files))
+            return new_files
+        if self._sort_key == SORT_VOTE:
+            # Cada archivo entra en su grupo: filas dispersas
+            self.beginResetModel()
+            self._catalog.add_files(new_files)
+            self._sort.extend(len(new_files))
+            self.endResetModel()
+            return new_files
+        # Al final del orden (en otro orden, hasta refresh_order); al
+        # principio si se lee del revés
+        row = 0 if self._descending else len(self._catalog)
+        self.beginInsertRows(QModelIndex(), row, row + len(new_files) - 1)
+        self._catalog.add_files(new_files)
+        self._sort.extend(len(new_files))
+        self.endInsertRows()
+        return new_files
+
+    def remove_files(self, file_paths) -> list:
+        """Quitar archivos (filas dispersas: se reinicia el modelo)"""
+        self.beginResetModel()
+        removed = self._catalog.remove_files(file_paths)
+        if removed:
+            self._sort.invalidate()  # Las filas cambian: permutaciones nuevas
+            self._order = self._sort.order(self._sort_key)
+        if self._view is not None and removed:
+            gone = set(removed)
+            self._view = [p for p in self._view if p not in gone]
+        self.endResetModel()
+        return removed
+
+    def restore(self, roots, files):
+        """Cargar una instantánea de la biblioteca"""
+        self.beginResetModel()
+        self._catalog.restore(roots, files)
+        self._view = None
+        self._sort.invalidate()
+        self._order = self._sort.order(self._sort_key)
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._catalog.clear()
+        self._view = None
+        self._sort.invalidate()
+        self._order = self._sort.order(self._sort_key)
+        self.endResetModel()
 
 
 class SidebarWidget(QWidget):
     """Sidebar para seleccionar directorios y mostrar archivos multimedia"""
     
     fileSelected = Signal(str)  # Archivo seleccionado
+    duplicatesFound = Signal(list)  # Grupos de archivos duplicados
+    mtimesFound = Signal(dict)  # Fechas de modificación {ruta: mtime}
+    filterChanged = Signal(object)  # FileFilter de la navegación aleatoria
+    filesAdded = Signal(list)  # Archivos nuevos en el catálogo (por lotes)
+    libraryChanged = Signal()  # Escaneo terminado: lista de archivos definitiva
+    sequentialChanged = Signal(bool)  # → y ← recorren la lista en su orden
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
         self._scanner_thread = None
-        self._selected_directories = []
-        self._all_files = []
+        self._duplicate_thread = None
+        self._thumbnail_thread = None
+        self.detect_near_duplicates = False  # dHash perceptual (más lento)
+        self._scanning = False
+        self._pending_jobs = []  # Escaneos en cola mientras otro está en curso
+        self._catalog = FileCatalog()  # Raíces canónicas + archivos sin duplicados
+        self._model = FileListModel(self._catalog, self)
         self._nav_system = None  # Sistema de navegación para votos
+        self._index = None  # MediaIndex (instantánea de la biblioteca)
+        self._snapshot_thread = None  # Guardado de la instantánea en curso
+        self._snapshot_again = False  # Hubo cambios durante ese guardado
+        self._folder_filter = None  # Carpeta a la que se limita la navegación
+        self._file_mtimes = {}  # Columnas de orden del último stat
+        
+        # Búsqueda por nombre: índice de trigramas construido al escanear
+        # (None = guardado en el MediaIndex, se carga al primer uso)
+        self._search = SearchIndex()
+        self._search_dirty = False  # Cambios sin guardar en la instantánea
+        self._search_results = None  # Generador de la búsqueda en curso
+        self._search_found = 0
+        self._search_timer = QTimer(self)  # Entrega los resultados por tramos
+        self._search_timer.setInterval(0)
+        self._search_timer.timeout.connect(self._stream_search)
+        self._indexer_timer = QTimer(self)  # Indexa los pendientes en ratos libres
+        self._indexer_timer.setInterval(0)
+        self._indexer_timer.timeout.connect(self._index_search_step)
+        
+        # Verificación de la biblioteca restaurada
+        self._reconcile_roots = []
+        self._reconcile_seen = None  # Archivos vistos en el escaneo de verificación
         
         self._setup_ui()
         
@@ -104,8 +471,13 @@ class SidebarWidget(QWidget):
         self.clear_btn.setToolTip("Limpiar lista")
         self.clear_btn.clicked.connect(self._clear_all)
         
+        self.thumbs_btn = QPushButton("🖼️ Miniaturas")
+        self.thumbs_btn.setToolTip("Generar miniaturas de la biblioteca (otro clic para detener)")
+        self.thumbs_btn.clicked.connect(self._toggle_thumbnails)
+        
         btn_layout.addWidget(self.add_dir_btn)
         btn_layout.addWidget(self.clear_btn)
+        btn_layout.addWidget(self.thumbs_btn)
         layout.addLayout(btn_layout)
         
         # --- Info label ---
@@ -113,15 +485,81 @@ class SidebarWidget(QWidget):
         self.info_label.setStyleSheet("color: gray; font-size: 11px;")
         layout.addWidget(self.info_label)
         
+        # --- Filtro de la navegación aleatoria ---
+        filter_layout = QHBoxLayout()
+        
+        self.type_filter = QComboBox()
+        for text in self.TYPE_FILTER_LABELS:
+            self.type_filter.addItem(text)
+        self.type_filter.setToolTip("Tipo de archivo")
+        self.type_filter.currentIndexChanged.connect(self._emit_filter)
+        
+        self.vote_filter = QComboBox()
+        for text in self.VOTE_FILTER_LABELS:
+            self.vote_filter.addItem(text)
+        self.vote_filter.setToolTip("Voto")
+        self.vote_filter.currentIndexChanged.connect(self._emit_filter)
+        
+        self.year_filter = QSpinBox()
+        self.year_filter.setRange(self.ANY_YEAR, 2100)
+        self.year_filter.setSpecialValueText("Cualquier año")
+        self.year_filter.setToolTip("Año de modificación")
+        self.year_filter.valueChanged.connect(self._emit_filter)
+        
+        filter_layout.addWidget(self.type_filter)
+        filter_layout.addWidget(self.vote_filter)
+        filter_layout.addWidget(self.year_filter)
+        layout.addLayout(filter_layout)
+        
+        self.folder_filter_btn = QPushButton()
+        self.folder_filter_btn.setToolTip("Quitar el filtro de carpeta")
+        self.folder_filter_btn.clicked.connect(lambda: self.set_folder_filter(None))
+        self.folder_filter_btn.hide()
+        layout.addWidget(self.folder_filter_btn)
+        
+        # --- Búsqueda y orden ---
+        search_layout = QHBoxLayout()
+        
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 Buscar...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._on_search_changed)
+        
+        self.sort_combo = QComboBox()
+        for text in self.SORT_LABELS:
+            self.sort_combo.addItem(text)
+        self.sort_combo.setToolTip("Ordenar la lista")
+        self.sort_combo.currentIndexChanged.connect(self._apply_sort)
+        
+        self.sort_dir_btn = QPushButton("↑")
+        self.sort_dir_btn.setCheckable(True)
+        self.sort_dir_btn.setFixedWidth(28)
+        self.sort_dir_btn.setToolTip("Orden ascendente / descendente")
+        self.sort_dir_btn.toggled.connect(self._apply_sort)
+        
+        self.sequential_btn = QPushButton("➡")
+        self.sequential_btn.setCheckable(True)
+        self.sequential_btn.setFixedWidth(28)
+        self.sequential_btn.setToolTip("Navegación secuencial: → y ← siguen el orden de la lista")
+        self.sequential_btn.toggled.connect(self.sequentialChanged)
+        
+        search_layout.addWidget(self.search_edit, 1)
+        search_layout.addWidget(self.sort_combo)
+        search_layout.addWidget(self.sort_dir_btn)
+        search_layout.addWidget(self.sequential_btn)
+        layout.addLayout(search_layout)
+        
         # --- Barra de progreso ---
         self.progress_bar = QProgressBar()
         self.progress_bar.hide()
         layout.addWidget(self.progress_bar)
         
         # --- Lista de archivos ---
-        self.file_list = QListWidget()
+        self.file_list = QListView()
+        self.file_list.setModel(self._model)
+        self.file_list.setUniformItemSizes(True)  # Sin medir cada fila
         self.file_list.setAlternatingRowColors(True)
-        self.file_list.itemClicked.connect(self._on_item_clicked)
+        self.file_list.clicked.connect(self._on_item_clicked)
         self.file_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.file_list.customContextMenuRequested.connect(self._show_context_menu)
         layout.addWidget(self.file_list)
@@ -149,50 +587,62 @@ class SidebarWidget(QWidget):
         if dialog.exec():
             directories = dialog.selectedFiles()
             if directories:
-                self._selected_directories.extend(directories)
                 self._scan_directories(directories)
     
     def _scan_directories(self, directories):
         """Escanear directorios en segundo plano"""
-        # Cancelar escaneo anterior si existe
-        if self._scanner_thread and self._scanner_thread.isRunning():
-            self._scanner_thread.cancel()
+        # Solo raíces nuevas; los subárboles ya indexados se omiten
+        jobs = self._catalog.plan_roots(directories)
+        if not jobs:
+            self.info_label.setText(
+                f"{len(self._catalog)} archivos (directorio ya incluido)"
+            )
+            return
+        
+        # Si hay un escaneo en curso, encolar en lugar de cancelarlo
+        if self._scanning:
+            self._pending_jobs.extend(jobs)
+            return
+        
+        self._start_scan(jobs)
+    
+    def _start_scan(self, jobs, status="Escaneando..."):
+        """Lanzar thread de escaneo"""
+        # El thread anterior ya emitió finished; esperar a que termine run()
+        if self._scanner_thread:
             self._scanner_thread.wait()
         
-        # Mostrar progreso
+        self._scanning = True
+        
+        # Mostrar progreso (el escaneo tiene prioridad sobre las miniaturas)
         self.progress_bar.show()
+        self.progress_bar.setFormat("%p%")
         self.progress_bar.setRange(0, 0)  # Modo indeterminado
-        self.info_label.setText("Escaneando...")
+        self.info_label.setText(status)
         
         # Crear y configurar thread
-        self._scanner_thread = FileScanner(directories)
-        self._scanner_thread.fileFound.connect(self._add_file_to_list)
+        self._scanner_thread = FileScanner(jobs)
+        self._scanner_thread.filesFound.connect(self._add_files_to_list)
         self._scanner_thread.progress.connect(self._update_progress)
         self._scanner_thread.finished.connect(self._scan_finished)
         self._scanner_thread.start()
     
-    def _add_file_to_list(self, file_path):
-        """Añadir archivo a la lista (llamado por el thread)"""
-        self._all_files.append(file_path)
+    def _add_files_to_list(self, file_paths):
+        """Añadir un lote de archivos a la lista (llamado por el thread)"""
+        if self._reconcile_seen is not None:
+            self._reconcile_seen.update(file_paths)
         
-        # Añadir a la UI
-        path = Path(file_path)
+        new_files = self._model.add_files(file_paths)
+        if not new_files:
+            return  # Ya estaban en el catálogo
         
-        item = QListWidgetItem(path.name)
-        item.setData(Qt.UserRole, file_path)
-        
-        # Aplicar color de fondo si hay sistema de navegación
-        if self._nav_system:
-            vote = self._nav_system.get_vote(file_path)
-            if vote == 1:  # Positivo
-                item.setBackground(QColor(76, 175, 80, 100))  # Verde claro
-            elif vote == -1:  # Negativo
-                item.setBackground(QColor(244, 67, 54, 100))  # Rojo claro
-        
-        self.file_list.addItem(item)
+        if self._search is not None:
+            self._search.add(new_files)
+            self._schedule_search_indexing()
         
         # Actualizar contador
-        self.info_label.setText(f"{len(self._all_files)} archivos")
+        self.info_label.setText(f"{len(self._catalog)} archivos")
+        self.filesAdded.emit(new_files)
     
     def _update_progress(self, current, total):
         """Actualizar barra de progreso"""
@@ -202,7 +652,19 @@ class SidebarWidget(QWidget):
     
     def _scan_finished(self, total):
         """Escaneo completado"""
-        self.progress_bar.hide()
+        if self._reconcile_seen is not None:
+            self._finish_reconciliation()
+        
+        # Continuar con los escaneos encolados
+        if self._pending_jobs:
+            jobs, self._pending_jobs = self._pending_jobs, []
+            self._start_scan(jobs)
+            return
+        
+        self._scanning = False
+        if not self._thumbnails_running():
+            self.progress_bar.hide()
+        total = len(self._catalog)
         self.info_label.setText(f"{total} archivos encontrados")
         
         if total == 0:
@@ -211,6 +673,224 @@ class SidebarWidget(QWidget):
         # REFRESCAR VOTOS SI HAY SISTEMA DE NAVEGACIÓN
         if self._nav_system:
             self.refresh_votes()
+        self._model.refresh_order()
+        
+        self._save_library_snapshot()
+        self.libraryChanged.emit()
+        
+        # Detectar duplicados en segundo plano
+        if total > 1:
+            self._start_duplicate_detection()
+    
+    # ========================================
+    # Biblioteca persistente
+    # ========================================
+    
+    def _get_index(self):
+        """MediaIndex del thread de la UI (se abre al primer uso)"""
+        if self._index is None:
+            self._index = MediaIndex()
+        return self._index
+    
+    def restore_library(self) -> bool:
+        """
+        Cargar la biblioteca de la sesión anterior desde la instantánea
+        
+        La lista queda disponible al instante; un escaneo en segundo
+        plano verifica después que siga al día (archivos nuevos se
+        añaden, los borrados se quitan).
+        """
+        if len(self._catalog) or self._scanning:
+            return False
+        
+        try:
+            snapshot = self._get_index().load_library_snapshot()
+        except Exception as e:
+            print(f"Error cargando biblioteca: {e}")
+            return False
+        if not snapshot:
+            return False
+        
+        roots, files = snapshot
+        self._model.restore(roots, files)
+        self._search = None  # Se carga del MediaIndex al buscar
+        self.info_label.setText(f"{len(self._catalog)} archivos")
+        
+        # Solo se verifican las raíces accesibles: un disco desmontado
+        # no debe vaciar su parte de la biblioteca
+        self._reconcile_roots = [r for r in roots if os.path.isdir(r)]
+        if self._reconcile_roots:
+            self._reconcile_seen = set()
+            self._start_scan(
+                [(root, []) for root in self._reconcile_roots],
+                status=f"{len(self._catalog)} archivos (verificando...)"
+            )
+        return True
+    
+    def _finish_reconciliation(self):
+        """Quitar los archivos restaurados que ya no existen"""
+        seen, self._reconcile_seen = self._reconcile_seen, None
+        roots, self._reconcile_roots = self._reconcile_roots, []
+        
+        missing = [
+            f for f in self._catalog.files
+            if f not in seen and any(is_within(f, root) for root in roots)
+        ]
+        if missing:
+            self._model.remove_files(missing)
+            if self._search is not None:
+                self._search.remove(missing)
+                self._search_dirty = True
+            print(f"✓ Biblioteca verificada: {len(missing)} archivos ya no existen")
+    
+    def _save_library_snapshot(self):
+        """
+        Guardar raíces y archivos (y el índice de búsqueda) para el próximo arranque
+        
+        En un thread: con cientos de miles de archivos, serializar el índice
+        y escribir el BLOB bloquearía la UI. Aquí solo se copian las listas.
+        """
+        if self._snapshot_thread is not None and self._snapshot_thread.isRunning():
+            self._snapshot_again = True  # Al terminar, otra vez con lo último
+            return
+        search = None  # Sin cambios: se conserva el guardado
+        if self._search is not None and self._search_dirty:
+            search = self._search.snapshot()
+            self._search_dirty = False
+        self._snapshot_again = False
+        self._snapshot_thread = LibrarySaver(
+            list(self._catalog.roots), list(self._catalog.files), search
+        )
+        self._snapshot_thread.finished.connect(self._on_snapshot_saved)
+        self._snapshot_thread.start()
+    
+    def _on_snapshot_saved(self):
+        thread = self.sender()
+        if thread is not self._snapshot_thread:
+            return
+        if not thread.ok and thread.search is not None:
+            self._search_dirty = True  # Reintentar con el próximo guardado
+        if self._snapshot_again:
+            self._save_library_snapshot()
+    
+    def _wait_snapshot_save(self):
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.wait()
+    
+    # ========================================
+    # Búsqueda
+    # ========================================
+    
+    SEARCH_SLICE = 0.008  # Segundos de búsqueda o indexado por vuelta del bucle de eventos
+    INDEX_STEP = 2000  # Archivos indexados por tramo
+    
+    def _get_search(self) -> SearchIndex:
+        """Índice de búsqueda (el guardado se carga y se ajusta al catálogo)"""
+        if self._search is None:
+            search = None
+            try:
+                data = self._get_index().load_search_index()
+                if data is not None:
+                    search = SearchIndex.loads(data)
+            except Exception as e:
+                print(f"Error cargando índice de búsqueda: {e}")
+            if search is None:
+                search = SearchIndex()
+            search.sync(self._catalog.files, self._catalog.__contains__)
+            self._search = search
+            self._search_dirty = True
+            self._schedule_search_indexing()
+        return self._search
+    
+    def _schedule_search_indexing(self):
+        self._search_dirty = True
+        if self._search.pending and not self._indexer_timer.isActive():
+            self._indexer_timer.start()
+    
+    def _index_search_step(self):
+        """Indexar un tramo de pendientes; al terminar, guardar el índice"""
+        if self._search is None:
+            self._indexer_timer.stop()
+            return
+        if self._search_results is not None:
+            # La búsqueda en curso tiene prioridad; _resume_search_indexing()
+            # lo reanuda al acabar (con intervalo 0, esperar gastaría un núcleo)
+            self._indexer_timer.stop()
+            return
+        self._search_dirty = True
+        if self._search.index_pending(self.INDEX_STEP):
+            return
+        self._indexer_timer.stop()
+        if not self._scanning:
+            self._save_library_snapshot()
+    
+    def _resume_search_indexing(self):
+        """Sin búsqueda en curso: seguir indexando los pendientes"""
+        if self._search is not None and self._search.pending and not self._indexer_timer.isActive():
+            self._indexer_timer.start()
+    
+    def _on_search_changed(self, text):
+        """Nueva búsqueda con cada tecla (la anterior se abandona)"""
+        self._search_results = None
+        self._search_timer.stop()
+        if not text.strip():
+            self._model.set_view(None)
+            self.info_label.setText(f"{len(self._catalog)} archivos")
+            self._resume_search_indexing()
+            return
+        
+        self._search_results = self._get_search().search(text)
+        self._search_found = 0
+        self._model.set_view([])
+        self._stream_search()
+        if self._search_results is not None:
+            self._search_timer.start()
+    
+    def _stream_search(self):
+        """Pasar a la lista los resultados de un tramo de tiempo"""
+        if self._search_results is None:
+            self._search_timer.stop()
+            return
+        deadline = time.perf_counter() + self.SEARCH_SLICE
+        found = []
+        done = False
+        while time.perf_counter() < deadline:
+            try:
+                found.extend(next(self._search_results))
+            except StopIteration:
+                done = True
+                break
+        self._model.append_view(found)
+        self._search_found += len(found)
+        if done:
+            self._search_results = None
+            self._search_timer.stop()
+            self.info_label.setText(f"{self._search_found} de {len(self._catalog)} archivos")
+            self._resume_search_indexing()
+    
+    def get_library_roots(self):
+        """Raíces canónicas de la biblioteca"""
+        return list(self._catalog.roots)
+    
+    def _start_duplicate_detection(self):
+        """Lanzar detección de duplicados sobre el catálogo actual"""
+        self._stop_duplicate_detection()
+        
+        self._duplicate_thread = DuplicateFinder(
+            self._catalog.files.copy(),
+            perceptual=self.detect_near_duplicates
+        )
+        self._duplicate_thread.duplicatesFound.connect(self.duplicatesFound)
+        self._duplicate_thread.mtimesFound.connect(self.mtimesFound)
+        self._duplicate_thread.mtimesFound.connect(self._on_mtimes_found)
+        self._duplicate_thread.sizesFound.connect(self._on_sizes_found)
+        self._duplicate_thread.start()
+    
+    def _stop_duplicate_detection(self):
+        """Cancelar detección de duplicados en curso"""
+        if self._duplicate_thread and self._duplicate_thread.isRunning():
+            self._duplicate_thread.cancel()
+            self._duplicate_thread.wait()
     
     def _clear_all(self):
         """Limpiar lista y directorios"""
@@ -218,58 +898,206 @@ class SidebarWidget(QWidget):
         if self._scanner_thread and self._scanner_thread.isRunning():
             self._scanner_thread.cancel()
             self._scanner_thread.wait()
+        self._stop_duplicate_detection()
+        self._stop_thumbnails()
+        # Que un guardado en curso no escriba después del borrado
+        self._snapshot_again = False
+        self._wait_snapshot_save()
         
-        self._selected_directories.clear()
-        self._all_files.clear()
-        self.file_list.clear()
+        self._scanning = False
+        self._pending_jobs.clear()
+        self._reconcile_seen = None
+        self._reconcile_roots = []
+        self._search_results = None
+        self._search_timer.stop()
+        self._indexer_timer.stop()
+        self._search = SearchIndex()
+        self._search_dirty = False
+        self.search_edit.clear()
+        self._model.clear()
         self.info_label.setText("Sin archivos")
         self.progress_bar.hide()
+        
+        try:
+            self._get_index().clear_library_snapshot()
+        except Exception as e:
+            print(f"Error borrando biblioteca: {e}")
+        self.libraryChanged.emit()
+    
+    # ========================================
+    # Miniaturas
+    # ========================================
+    
+    def _thumbnails_running(self):
+        return self._thumbnail_thread is not None and self._thumbnail_thread.isRunning()
+    
+    def _toggle_thumbnails(self):
+        """Lanzar la generación de miniaturas, o detenerla si está en curso"""
+        if self._thumbnails_running():
+            self._thumbnail_thread.cancel()
+            self.thumbs_btn.setEnabled(False)  # Hasta que termine el bloque en curso
+            return
+        if not len(self._catalog):
+            return
+        
+        self.thumbs_btn.setText("⏹ Miniaturas")
+        if not self._scanning:
+            self.progress_bar.show()
+            self.progress_bar.setRange(0, 0)
+        
+        self._thumbnail_thread = ThumbnailGenerator(self._catalog.files.copy())
+        self._thumbnail_thread.progress.connect(self._update_thumbnail_progress)
+        self._thumbnail_thread.finished.connect(self._thumbnails_finished)
+        self._thumbnail_thread.start()
+    
+    def _update_thumbnail_progress(self, done, total, rate, eta):
+        """Progreso de la granja: hechos/total, ritmo y tiempo restante"""
+        if self._scanning or total <= 0:
+            return
+        text = f"%v/%m · {rate:.0f}/s"
+        if eta >= 0 and done < total:
+            text += f" · quedan {format_duration(eta)}"
+        self.progress_bar.show()
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(text)
+    
+    def _thumbnails_finished(self, counts):
+        """Granja terminada (o detenida)"""
+        self.thumbs_btn.setText("🖼️ Miniaturas")
+        self.thumbs_btn.setEnabled(True)
+        if not self._scanning:
+            self.progress_bar.hide()
+            self.progress_bar.setFormat("%p%")
+        if counts:
+            print(
+                f"✓ Miniaturas: {counts['created']} generadas, {counts['cached']} ya existían, "
+                f"{counts['failed']} fallidas, {counts['cancelled']} pendientes"
+            )
+    
+    def _stop_thumbnails(self):
+        """Detener la granja de miniaturas (el progreso queda guardado)"""
+        if self._thumbnails_running():
+            self._thumbnail_thread.cancel()
+            self._thumbnail_thread.wait()
     
     # ========================================
     # Selección de archivos
     # ========================================
     
-    def _on_item_clicked(self, item):
+    def _on_item_clicked(self, index):
         """Archivo seleccionado en la lista"""
-        file_path = item.data(Qt.UserRole)
+        file_path = self._model.path_at(index.row())
         if file_path:
             self.fileSelected.emit(file_path)
     
     def _show_context_menu(self, position):
         """Menú contextual en la lista"""
-        item = self.file_list.itemAt(position)
-        if not item:
+        file_path = self._model.path_at(self.file_list.indexAt(position).row())
+        if not file_path:
             return
         
         menu = QMenu(self)
         
         # Acción: Abrir en explorador
         open_action = QAction("Abrir ubicación", self)
-        open_action.triggered.connect(lambda: self._open_file_location(item))
+        open_action.triggered.connect(lambda: self._open_file_location(file_path))
         menu.addAction(open_action)
         
         # Acción: Copiar ruta
         copy_action = QAction("Copiar ruta", self)
-        copy_action.triggered.connect(lambda: self._copy_path(item))
+        copy_action.triggered.connect(lambda: self._copy_path(file_path))
         menu.addAction(copy_action)
         
+        # Acción: Aleatorio solo en esta carpeta
+        folder_action = QAction("🎲 Aleatorio en esta carpeta", self)
+        folder_action.triggered.connect(
+            lambda: self.set_folder_filter(os.path.dirname(file_path))
+        )
+        menu.addAction(folder_action)
+        
         menu.exec(self.file_list.mapToGlobal(position))
     
-    def _open_file_location(self, item):
+    def _open_file_location(self, file_path):
         """Abrir ubicación del archivo en el explorador"""
         from PySide6.QtGui import QDesktopServices
         from PySide6.QtCore import QUrl
         
-        file_path = Path(item.data(Qt.UserRole))
-        QDesktopServices.openUrl(QUrl.fromLocalFile(str(file_path.parent)))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(Path(file_path).parent)))
     
-    def _copy_path(self, item):
+    def _copy_path(self, file_path):
         """Copiar ruta al portapapeles"""
         from PySide6.QtWidgets import QApplication
         
-        file_path = item.data(Qt.UserRole)
         QApplication.clipboard().setText(file_path)
     
+    # ========================================
+    # Orden
+    # ========================================
+    
+    SORT_LABELS = ["Escaneo", "Nombre", "Fecha", "Tamaño", "Voto", "Tipo"]
+    SORT_KEYS = [SORT_SCAN, SORT_NAME, SORT_MTIME, SORT_SIZE, SORT_VOTE, SORT_TYPE]
+    
+    def _apply_sort(self):
+        """Cambiar el orden de la lista (conserva el archivo seleccionado)"""
+        current = self._model.path_at(self.get_current_index())
+        descending = self.sort_dir_btn.isChecked()
+        self.sort_dir_btn.setText("↓" if descending else "↑")
+        self._model.set_order(self.SORT_KEYS[self.sort_combo.currentIndex()], descending)
+        if current:
+            self._scroll_to_path(current)
+    
+    def _scroll_to_path(self, file_path):
+        """Volver a marcar un archivo tras reordenar"""
+        row = self._model.row_of(file_path)
+        if row >= 0:
+            index = self._model.index(row)
+            self.file_list.setCurrentIndex(index)
+            self.file_list.scrollTo(index, QListView.PositionAtCenter)
+    
+    def _on_mtimes_found(self, mtimes):
+        self._file_mtimes = mtimes
+    
+    def _on_sizes_found(self, sizes):
+        """Stat terminado: columnas de orden por tamaño y fecha"""
+        self._model.set_stats(sizes, self._file_mtimes)
+    
+    # ========================================
+    # Filtro
+    # ========================================
+    
+    TYPE_FILTER_LABELS = ["Todo", "🖼️ Imágenes", "🎬 Vídeos"]
+    TYPE_FILTERS = [None, MEDIA_IMAGE, MEDIA_VIDEO]
+    VOTE_FILTER_LABELS = ["Todos", "👍", "⚪", "👎", "Sin 👎"]
+    VOTE_FILTERS = [None, (1,), (0,), (-1,), (1, 0)]
+    ANY_YEAR = 1989  # Valor especial del selector de año
+    
+    def current_filter(self) -> FileFilter:
+        """Filtro elegido en la barra y el menú contextual"""
+        mtime_from = mtime_to = None
+        if self.year_filter.value() != self.ANY_YEAR:
+            mtime_from, mtime_to = year_range(self.year_filter.value())
+        return FileFilter(
+            directory=self._folder_filter,
+            media_type=self.TYPE_FILTERS[self.type_filter.currentIndex()],
+            votes=self.VOTE_FILTERS[self.vote_filter.currentIndex()],
+            mtime_from=mtime_from,
+            mtime_to=mtime_to
+        )
+    
+    def set_folder_filter(self, directory):
+        """Limitar la navegación aleatoria a una carpeta (None = quitar)"""
+        self._folder_filter = directory
+        if directory:
+            self.folder_filter_btn.setText(f"📂 {os.path.basename(directory) or directory}  ✕")
+            self.folder_filter_btn.show()
+        else:
+            self.folder_filter_btn.hide()
+        self._emit_filter()
+    
+    def _emit_filter(self):
+        self.filterChanged.emit(self.current_filter())
+    
     # ========================================
     # Sistema de votación
     # ========================================
@@ -277,27 +1105,20 @@ class SidebarWidget(QWidget):
     def set_navigation_system(self, nav_system):
         """Establecer sistema de navegación para mostrar votos"""
         self._nav_system = nav_system
+        self._model.set_navigation_system(nav_system)
         self.refresh_votes()
     
-    def refresh_votes(self):
-        """Refrescar colores de votos en la lista"""
+    def refresh_votes(self, file_path=None):
+        """Refrescar colores de votos en la lista (y el orden por voto)"""
         if not self._nav_system:
             return
         
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            file_path = item.data(Qt.UserRole)
-            
-            if file_path:
-                vote = self._nav_system.get_vote(file_path)
-                
-                # Aplicar color de fondo según voto
-                if vote == 1:  # Positivo
-                    item.setBackground(QColor(76, 175, 80, 100))  # Verde claro
-                elif vote == -1:  # Negativo
-                    item.setBackground(QColor(244, 67, 54, 100))  # Rojo claro
-                else:  # Neutral
-                    item.setBackground(QColor(0, 0, 0, 0))  # Transparente
+        # Con `file_path` solo cambió ese voto: en orden por voto se mueve
+        # una fila en lugar de reagrupar la lista
+        self._model.refresh_votes(file_path)
+        # Los colores se calculan al pintar: basta con repintar lo visible
+        # (dataChanged sobre 500k filas cuesta casi un segundo)
+        self.file_list.viewport().update()
     
     # ========================================
     # API pública
@@ -305,32 +1126,95 @@ class SidebarWidget(QWidget):
     
     def get_all_files(self):
         """Obtener lista completa de archivos"""
-        return self._all_files.copy()
+        return self._catalog.files.copy()
     
     def get_current_index(self):
         """Obtener índice del archivo actual"""
-        return self.file_list.currentRow()
-    
-    def select_next(self):
-        """Seleccionar siguiente archivo"""
-        current = self.file_list.currentRow()
-        if current < self.file_list.count() - 1:
-            self.file_list.setCurrentRow(current + 1)
-            item = self.file_list.currentItem()
-            if item:
-                self.fileSelected.emit(item.data(Qt.UserRole))
-    
-    def select_previous(self):
-        """Seleccionar archivo anterior"""
-        current = self.file_list.currentRow()
+        return self.file_list.currentIndex().row()
+    
+    def _select_row(self, row, emit: bool = True):
+        """Seleccionar una fila y emitir su archivo"""
+        self.file_list.setCurrentIndex(self._model.index(row))
+        if emit:
+            self.emit_current()
+    
+    def current_file(self):
+        """Archivo seleccionado (None si no hay)"""
+        return self._model.path_at(self.get_current_index())
+    
+    def emit_current(self):
+        """Emitir fileSelected con el archivo seleccionado"""
+        file_path = self.current_file()
+        if file_path:
+            self.fileSelected.emit(file_path)
+    
+    def step(self, count: int, emit: bool = True) -> bool:
+        """
+        Moverse `count` filas de golpe (negativo = hacia atrás)
+        
+        Args:
+            emit: Emitir fileSelected con la última (si no, solo se mueve
+                la selección; emit_current() la emite después)
+        
+        Returns:
+            False si ya estaba al final (o al principio)
+        """
+        current = self.get_current_index()
+        rows = self._model.rowCount()
+        target = max(0, min(current + count, rows - 1))
+        if not rows or target == current:
+            return False
+        self._select_row(target, emit)
+        return True
+    
+    def select_next(self) -> bool:
+        """Seleccionar siguiente archivo (False al final de la lista)"""
+        current = self.get_current_index()
+        if current < self._model.rowCount() - 1:
+            self._select_row(current + 1)
+            return True
+        return False
+    
+    def select_previous(self) -> bool:
+        """Seleccionar archivo anterior (False al principio de la lista)"""
+        current = self.get_current_index()
         if current > 0:
-            self.file_list.setCurrentRow(current - 1)
-            item = self.file_list.currentItem()
-            if item:
-                self.fileSelected.emit(item.data(Qt.UserRole))
+            self._select_row(current - 1)
+            return True
+        return False
+    
+    def neighbors(self, ahead: int, behind: int):
+        """
+        Archivos alrededor del seleccionado en el orden de la lista
+        
+        Returns:
+            (siguientes, anteriores), los más cercanos primero
+        """
+        current = self.get_current_index()
+        if current < 0:
+            return [], []
+        path_at = self._model.path_at
+        after = [path_at(r) for r in range(current + 1, min(current + 1 + ahead, self._model.rowCount()))]
+        before = [path_at(r) for r in range(current - 1, max(current - 1 - behind, -1), -1)]
+        return after, before
+    
+    def is_sequential(self) -> bool:
+        return self.sequential_btn.isChecked()
     
     def cleanup(self):
         """Limpiar recursos"""
         if self._scanner_thread and self._scanner_thread.isRunning():
             self._scanner_thread.cancel()
-            self._scanner_thread.wait()
\ No newline at end of file
+            self._scanner_thread.wait()
+        # Escaneo interrumpido: guardar lo encontrado; la verificación del
+        # próximo arranque completará las raíces
+        # Índice de búsqueda a medias: se guarda con sus pendientes
+        self._wait_snapshot_save()
+        if self._scanning or self._search_dirty or self._snapshot_again:
+            self._save_library_snapshot()
+            self._wait_snapshot_save()
+        self._stop_duplicate_detection()
+        self._stop_thumbnails()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
\ No newline at end of file
@@ -0,0 +1,207 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+
+class SlideshowScheduler(QObject):
+    """
+    Presentación automática con plazos por fotograma
+
+    Los cambios van a instantes fijos (inicio + k · periodo, sin deriva
+    acumulada) con un QTimer de precisión. Los siguientes archivos se
+    conocen de antemano (`lookahead`) y se piden decodificados con el
+    plazo de su fotograma; la profundidad de esa cola se adapta a la
+    latencia medida: ceil(latencia / periodo) + 1.
+
+    Al llegar un plazo:
+    - el archivo ya está decodificado: se muestra (a tiempo);
+    - no lo está, pero sí uno posterior: se salta hasta él (saltado);
+    - ninguno lo está: se muestra igualmente con la carga normal, que
+      pinta primero una pasada rápida (degradado).
+    Nunca se bloquea esperando a una decodificación.
+    """
+
+    statsChanged = Signal(dict)
+    stopped = Signal()
+
+    PERIODS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0)  # Segundos por fotograma
+    DEFAULT_PERIOD = 3.0
+    MIN_DEPTH = 1
+    MAX_DEPTH = 8
+
+    def __init__(
+        self,
+        lookahead: Callable[[int], List[str]],
+        advance: Callable[[int], bool],
+        prefetch: Callable[[List[str], Dict[str, float]], None],
+        is_ready: Callable[[str], bool],
+        latency: Callable[[], float],
+        give_up: Callable[[str], None],
+        parent=None
+    ):
+        """
+        Args:
+            lookahead: n -> los próximos n archivos, sin avanzar
+            advance: n -> avanzar n archivos y mostrar el último (False si no hay más)
+            prefetch: (rutas, {ruta: plazo}) -> pedir su decodificación
+            is_ready: ¿Está ya decodificada la ruta?
+            latency: Segundos que tarda hoy una decodificación (media móvil)
+            give_up: Dejar de esperar la decodificación adelantada de la
+                ruta (se mostrará con la carga normal)
+        """
+        super().__init__(parent)
+        self._lookahead = lookahead
+        self._advance = advance
+        self._prefetch = prefetch
+        self._is_ready = is_ready
+        self._latency = latency
+        self._give_up = give_up
+
+        self.period = self.DEFAULT_PERIOD
+        self.depth = 2
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self._active = False  # El temporizador es de un disparo: en _tick ya no está activo
+        self._origin = 0.0  # Instante del fotograma 0
+        self._frame = 0
+        self._reset_stats()
+
+    @property
+    def running(self) -> bool:
+        return self._active
+
+    def _reset_stats(self):
+        self.on_time = 0
+        self.degraded = 0  # Plazo incumplido: mostrado con la carga normal
+        self.skipped = 0  # Archivos saltados para no perder el ritmo
+        self.lateness = deque(maxlen=500)  # Retraso del temporizador en los últimos fotogramas
+
+    # ========================================
+    # Control
+    # ========================================
+
+    def start(self):
+        self._reset_stats()
+        self._active = True
+        self._resync()
+
+    def stop(self):
+        if self._active:
+            self._active = False
+            self._timer.stop()
+            self.stopped.emit()
+
+    def set_period(self, period: float):
+        """Nuevo periodo; la cuenta de fotogramas empieza de nuevo desde ahora"""
+        self.period = max(self.PERIODS[0], period)
+        if self.running:
+            self._resync()
+
+    def step_period(self, direction: int):
+        """Periodo anterior (-1, más rápido) o siguiente (+1) de PERIODS"""
+        index = min(range(len(self.PERIODS)), key=lambda i: abs(self.PERIODS[i] - self.period))
+        index = max(0, min(len(self.PERIODS) - 1, index + direction))
+        self.set_period(self.PERIODS[index])
+
+    def _resync(self):
+        """Fotograma 0 = ahora (tras iniciar, cambiar de ritmo o navegar a mano)"""
+        self._origin = time.monotonic()
+        self._frame = 0
+        self._request_decodes()
+        self._arm()
+
+    def postpone(self):
+        """Navegación a mano en curso: aplazar el próximo cambio sin pedir nada"""
+        if self._active:
+            self._origin = time.monotonic()
+            self._frame = 0
+            self._arm()
+
+    def navigated(self):
+        """El usuario navegó a mano: el siguiente cambio, un periodo después"""
+        if self.running:
+            self._resync()
+
+    # ========================================
+    # Planificación
+    # ========================================
+
+    def _deadline(self, frame: int) -> float:
+        return self._origin + frame * self.period
+
+    def _arm(self):
+        delay = self._deadline(self._frame + 1) - time.monotonic()
+        self._timer.start(max(0, round(delay * 1000)))
+
+    def _adapt_depth(self):
+        """Fotogramas a decodificar por adelantado según la latencia medida"""
+        latency = self._latency()
+        depth = math.ceil(latency / self.period) + 1 if latency else 2
+        self.depth = max(self.MIN_DEPTH, min(self.MAX_DEPTH, depth))
+
+    def _request_decodes(self):
+        self._adapt_depth()
+        upcoming = self._lookahead(self.depth)
+        deadlines = {
+            path: self._deadline(self._frame + i + 1) for i, path in enumerate(upcoming)
+        }
+        self._prefetch(upcoming, deadlines)
+
+    def _tick(self):
+        self._frame += 1
+        self.lateness.append(time.monotonic() - self._deadline(self._frame))
+
+        upcoming = self._lookahead(self.depth)
+        ready = [i for i, path in enumerate(upcoming) if self._is_ready(path)]
+        if not upcoming:
+            steps = 1
+        elif ready and ready[0] == 0:
+            steps = 1
+            self.on_time += 1
+        elif ready:
+            # El siguiente no llega: saltar al primero que sí está listo
+            steps = ready[0] + 1
+            self.skipped += ready[0]
+        else:
+            # Esperarla dejaría la anterior en pantalla: mejor la carga
+            # progresiva, que pinta enseguida una primera pasada
+            steps = 1
+            self.degraded += 1
+            self._give_up(upcoming[0])
+
+        if not self._advance(steps):
+            self.stop()
+            return
+
+        # El fotograma perdido no se recupera: si el tick llegó tarde más de
+        # un periodo, se sigue desde el siguiente instante futuro
+        behind = int((time.monotonic() - self._deadline(self._frame)) // self.period)
+        if behind > 0:
+            self._frame += behind
+        self._request_decodes()
+        self._arm()
+        self.statsChanged.emit(self.stats())
+
+    # ========================================
+    # Estadísticas
+    # ========================================
+
+    def stats(self) -> Dict:
+        shown = self.on_time + self.degraded
+        late = sorted(self.lateness)
+        return {
+            'period': self.period,
+            'depth': self.depth,
+            'shown': shown,
+            'on_time': self.on_time,
+            'degraded': self.degraded,
+            'skipped': self.skipped,
+            'missed_ratio': (self.degraded + self.skipped) / max(1, shown + self.skipped),
+            'decode_latency_ms': self._latency() * 1000,
+            'timer_late_p95_ms': late[int(len(late) * 0.95)] * 1000 if late else 0.0,
+        }
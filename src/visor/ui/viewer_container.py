@@ -1,67 +1,92 @@
+import sqlite3
+import time
+from collections import deque
 from pathlib import Path
 
 from PySide6.QtWidgets import (
     QWidget, QLabel, QPushButton, QSlider,
     QVBoxLayout, QHBoxLayout, QStackedLayout, QMessageBox
 )
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtMultimediaWidgets import QVideoWidget
-from PySide6.QtCore import Qt, QUrl, QTimer, QSize, Signal, QThread
-from PySide6.QtGui import QPixmap, QKeyEvent, QImageReader
-
-
-IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".gif"}
-VIDEO_EXTENSIONS = {".mp4", ".mkv", ".avi", ".webm", ".mov"}
+from PySide6.QtCore import Qt, QUrl, QTimer, Signal, QThread
+from PySide6.QtGui import QPixmap, QKeyEvent, QFont, QGuiApplication
+
+from .animation_player import AnimationPlayer, ANIMATED_EXTENSIONS, is_animated
+from .progressive_loader import ProgressiveLoader
+from .image_buffer import ImageBuffer
+from .neighbor_prefetch import NeighborPrefetcher
+from .image_io import read_image, image_from_slot, store_in_pixel_cache, fit_pixmap
+from ..services.exif import NO_EXIF, cached_exif
+from ..services.file_catalog import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from ..services.media_index import MediaIndex
+from ..services.pixel_cache import PixelCache
+from ..services.profiler import profiler, traced
+from ..services.thumbnails import ThumbnailCache
 
 
 class ImagePreloader(QThread):
     """Thread para pre-cargar imágenes en segundo plano"""
-    imageLoaded = Signal(str, QPixmap)  # (path, pixmap)
+    imageLoaded = Signal(str, object)  # (path, ImageBuffer): el QPixmap se crea al mostrarla
     
     def __init__(self):
         super().__init__()
         self.path_to_load = None
+        self.priority = None
         self.should_stop = False
+        self.pixel_cache = None  # PixelCache compartida con el visor
+        self._prefetch = []  # [(path, prioridad)]: solo a la caché de píxeles
     
-    def load_image(self, path: str):
+    def load_image(self, path: str, priority=None):
         """Solicitar carga de imagen"""
         self.path_to_load = path
+        self.priority = priority
         if not self.isRunning():
             self.start()
     
+    def prefetch(self, items):
+        """Decodificar a la caché de píxeles sin emitir nada (sustituye la cola anterior)"""
+        self._prefetch = list(items)
+        if self._prefetch and not self.isRunning():
+            self.start()
+    
     def run(self):
-        """Cargar imagen en segundo plano"""
-        if not self.path_to_load:
+        """Cargar imagen en segundo plano; después, la cola de precarga"""
+        while not self.should_stop:
+            if self.path_to_load:
+                path, priority = self.path_to_load, self.priority
+                self.path_to_load = None
+                self._load(path, priority, emit=True)
+            elif self._prefetch:
+                path, priority = self._prefetch.pop(0)
+                if self.pixel_cache and path not in self.pixel_cache:
+                    self._load(path, priority, emit=False)
+            else:
+                return
+    
+    def _load(self, path: str, priority, emit: bool):
+        # Las animaciones las decodifica su propio reproductor al mostrarlas
+        if Path(path).suffix.lower() in ANIMATED_EXTENSIONS and is_animated(path):
             return
-        
-        path = self.path_to_load
-        self.path_to_load = None
-        
-        # Leer imagen
-        reader = QImageReader(path)
-        if not reader.canRead():
+
+        # Ya decodificada en la caché de píxeles: el visor la leerá de ahí
+        # sin copias intermedias
+        if self.pixel_cache and path in self.pixel_cache:
             return
         
-        original_size = reader.size()
-        max_dimension = 7680
-        
-        # Escalar si es necesario
-        if original_size.width() > max_dimension or original_size.height() > max_dimension:
-            if original_size.width() > original_size.height():
-                scale_factor = max_dimension / original_size.width()
-            else:
-                scale_factor = max_dimension / original_size.height()
-            
-            new_width = int(original_size.width() * scale_factor)
-            new_height = int(original_size.height() * scale_factor)
-            
-            reader.setScaledSize(QSize(new_width, new_height))
-        
-        image = reader.read()
+        with profiler.span("preloader.decode", path=path):
+            image, _ = read_image(path)
+        if image.isNull():
+            return
+        if self.pixel_cache:
+            store_in_pixel_cache(self.pixel_cache, path, image, priority)
         
-        if not image.isNull():
-            pixmap = QPixmap.fromImage(image)
-            self.imageLoaded.emit(path, pixmap)
+        if emit:
+            # Solo QImage fuera del thread de la UI: QPixmap no es seguro aquí
+            self.imageLoaded.emit(path, ImageBuffer(image))
+    
+    def cancel(self):
+        """Olvidar lo pedido que aún no ha empezado (la decodificación en curso termina)"""
+        self.path_to_load = None
+        self._prefetch = []
     
     def stop(self):
         """Detener thread"""
@@ -73,29 +98,42 @@ class ViewerContainer(QWidget):
     voteChanged = Signal(str, int)  # (file_path, vote: 1/-1/0)
     requestNext = Signal()  # Solicitar siguiente archivo aleatorio
     requestPrevious = Signal()  # Solicitar archivo anterior
+    requestSkip = Signal(int)  # Autorrepetición de →/←: +1/-1 sin mostrar todavía
+    slideshowToggled = Signal()  # P: iniciar/detener la presentación
+    slideshowSpeed = Signal(int)  # +/-: -1 más rápida, +1 más lenta
     
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self._duration = 0
         self._current_pixmap = None
+        self._frame_copies = deque(maxlen=100)  # Copias de píxeles de cada imagen mostrada
+        self._orientation = 1  # Orientación EXIF de la imagen actual (se aplica al pintar)
+        self._index = None  # MediaIndex (caché de EXIF), se abre al primer uso; False si falla
         self._seeking = False
         self._video_widget = None
         self._current_file = None
 
-        self._preloaded_cache = {}  # Caché: {path: pixmap}
+        self._preloaded_cache = {}  # Caché: {path: ImageBuffer}
+        self._pixel_cache = None  # Segundo nivel: píxeles en disco (se abre al primer uso)
+        self._cache_priority = None  # path -> prioridad de retención (NavigationSystem)
         self._preloader = ImagePreloader()
         self._preloader.imageLoaded.connect(self._on_image_preloaded)
+        self._animation = AnimationPlayer(self)
+        self._animation.frameReady.connect(self._on_animation_frame)
+        self._progressive = ProgressiveLoader(ThumbnailCache())
+        self._progressive.passReady.connect(self._on_progressive_pass)
+        self._progressive.failed.connect(self._on_progressive_failed)
+        # Navegación secuencial: vecinos decodificados en paralelo
+        self._neighbors = NeighborPrefetcher(self)
+        self._neighbors.imageReady.connect(self._on_neighbor_ready)
+        self._awaiting_neighbor = None  # Actual, aún decodificándose en la ventana
 
         # ---------------- Player ----------------
-        self.player = QMediaPlayer(self)
-        self.audio = QAudioOutput(self)
-        self.player.setAudioOutput(self.audio)
-
-        # Connect player signals (persistent)
-        self.player.positionChanged.connect(self._on_position)
-        self.player.durationChanged.connect(self._on_duration)
-        self.player.playbackStateChanged.connect(self._on_state)
+        # QtMultimedia se importa con el primer video (arranque más rápido)
+        self.player = None
+        self.audio = None
+        self._playing_state = None
 
         # ---------------- Stack ----------------
         self.stack = QStackedLayout(self)
@@ -129,6 +167,9 @@ class ViewerContainer(QWidget):
 
         self.setFocusPolicy(Qt.StrongFocus)
 
+        # HUD de rendimiento (F3), fuera del layout para superponerse
+        self._create_perf_hud()
+
     # =================================================
     # Voting controls
     # =================================================
@@ -240,9 +281,9 @@ class ViewerContainer(QWidget):
         """Set current vote from external source"""
         self._update_vote_display(vote)
 
-    def _on_image_preloaded(self, path: str, pixmap: QPixmap):
+    def _on_image_preloaded(self, path: str, buffer: ImageBuffer):
         """Imagen pre-cargada en caché"""
-        self._preloaded_cache[path] = pixmap
+        self._preloaded_cache[path] = buffer
         # Mantener solo 3 imágenes en caché
         if len(self._preloaded_cache) > 3:
             # Eliminar la más antigua (primera)
@@ -264,7 +305,98 @@ class ViewerContainer(QWidget):
             return
         
         # Solicitar carga en segundo plano
-        self._preloader.load_image(next_path)
+        self._preloader.load_image(next_path, self._priority_of(next_path))
+
+    def prefetch(self, paths):
+        """Decodificar a la caché de píxeles imágenes que probablemente salgan pronto"""
+        cache = self._get_pixel_cache()
+        if not cache:
+            return
+        items = [
+            (p, self._priority_of(p)) for p in paths
+            if Path(p).suffix.lower() in IMAGE_EXTENSIONS
+            and p not in self._preloaded_cache and p not in cache
+        ]
+        if items:
+            self._preloader.prefetch(items)
+
+    NEIGHBORS_AHEAD = NeighborPrefetcher.AHEAD
+    NEIGHBORS_BEHIND = NeighborPrefetcher.BEHIND
+
+    def prefetch_neighbors(self, ahead, behind=(), deadlines=None):
+        """
+        Navegación secuencial o presentación: mantener decodificados los
+        `ahead` siguientes y los `behind` anteriores (la ventana se desliza)
+
+        Args:
+            deadlines: {ruta: time.monotonic()} en que se mostrará; lo que
+                no llegaría a tiempo no se decodifica
+        """
+        self._neighbors.set_target_size(self.image_label.size())
+        # La actual, si aún se decodifica, se queda hasta mostrarse
+        self._neighbors.update(ahead, behind, deadlines, pinned=self._awaiting_neighbor)
+        self._resume_awaited()
+
+    def is_decoded(self, path: str) -> bool:
+        """¿Se mostraría `path` sin decodificar?"""
+        if self._neighbors.is_ready(path) or path in self._preloaded_cache:
+            return True
+        return bool(self._pixel_cache) and path in self._pixel_cache
+
+    def decode_latency(self) -> float:
+        """Segundos por decodificación en la ventana de vecinos (media móvil)"""
+        return self._neighbors.latency
+
+    def drop_neighbor(self, path: str):
+        """No esperar a la ventana por `path`: al mostrarlo, carga normal"""
+        self._neighbors.discard(path)
+
+    def clear_neighbors(self):
+        """Salir de la navegación secuencial: liberar la ventana"""
+        self._neighbors.clear()
+        self._resume_awaited()
+
+    def _resume_awaited(self):
+        """La actual salió de la ventana sin llegar (p. ej. otro tamaño): carga normal"""
+        path = self._awaiting_neighbor
+        if path is not None and path == self._current_file and not self._neighbors.pending(path):
+            self._show_image(path)
+
+    def _on_neighbor_ready(self, path: str, buffer):
+        """Vecino decodificado; si es el que se espera en pantalla, mostrarlo"""
+        if path != self._awaiting_neighbor or path != self._current_file:
+            return
+        self._awaiting_neighbor = None
+        if buffer is None:
+            self._show_image(path)  # Falló en la ventana: carga normal (con su error)
+            return
+        self._display(buffer.image, buffer.copies)
+        self.stack.setCurrentIndex(0)
+
+    def cancel_pending(self):
+        """Cancelar las decodificaciones en curso o pedidas (se van a saltar)"""
+        self._progressive.cancel()
+        self._preloader.cancel()
+        self._neighbors.cancel_pending()
+        self._awaiting_neighbor = None  # Se vuelve a mostrar al vencer el plazo
+
+    def set_cache_priority(self, priority):
+        """
+        Política de las cachés según la navegación
+        
+        Args:
+            priority: Callable path -> float (0 = no volverá a salir), o None para LRU
+        """
+        self._cache_priority = priority
+
+    def _priority_of(self, path: str):
+        return self._cache_priority(path) if self._cache_priority else None
+
+    def forget(self, path: str):
+        """Sacar un archivo de las cachés (p. ej. negativo bloqueado)"""
+        self._preloaded_cache.pop(path, None)
+        if self._pixel_cache:
+            self._pixel_cache.discard(path)
 
     # =================================================
     # Video widgets - Create/Destroy
@@ -287,11 +419,10 @@ class ViewerContainer(QWidget):
         # Volume setup: 0-100 range, default 10
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(10)
-        self.audio.setVolume(0.1)  # Set initial volume (10%)
 
         # Connect signals
         self.play_button.clicked.connect(self.toggle_play)
-        self.position_slider.sliderMoved.connect(self.player.setPosition)
+        self.position_slider.sliderMoved.connect(self._on_slider_moved)
         self.position_slider.sliderPressed.connect(lambda: setattr(self, '_seeking', True))
         self.position_slider.sliderReleased.connect(lambda: setattr(self, '_seeking', False))
         self.volume_slider.valueChanged.connect(self._on_volume_changed)
@@ -329,11 +460,31 @@ class ViewerContainer(QWidget):
         # Add controls to video page
         self.video_layout.addWidget(self.controls_widget)
 
+    def _ensure_player(self):
+        """Crear el reproductor la primera vez que se abre un video"""
+        if self.player is not None:
+            return
+
+        from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+        self._playing_state = QMediaPlayer.PlayingState
+        self.player = QMediaPlayer(self)
+        self.audio = QAudioOutput(self)
+        self.player.setAudioOutput(self.audio)
+        self.audio.setVolume(self.volume_slider.value() / 100.0)
+
+        # Connect player signals (persistent)
+        self.player.positionChanged.connect(self._on_position)
+        self.player.durationChanged.connect(self._on_duration)
+        self.player.playbackStateChanged.connect(self._on_state)
+
     def _create_video_widget(self):
         """Create video widget when needed"""
         if self._video_widget is not None:
             return  # Already exists
-            
+
+        from PySide6.QtMultimediaWidgets import QVideoWidget
+
         self._video_widget = QVideoWidget()
         self._video_widget.setStyleSheet("background-color: black;")
         
@@ -349,7 +500,8 @@ class ViewerContainer(QWidget):
             return  # Already destroyed
         
         # Disconnect from player
-        self.player.setVideoOutput(None)
+        if self.player is not None:
+            self.player.setVideoOutput(None)
         
         # Remove from layout
         self.video_layout.removeWidget(self._video_widget)
@@ -376,58 +528,160 @@ class ViewerContainer(QWidget):
     # Image handling
     # =================================================
 
+    @traced("viewer.show_image")
     def _show_image(self, path: str):
         """Display an image file with smart loading"""
-        self.player.stop()
+        if self.player is not None:
+            self.player.stop()
         self._destroy_video_widget()
+        self._animation.stop()
+        self._progressive.cancel()
+        self._awaiting_neighbor = None
+        self._orientation = 1
+
+        # GIF/WebP animados: fotogramas decodificados fuera del thread de la UI
+        if Path(path).suffix.lower() in ANIMATED_EXTENSIONS and is_animated(path):
+            if self._animation.play(path, self.image_label.size()):
+                self.stack.setCurrentIndex(0)
+                self.setFocus()
+                self.activateWindow()
+                return
         
+        exif = self._exif_for(path)
+        self._orientation = exif.orientation
+
+        # Ventana de la navegación secuencial: ya decodificada, o en camino
+        # (mientras tanto sigue en pantalla la anterior, nunca un hueco)
+        buffer = self._neighbors.get(path)
+        if buffer is not None or self._neighbors.pending(path):
+            if buffer is not None:
+                self._display(buffer.image, buffer.copies)
+            else:
+                self._awaiting_neighbor = path
+            self.stack.setCurrentIndex(0)
+            self.setFocus()
+            self.activateWindow()
+            return
+
         # Verificar si está en caché
         if path in self._preloaded_cache:
-            pixmap = self._preloaded_cache[path]
+            buffer = self._preloaded_cache[path]
             print(f"✓ Usando imagen pre-cargada: {Path(path).name}")
-            self._current_pixmap = pixmap
-            self._update_image()
+            self._display(buffer.image, buffer.copies)
             self.stack.setCurrentIndex(0)
             self.setFocus()
             self.activateWindow()
             return
         
-        # Si no está en caché, cargar normalmente
-        reader = QImageReader(path)
-        
-        if not reader.canRead():
-            QMessageBox.warning(self, "Error", f"No se puede leer la imagen:\n{path}")
+        # Segundo nivel: píxeles ya decodificados a resolución de pantalla
+        cache = self._get_pixel_cache()
+        slot = cache.get(path) if cache else None
+        if slot is not None:
+            with slot:
+                # Vista sin copia sobre el archivo mapeado: la única copia es el QPixmap
+                self._display(image_from_slot(slot))
+            print(f"✓ Usando píxeles cacheados: {Path(path).name}")
+        elif ProgressiveLoader.accepts(path):
+            # Archivos grandes: pasadas cada vez más finas desde otro thread
+            self._progressive.load(path, self.image_label.size(), exif)
+            self.stack.setCurrentIndex(0)
+            self.setFocus()
+            self.activateWindow()
             return
+        else:
+            image = self._decode_image(path)
+            if image is None:
+                return
+            self._display(image)
         
-        original_size = reader.size()
-        max_dimension = 7680
-        
-        if original_size.width() > max_dimension or original_size.height() > max_dimension:
-            if original_size.width() > original_size.height():
-                scale_factor = max_dimension / original_size.width()
-            else:
-                scale_factor = max_dimension / original_size.height()
-            
-            new_width = int(original_size.width() * scale_factor)
-            new_height = int(original_size.height() * scale_factor)
-            
-            reader.setScaledSize(QSize(new_width, new_height))
-            print(f"Imagen redimensionada de {original_size.width()}x{original_size.height()} a {new_width}x{new_height}")
-        
-        image = reader.read()
+        self.stack.setCurrentIndex(0)
+        self.setFocus()
+        self.activateWindow()
+
+    def _exif_for(self, path: str):
+        """Orientación y preview embebido (cacheados en el índice)"""
+        if Path(path).suffix.lower() not in ('.jpg', '.jpeg'):
+            return NO_EXIF
+        if self._index is None:
+            try:
+                self._index = MediaIndex()
+            except sqlite3.Error as e:
+                print(f"⚠ EXIF sin caché (índice no disponible): {e}")
+                self._index = False
+        return cached_exif(self._index or None, path)
+
+    def _decode_image(self, path: str):
+        """Decodificar en este thread (y guardar en la caché de píxeles)"""
+        image, error = read_image(path)
         
         if image.isNull():
-            error = reader.errorString()
-            QMessageBox.warning(self, "Error", f"Error al cargar imagen:\n{error}")
+            QMessageBox.warning(self, "Error", error)
+            return None
+        
+        cache = self._get_pixel_cache()
+        if cache:
+            # Después de pintar: guardar no retrasa la imagen actual
+            QTimer.singleShot(0, lambda: self._store_pixels(cache, path, image))
+        return image
+
+    def _display(self, image, copies: int = 0):
+        """
+        Mostrar un QImage: el QPixmap se crea aquí, en el thread de la UI
+
+        Args:
+            copies: Copias completas de los píxeles hechas antes de llegar aquí
+        """
+        with profiler.span("viewer.to_pixmap"):
+            self._current_pixmap = QPixmap.fromImage(image)
+        self._frame_copies.append(copies + 1)
+        self._update_image()
+
+    def _on_progressive_pass(self, path: str, buffer: ImageBuffer, final: bool):
+        """Sustituir la pasada anterior (misma proporción: sin saltos)"""
+        if path != self._current_file:
             return
-        
+        self._display(buffer.image, buffer.copies)
+        cache = self._get_pixel_cache() if final else None
+        if cache:
+            QTimer.singleShot(0, lambda: self._store_pixels(cache, path, buffer.image))
+
+    def _on_progressive_failed(self, path: str):
+        """La carga progresiva no sirve para este archivo: carga normal"""
+        if path != self._current_file:
+            return
+        image = self._decode_image(path)
+        if image is not None:
+            self._display(image)
+
+    def _on_animation_frame(self, image):
+        """Pintar un fotograma (ya viene escalado al tamaño de la vista)"""
         pixmap = QPixmap.fromImage(image)
-        
+        self._frame_copies.append(2)  # Conversión a ARGB32 premultiplicado + QPixmap
         self._current_pixmap = pixmap
-        self._update_image()
-        self.stack.setCurrentIndex(0)
-        self.setFocus()
-        self.activateWindow()
+        size = self.image_label.size()
+        if pixmap.width() > size.width() or pixmap.height() > size.height():
+            # La ventana se ha reducido tras empezar la reproducción
+            pixmap = pixmap.scaled(size, Qt.KeepAspectRatio, Qt.FastTransformation)
+        self.image_label.setPixmap(pixmap)
+
+    def _store_pixels(self, cache, path: str, image):
+        """Guardar en la caché de píxeles y reordenar sus prioridades"""
+        if self._cache_priority:
+            cache.reprioritize(self._cache_priority)
+        store_in_pixel_cache(cache, path, image, self._priority_of(path))
+
+    def _get_pixel_cache(self):
+        """Caché de píxeles con huecos del tamaño de la pantalla (None si no disponible)"""
+        if self._pixel_cache is None:
+            screen = self.screen() or QGuiApplication.primaryScreen()
+            size = screen.size() * screen.devicePixelRatio() if screen else None
+            try:
+                self._pixel_cache = PixelCache(size.width(), size.height())
+            except (OSError, RuntimeError, AttributeError) as e:
+                print(f"⚠ Caché de píxeles desactivada: {e}")
+                self._pixel_cache = False
+            self._preloader.pixel_cache = self._pixel_cache or None
+        return self._pixel_cache or None
 
     def resizeEvent(self, event):
         """Handle window resize for image scaling"""
@@ -437,15 +691,12 @@ class ViewerContainer(QWidget):
         if self.stack.currentIndex() == 0 and self._current_pixmap:
             QTimer.singleShot(10, self._update_image)
 
+    @traced("viewer.update_image")
     def _update_image(self):
         """Update image scaling to fit current widget size"""
         if self._current_pixmap:
             self.image_label.setPixmap(
-                self._current_pixmap.scaled(
-                    self.image_label.size(),
-                    Qt.KeepAspectRatio,
-                    Qt.SmoothTransformation,
-                )
+                fit_pixmap(self._current_pixmap, self.image_label.size(), self._orientation)
             )
 
     # =================================================
@@ -454,7 +705,10 @@ class ViewerContainer(QWidget):
 
     def _show_video(self, path: str):
         """Display a video file"""
-        # Create video widget if needed
+        self._animation.stop()
+        self._progressive.cancel()
+        # Create player and video widget if needed
+        self._ensure_player()
         self._create_video_widget()
         
         self.stack.setCurrentIndex(1)
@@ -470,13 +724,21 @@ class ViewerContainer(QWidget):
     def keyPressEvent(self, event: QKeyEvent):
         """Handle keyboard shortcuts"""
         # NAVEGACIÓN (funcionan siempre)
+        # Con la tecla mantenida, las repeticiones solo avanzan la navegación:
+        # quien las recibe agrupa y decodifica solo el fotograma que se ve
         if event.key() == Qt.Key_Right:
             # Siguiente archivo
-            self.requestNext.emit()
+            if event.isAutoRepeat():
+                self.requestSkip.emit(1)
+            else:
+                self.requestNext.emit()
             event.accept()
         elif event.key() == Qt.Key_Left:
             # Archivo anterior
-            self.requestPrevious.emit()
+            if event.isAutoRepeat():
+                self.requestSkip.emit(-1)
+            else:
+                self.requestPrevious.emit()
             event.accept()
         
         # VOTACIÓN (funcionan siempre)
@@ -489,6 +751,17 @@ class ViewerContainer(QWidget):
             self._vote(-1)
             event.accept()
         
+        # PRESENTACIÓN
+        elif event.key() == Qt.Key_P:
+            self.slideshowToggled.emit()
+            event.accept()
+        elif event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.slideshowSpeed.emit(-1)
+            event.accept()
+        elif event.key() == Qt.Key_Minus:
+            self.slideshowSpeed.emit(1)
+            event.accept()
+        
         # CONTROLES DE VIDEO (solo cuando hay video)
         elif event.key() == Qt.Key_Space and self.stack.currentIndex() == 1:
             self.toggle_play()
@@ -501,16 +774,91 @@ class ViewerContainer(QWidget):
             # Volume down
             self.volume_slider.setValue(max(0, self.volume_slider.value() - 10))
             event.accept()
+        
+        # RENDIMIENTO: F3 muestra el HUD, Shift+F3 guarda un trace
+        elif event.key() == Qt.Key_F3:
+            if event.modifiers() & Qt.ShiftModifier:
+                self._dump_trace()
+            else:
+                self.toggle_perf_hud()
+            event.accept()
         else:
             super().keyPressEvent(event)
 
+    # =================================================
+    # Performance HUD
+    # =================================================
+
+    def _create_perf_hud(self):
+        """Etiqueta semitransparente con los percentiles de cada span"""
+        self.perf_hud = QLabel(self)
+        self.perf_hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+        font = QFont("monospace")
+        font.setStyleHint(QFont.Monospace)
+        font.setPointSize(9)
+        self.perf_hud.setFont(font)
+        self.perf_hud.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 170);
+                color: #7CFC00;
+                padding: 6px;
+                border-radius: 3px;
+            }
+        """)
+        self.perf_hud.hide()
+
+        self._hud_timer = QTimer(self)
+        self._hud_timer.setInterval(500)
+        self._hud_timer.timeout.connect(self._refresh_perf_hud)
+
+    def toggle_perf_hud(self):
+        """Mostrar/ocultar el HUD de rendimiento"""
+        if self.perf_hud.isVisible():
+            self._hud_timer.stop()
+            self.perf_hud.hide()
+        else:
+            self._refresh_perf_hud()
+            self.perf_hud.show()
+            self.perf_hud.raise_()
+            self._hud_timer.start()
+
+    def _refresh_perf_hud(self):
+        """Actualizar texto del HUD (tiempos en ms)"""
+        text = profiler.format_stats() if profiler.enabled else "Perfilado desactivado (VISOR_PROFILE=0)"
+        if self._pixel_cache:
+            stats = self._pixel_cache.stats()
+            text += (f"\n\nCaché de píxeles: {stats['entries']}/{stats['slots']} · "
+                     f"aciertos {stats['hit_rate']:.0%} ({stats['hits']}/{stats['hits'] + stats['misses']})"
+                     f" · LRU {stats['lru_hit_rate']:.0%}")
+        if self._animation.is_playing():
+            mode = "en memoria" if self._animation.is_cached() else "streaming"
+            text += f"\nAnimación: {mode} · fotogramas tarde {self._animation.stalls}"
+        if self._frame_copies:
+            copies = self._frame_copies
+            text += (f"\nCopias de píxeles por imagen: {sum(copies) / len(copies):.1f}"
+                     f" (última {copies[-1]})")
+        self.perf_hud.setText(text + "\n\nF3 ocultar · Shift+F3 guardar trace")
+        self.perf_hud.adjustSize()
+        self.perf_hud.move(8, 8)
+
+    def _dump_trace(self):
+        """Guardar trace de Chrome en el home del usuario"""
+        path = Path.home() / f"visor_trace_{time.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            count = profiler.dump_chrome_trace(path)
+            print(f"✓ Trace guardado: {path} ({count} eventos)")
+        except OSError as e:
+            print(f"⚠ No se pudo guardar el trace: {e}")
+
     # =================================================
     # Player controls
     # =================================================
 
     def toggle_play(self):
         """Toggle between play and pause"""
-        if self.player.playbackState() == QMediaPlayer.PlayingState:
+        if self.player is None:
+            return
+        if self.player.playbackState() == self._playing_state:
             self.player.pause()
         else:
             self.player.play()
@@ -518,7 +866,13 @@ class ViewerContainer(QWidget):
     def _on_volume_changed(self, value):
         """Handle volume slider changes"""
         volume = value / 100.0
-        self.audio.setVolume(volume)
+        if self.audio is not None:
+            self.audio.setVolume(volume)
+
+    def _on_slider_moved(self, position):
+        """Seek while dragging the position slider"""
+        if self.player is not None:
+            self.player.setPosition(position)
 
     # =================================================
     # Player signal handlers
@@ -539,7 +893,7 @@ class ViewerContainer(QWidget):
 
     def _on_state(self, state):
         """Update play button icon based on playback state"""
-        self.play_button.setText("⏸" if state == QMediaPlayer.PlayingState else "▶")
+        self.play_button.setText("⏸" if state == self._playing_state else "▶")
 
     def _update_time(self, pos, dur):
         """Update time label with current position and duration"""
@@ -555,7 +909,17 @@ class ViewerContainer(QWidget):
 
     def cleanup(self):
         """Clean up resources when closing"""
-        self.player.stop()
+        self._hud_timer.stop()
+        self._animation.stop()
+        self._progressive.stop()
+        if self.player is not None:
+            self.player.stop()
         self._destroy_video_widget()
         self._preloader.stop()  
-        self._preloaded_cache.clear() 
\ No newline at end of file
+        self._neighbors.shutdown()
+        self._preloaded_cache.clear() 
+        if self._pixel_cache:
+            self._pixel_cache.close()
+        if self._index:
+            self._index.close()
+        self._index = None
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+import random
+import time
+
+import pytest
+
+from visor.services.file_catalog import is_within
+from visor.services.filter_index import FileFilter, FilterIndex, bit_rows, media_type_of, year_range
+
+
+DIRS = ("/fotos", "/fotos/2023", "/fotos/2023/playa", "/fotos/2024", "/videos", "/fotos2")
+
+
+@pytest.fixture(autouse=True)
+def madrid_time(monkeypatch):
+    # Zona con horario de verano: los bordes de mes no son múltiplos de un día UTC
+    monkeypatch.setenv("TZ", "Europe/Madrid")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def month_start(year, month):
+    return time.mktime((year, month, 1, 0, 0, 0, 0, 0, -1))
+
+
+def edge_mtimes():
+    """Fechas en los bordes de mes, con segundos y fracciones alrededor"""
+    values = []
+    for year in (2023, 2024):
+        for month in range(1, 13):
+            start = month_start(year, month)
+            values += [start - 1, start - 0.5, start, start + 0.25, start + 1, start + 86400 * 14.5]
+    return values
+
+
+def make_library(count=600, seed=1):
+    rng = random.Random(seed)
+    paths, votes, mtimes = [], {}, {}
+    exts = (".jpg", ".png", ".mp4", ".txt")
+    mtime_choices = edge_mtimes()
+    i = 0
+    while len(paths) < count:
+        # Carpetas en tramos, que se repiten más adelante como en un reescaneo
+        directory = rng.choice(DIRS)
+        for _ in range(rng.randint(1, 30)):
+            path = f"{directory}/f{i}{rng.choice(exts)}"
+            i += 1
+            paths.append(path)
+            vote = rng.choice((1, -1, 0, 0))
+            if vote:
+                votes[path] = vote
+            if rng.random() < 0.9:
+                mtimes[path] = rng.choice(mtime_choices)
+    return paths[:count], votes, mtimes
+
+
+def brute_force(paths, votes, mtimes, file_filter):
+    rows = []
+    for row, path in enumerate(paths):
+        if file_filter.directory is not None and not is_within(path, os.path.normpath(file_filter.directory)):
+            continue
+        if file_filter.media_type is not None and media_type_of(path) != file_filter.media_type:
+            continue
+        if file_filter.votes is not None and votes.get(path, 0) not in file_filter.votes:
+            continue
+        if file_filter.uses_dates:
+            mtime = mtimes.get(path)
+            if mtime is None:
+                continue
+            if file_filter.mtime_from is not None and mtime < file_filter.mtime_from:
+                continue
+            if file_filter.mtime_to is not None and mtime >= file_filter.mtime_to:
+                continue
+        rows.append(row)
+    return rows
+
+
+def check(index, paths, votes, mtimes, file_filter):
+    expected = brute_force(paths, votes, mtimes, file_filter)
+    assert bit_rows(index.resolve(file_filter)) == expected
+    assert [row for row in range(len(paths)) if index.matches(row, file_filter)] == expected
+
+
+def test_directory_bits_match_brute_force():
+    paths, votes, mtimes = make_library()
+    index = FilterIndex()
+    index.extend(paths, votes, mtimes)
+    for directory in DIRS + ("/", "/fotos/", "/fotos/2023/playa/../playa", "/nada"):
+        check(index, paths, votes, mtimes, FileFilter(directory=directory))
+
+
+def test_month_edges_match_brute_force():
+    paths, votes, mtimes = make_library(seed=2)
+    index = FilterIndex()
+    index.extend(paths, votes, mtimes)
+    bounds = [None] + edge_mtimes()[::5] + list(year_range(2024))
+    rng = random.Random(3)
+    for _ in range(300):
+        low, high = rng.choice(bounds), rng.choice(bounds)
+        check(index, paths, votes, mtimes, FileFilter(mtime_from=low, mtime_to=high))
+
+
+def test_combined_filters_after_incremental_changes():
+    paths, votes, mtimes = make_library(seed=4)
+    index = FilterIndex()
+    # Llega en lotes, como durante un escaneo
+    for start in range(0, len(paths), 97):
+        index.extend(paths[start:start + 97], votes, mtimes)
+
+    rng = random.Random(5)
+    mtime_choices = edge_mtimes()
+    for _ in range(200):
+        row = rng.randrange(len(paths))
+        if rng.random() < 0.5:
+            vote = rng.choice((1, -1, 0))
+            votes[paths[row]] = vote
+            index.set_vote(row, vote)
+        else:
+            mtimes[paths[row]] = rng.choice(mtime_choices)
+            index.set_mtime(row, mtimes[paths[row]])
+
+    start, end = year_range(2023)
+    for file_filter in (
+        FileFilter(directory="/fotos", media_type="image"),
+        FileFilter(votes=(1, 0), mtime_from=start, mtime_to=end),
+        FileFilter(directory="/fotos/2023", votes=(-1,), mtime_from=month_start(2023, 3) + 0.5),
+        FileFilter(media_type="video", mtime_to=month_start(2024, 7)),
+    ):
+        check(index, paths, votes, mtimes, file_filter)
@@ -0,0 +1,84 @@
+from collections import Counter
+
+import pytest
+
+from visor.services.navigation_system import NavigationSystem
+
+
+MODES = (NavigationSystem.MODE_UNIFORM, NavigationSystem.MODE_WEIGHTED, NavigationSystem.MODE_SHUFFLE)
+
+
+def make_nav(count=200, mode=NavigationSystem.MODE_UNIFORM, seed=1, **config):
+    nav = NavigationSystem([f"/lib/f{i:04d}.jpg" for i in range(count)], seed=seed)
+    nav.apply_config(selection_mode=mode, **config)
+    return nav
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_skipped_files_are_not_recorded(mode):
+    nav = make_nav(mode=mode)
+    first = nav.next_random()
+    recent = list(nav.recent_neutral)
+
+    for _ in range(50):
+        assert nav.skip(1) is not None
+    assert nav.history == [first]
+    assert list(nav.recent_neutral) == recent
+
+    shown = nav.commit_skip()
+    assert nav.history == [first, shown]
+    assert nav.get_current() == shown
+    assert list(nav.recent_neutral) == recent + [shown]
+
+
+def test_skip_moves_through_history_first():
+    nav = make_nav()
+    a, b, c = nav.next_random(), nav.next_random(), nav.next_random()
+    assert nav.skip(-1) == b
+    assert nav.skip(-1) == a
+    assert nav.skip(1) == b
+    assert nav.commit_skip() == b
+    assert nav.history == [a, b, c]
+
+
+def test_skip_back_drops_the_pending_pick():
+    nav = make_nav()
+    a = nav.next_random()
+    nav.skip(1)
+    assert nav.skip(-1) == a
+    assert nav.commit_skip() == a
+    assert nav.history == [a]
+
+
+def test_shuffle_skip_returns_pick_to_the_round():
+    nav = make_nav(count=20, mode=NavigationSystem.MODE_SHUFFLE, neutral_cooldown=0)
+    nav.next_random()
+    for _ in range(5):
+        nav.skip(1)
+    nav.commit_skip()
+    seen = set(nav.history)
+    while len(seen) < 20:
+        seen.add(nav.next_random())
+    # Ningún archivo se perdió de la ronda por haberlo saltado
+    assert len(nav.history) == 20
+
+
+def test_uniform_pick_matches_eligible_list():
+    nav = make_nav(count=30, seed=7, neutral_cooldown=10)
+    for path in nav.all_files[:5]:
+        nav.vote_negative(path)  # Cooldown negativo 0: bloqueados
+    for _ in range(10):
+        nav.next_random()
+
+    eligible = set(nav._get_eligible_files())
+    counts = Counter(nav._pick_uniform() for _ in range(20000))
+    assert set(counts) == eligible
+    expected = 20000 / len(eligible)
+    assert all(abs(n - expected) < expected * 0.25 for n in counts.values())
+
+
+def test_lookahead_on_empty_history():
+    nav = make_nav(seed=3)
+    upcoming = nav.lookahead(3)
+    assert nav.history_position == -1
+    assert [nav.next_random() for _ in range(3)] == upcoming
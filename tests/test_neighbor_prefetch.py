@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication
+
+from visor.ui.neighbor_prefetch import NeighborPrefetcher
+
+
+DECODE_DELAY = 0.3  # Segundos: la actual sigue decodificándose al deslizar la ventana
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(6):
+        image = QImage(640, 480, QImage.Format_RGB32)
+        image.fill(QColor(i * 40, 80, 160))
+        path = str(tmp_path / f"img{i}.png")
+        assert image.save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def slow_decode(monkeypatch):
+    decode = NeighborPrefetcher._decode
+
+    def slow(self, path, target, deadline):
+        time.sleep(DECODE_DELAY)
+        decode(self, path, target, deadline)
+
+    monkeypatch.setattr(NeighborPrefetcher, "_decode", slow)
+
+
+def wait_for(app, condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_pinned_path_survives_window_slide(app, images, slow_decode):
+    prefetcher = NeighborPrefetcher()
+    prefetcher.set_target_size(QSize(320, 240))
+    ready = {}
+    prefetcher.imageReady.connect(lambda path, buffer: ready.__setitem__(path, buffer))
+    try:
+        prefetcher.update(images[1:3])
+        assert prefetcher.pending(images[1])
+
+        # Se muestra img1 (pendiente) y la ventana pasa a sus vecinos
+        prefetcher.update(images[2:4], [images[0]], pinned=images[1])
+        assert prefetcher.pending(images[1])
+        assert wait_for(app, lambda: images[1] in ready)
+        assert ready[images[1]] is not None
+
+        # Sin fijar, lo que sale de la ventana se descarta
+        prefetcher.update(images[4:6])
+        assert not prefetcher.pending(images[2]) and prefetcher.get(images[2]) is None
+    finally:
+        prefetcher.shutdown()
+
+
+def test_viewer_paints_file_shown_while_pending(app, images, slow_decode, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from visor.ui.viewer_container import ViewerContainer
+
+    viewer = ViewerContainer()
+    viewer.resize(800, 600)
+    try:
+        viewer.prefetch_neighbors(images[1:3], [images[0]])
+        viewer.show_file(images[1])
+        assert viewer._awaiting_neighbor == images[1]
+
+        # Navegación secuencial: la ventana se desliza alrededor de img1
+        viewer.prefetch_neighbors(images[2:6], [images[0]])
+        assert wait_for(app, lambda: viewer._awaiting_neighbor is None)
+        assert viewer._current_file == images[1]
+        assert not viewer.image_label.pixmap().isNull()
+    finally:
+        viewer.cleanup()
+
+
+def test_cancel_pending_keeps_decoded(app, images):
+    prefetcher = NeighborPrefetcher()
+    prefetcher.set_target_size(QSize(320, 240))
+    try:
+        prefetcher.update(images[:2])
+        assert wait_for(app, lambda: prefetcher.is_ready(images[0]) and prefetcher.is_ready(images[1]))
+
+        prefetcher.update(images[:4])
+        prefetcher.cancel_pending()
+        assert prefetcher.is_ready(images[0]) and prefetcher.is_ready(images[1])
+        assert not prefetcher.pending(images[2]) and not prefetcher.pending(images[3])
+    finally:
+        prefetcher.shutdown()
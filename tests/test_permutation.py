@@ -0,0 +1,68 @@
+from collections import Counter
+
+import pytest
+
+from visor.services.navigation_system import NavigationSystem
+from visor.services.permutation import FeistelPermutation
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 5, 16, 17, 100, 1000, 4097])
+def test_permutation_is_a_bijection(size):
+    perm = FeistelPermutation(size, key=size * 7919)
+    values = [perm[i] for i in range(size)]
+    assert sorted(values) == list(range(size))
+    assert [perm.inverse(v) for v in values] == list(range(size))
+    with pytest.raises(IndexError):
+        perm[size]
+    with pytest.raises(IndexError):
+        perm.inverse(-1)
+
+
+def test_keys_give_different_orders():
+    orders = {tuple(FeistelPermutation(50, key)[i] for i in range(50)) for key in range(20)}
+    assert len(orders) == 20
+    assert tuple(range(50)) not in orders
+
+
+def make_nav(count=30, seed=1, **config):
+    nav = NavigationSystem([f"/lib/f{i:04d}.jpg" for i in range(count)], seed=seed)
+    nav.apply_config(selection_mode=NavigationSystem.MODE_SHUFFLE, **config)
+    return nav
+
+
+def test_each_round_shows_every_file_once():
+    nav = make_nav(neutral_cooldown=0)
+    for _ in range(3):
+        round_files = [nav.next_random() for _ in range(30)]
+        assert sorted(round_files) == nav.all_files
+
+
+def test_files_added_during_round_join_it():
+    nav = make_nav(neutral_cooldown=0)
+    first = [nav.next_random() for _ in range(10)]
+    added = [f"/nuevas/n{i}.jpg" for i in range(8)]
+    assert nav.add_files(added) == added
+    assert nav._bag_extra == added
+    rest = [nav.next_random() for _ in range(28)]
+    assert sorted(first + rest) == sorted(nav.all_files)
+
+
+def test_files_removed_during_round_are_skipped():
+    nav = make_nav(neutral_cooldown=0)
+    first = [nav.next_random() for _ in range(10)]
+    removed = set(nav.all_files[::3])
+    nav.update_file_list([f for f in nav.all_files if f not in removed])
+    rest = [nav.next_random() for _ in range(len(nav.all_files) - len(set(first) - removed))]
+    assert not removed & set(rest)
+    assert sorted(set(first) - removed | set(rest)) == nav.all_files
+
+
+def test_deferred_files_respect_cooldown():
+    nav = make_nav(count=10, seed=4, neutral_cooldown=5)
+    shown = [nav.next_random() for _ in range(300)]
+    assert sorted(shown[:10]) == nav.all_files
+    # Nunca se repite un archivo dentro de su cooldown
+    for i in range(len(shown) - 5):
+        assert len(set(shown[i:i + 6])) == 6
+    counts = Counter(shown)
+    assert max(counts.values()) - min(counts.values()) <= 3
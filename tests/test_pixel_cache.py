@@ -0,0 +1,138 @@
+import mmap
+import random
+from collections import OrderedDict
+
+import pytest
+
+from visor.services.pixel_cache import PixelCache
+
+
+SLOT_SIZE = 8  # 8x8 píxeles: cada hueco ocupa una página
+BYTES_PER_LINE = SLOT_SIZE * 4
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(40):
+        path = tmp_path / f"img{i}.jpg"
+        path.write_bytes(b"x" * (i + 1))
+        paths.append(str(path))
+    return paths
+
+
+def open_cache(tmp_path, slots):
+    page_mb = mmap.PAGESIZE / (1024 * 1024)
+    return PixelCache(SLOT_SIZE, SLOT_SIZE, tmp_path / "pixels.arena", page_mb * slots)
+
+
+def pixels(path):
+    return bytes([hash(path) & 0xFF]) * (BYTES_PER_LINE * SLOT_SIZE)
+
+
+def put(cache, path, priority=None):
+    return cache.put(path, SLOT_SIZE, SLOT_SIZE, BYTES_PER_LINE, 5, pixels(path), priority)
+
+
+def get(cache, path):
+    slot = cache.get(path)
+    if slot is None:
+        return False
+    with slot:
+        assert bytes(slot.view) == pixels(path)
+        assert (slot.width, slot.height, slot.format) == (SLOT_SIZE, SLOT_SIZE, 5)
+    return True
+
+
+def cached(cache, files):
+    return {path for path in files if path in cache}
+
+
+def test_eviction_matches_lru_shadow(tmp_path, files):
+    cache = open_cache(tmp_path, slots=6)
+    assert cache.slot_count == 6
+    lru = OrderedDict()
+    rng = random.Random(1)
+    try:
+        for _ in range(2000):
+            path = rng.choice(files[:12])
+            if rng.random() < 0.5:
+                assert get(cache, path) == (path in lru)
+                if path in lru:
+                    lru.move_to_end(path)
+            else:
+                assert put(cache, path)
+                lru[path] = None
+                lru.move_to_end(path)
+                if len(lru) > 6:
+                    lru.popitem(last=False)
+            assert cached(cache, files) == set(lru)
+        stats = cache.stats()
+        assert stats["hits"] == stats["lru_hits"] > 0
+    finally:
+        cache.close()
+
+
+def test_priority_eviction_spares_recent_and_pinned(tmp_path, files):
+    cache = open_cache(tmp_path, slots=12)
+    priorities = {path: random.Random(i).choice((0.5, 1.0, 2.0)) for i, path in enumerate(files)}
+    lru = OrderedDict()
+    rng = random.Random(2)
+    assert put(cache, files[0], priorities[files[0]])
+    pinned = cache.get(files[0])  # En pantalla durante toda la prueba
+    lru[files[0]] = None
+    try:
+        for _ in range(600):
+            path = rng.choice(files[1:])
+            if path in lru:
+                assert get(cache, path)
+                lru.move_to_end(path)
+                continue
+            if len(lru) == 12:
+                # Referencia: la de menor prioridad fuera de las recientes y sin fijar
+                candidates = [p for p in list(lru)[:12 - cache.RECENT_PROTECTED] if p != files[0]]
+                del lru[min(candidates, key=priorities.__getitem__)]
+            assert put(cache, path, priorities[path])
+            lru[path] = None
+            assert cached(cache, files) == set(lru)
+        assert bytes(pinned.view) == pixels(files[0])
+    finally:
+        pinned.release()
+        cache.close()
+
+
+def test_zero_priority_is_not_admitted(tmp_path, files):
+    cache = open_cache(tmp_path, slots=4)
+    try:
+        assert put(cache, files[0])
+        assert not put(cache, files[0], priority=0)
+        assert files[0] not in cache
+        assert put(cache, files[1], priority=1.0)
+        assert cache.reprioritize(lambda path: 0.0) == 1
+        assert not cached(cache, files)
+    finally:
+        cache.close()
+
+
+def test_entries_and_order_survive_reopen(tmp_path, files):
+    cache = open_cache(tmp_path, slots=4)
+    for path in files[:4]:
+        put(cache, path)
+    get(cache, files[0])  # files[1] pasa a ser la más antigua
+    cache.close()
+
+    cache = open_cache(tmp_path, slots=4)
+    try:
+        assert cached(cache, files) == set(files[:4])
+        assert get(cache, files[2])
+        put(cache, files[4])
+        assert cached(cache, files) == {files[0], files[2], files[3], files[4]}
+    finally:
+        cache.close()
+
+    # Otra geometría: el arena empieza vacío
+    cache = open_cache(tmp_path, slots=5)
+    try:
+        assert not cached(cache, files)
+    finally:
+        cache.close()
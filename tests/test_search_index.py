@@ -0,0 +1,103 @@
+import random
+
+from visor.services.search_index import SearchIndex
+
+
+WORDS = ("vacaciones", "playa", "cumple", "boda", "nieve", "gato", "perro", "viaje")
+
+
+def library(count=500, seed=1):
+    rng = random.Random(seed)
+    return [
+        f"/fotos/{rng.choice(WORDS)}/{rng.choice(WORDS)}_{i}.{rng.choice(('jpg', 'png', 'mp4'))}"
+        for i in range(count)
+    ]
+
+
+def results(index, query):
+    return sorted(path for batch in index.search(query) for path in batch)
+
+
+def brute_force(paths, query):
+    terms = query.lower().split()
+    return sorted(p for p in paths if all(t in p.rpartition("/")[2].lower() for t in terms))
+
+
+def test_search_matches_brute_force_with_pending_and_removed():
+    paths = library()
+    index = SearchIndex()
+    index.add(paths)
+    index.index_pending(300)  # El resto queda pendiente
+    removed = set(paths[::7])
+    index.remove(removed)
+    live = [p for p in paths if p not in removed]
+    for query in ("playa", "gato_1", "vi", "_3", "4 jpg", "boda_49"):
+        expected = brute_force(live, query)
+        assert expected  # Sin coincidencias exactas se devuelven las aproximadas
+        assert results(index, query) == expected
+
+
+def test_round_trip_after_remove_and_re_add():
+    index = SearchIndex()
+    index.add(["/a/foo.jpg", "/a/bar.jpg", "/b/x.png", "/b/y.png", "/c/z.gif"])
+    index.index_pending()
+    index.remove(["/a/foo.jpg"])
+    index.add(["/a/foo.jpg"])
+
+    restored = SearchIndex.loads(index.dumps())
+    assert restored is not None
+    assert len(restored) == 5
+    assert results(restored, "foo") == ["/a/foo.jpg"]
+
+
+def test_loads_accepts_removed_duplicates():
+    # Datos guardados antes de reutilizar ids: la ruta eliminada y la viva
+    index = SearchIndex()
+    index.add(["/a/foo.jpg", "/a/bar.jpg"])
+    index.remove(["/a/foo.jpg"])
+    index._dead.clear()
+    index.add(["/a/foo.jpg"])
+    assert index._paths.count("/a/foo.jpg") == 2
+
+    restored = SearchIndex.loads(index.dumps())
+    assert restored is not None
+    restored.index_pending()
+    assert results(restored, "foo") == ["/a/foo.jpg"]
+
+
+def test_snapshot_ignores_later_indexing():
+    paths = library(200)
+    index = SearchIndex()
+    index.add(paths)
+    index.index_pending(120)
+    frozen = index.snapshot()
+    index.index_pending()
+    index.add(["/nuevas/playa_nueva.jpg"])
+
+    restored = SearchIndex.loads(frozen.dumps())
+    assert restored.pending == 80
+    assert results(restored, "playa") == brute_force(paths, "playa")
+
+
+def test_compacted_dump_keeps_live_files():
+    paths = library(300)
+    index = SearchIndex()
+    index.add(paths)
+    index.index_pending(250)
+    removed = set(paths[:150])
+    index.remove(removed)
+    data = index.dumps()
+    assert len(index._paths) == 300  # El índice en memoria no se compacta
+
+    restored = SearchIndex.loads(data)
+    live = paths[150:]
+    assert restored._paths == live and not restored._removed
+    for query in ("cumple", "perro_2", "jpg"):
+        assert results(restored, query) == brute_force(live, query)
+    restored.index_pending()
+    assert results(restored, "gato") == brute_force(live, "gato")
+
+
+def test_loads_rejects_garbage():
+    assert SearchIndex.loads(b"") is None
+    assert SearchIndex.loads(b"\x00\x01garbage") is None
@@ -0,0 +1,87 @@
+import marshal
+
+import pytest
+
+from visor.services.navigation_system import NavigationSystem
+
+
+MODES = (NavigationSystem.MODE_UNIFORM, NavigationSystem.MODE_WEIGHTED, NavigationSystem.MODE_SHUFFLE)
+FILES = [f"/lib/f{i:04d}.jpg" for i in range(60)]
+
+
+def make_nav(mode, files=FILES, seed=None):
+    nav = NavigationSystem(files, seed=seed)
+    nav.apply_config(selection_mode=mode, neutral_cooldown=8, positive_cooldown=3, negative_cooldown=2)
+    for path in files[:6]:
+        nav.vote_positive(path)
+    for path in files[6:9]:
+        nav.vote_negative(path)
+    return nav
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_restored_session_continues_the_same_sequence(mode):
+    nav = make_nav(mode, seed=11)
+    for _ in range(25):
+        nav.next_random()
+    nav.go_back()
+    nav.go_back()
+
+    restored = make_nav(mode)
+    assert restored.import_session(nav.export_session())
+    assert restored.seed == 11
+    assert restored.history == nav.history
+    assert restored.history_position == nav.history_position
+    assert list(restored.recent_neutral) == list(nav.recent_neutral)
+    assert [restored.next_random() for _ in range(40)] == [nav.next_random() for _ in range(40)]
+
+
+def test_same_seed_gives_same_sequence():
+    first, second = make_nav(NavigationSystem.MODE_UNIFORM, seed=3), make_nav(NavigationSystem.MODE_UNIFORM, seed=3)
+    assert [first.next_random() for _ in range(100)] == [second.next_random() for _ in range(100)]
+    second.reseed(4)
+    assert [first.next_random() for _ in range(10)] != [second.next_random() for _ in range(10)]
+
+
+def test_missing_files_leave_the_history():
+    nav = make_nav(NavigationSystem.MODE_UNIFORM, seed=5)
+    for _ in range(10):
+        nav.next_random()
+    nav.go_back()
+    current = nav.get_current()
+
+    gone = set(nav.history[:4]) - {current}
+    restored = make_nav(NavigationSystem.MODE_UNIFORM, files=[f for f in FILES if f not in gone])
+    assert restored.import_session(nav.export_session())
+    assert restored.history == [f for f in nav.history if f not in gone]
+    assert restored.get_current() == current
+
+
+def test_shuffle_round_dropped_when_catalog_changes():
+    nav = make_nav(NavigationSystem.MODE_SHUFFLE, seed=2)
+    for _ in range(10):
+        nav.next_random()
+    restored = make_nav(NavigationSystem.MODE_SHUFFLE, files=FILES[:-1])
+    assert restored.import_session(nav.export_session())
+    assert restored._bag is None
+    assert restored.next_random() is not None
+
+
+def test_rejects_bad_magic_version_and_payload():
+    nav = make_nav(NavigationSystem.MODE_UNIFORM, seed=1)
+    nav.next_random()
+    data = nav.export_session()
+    header = len(NavigationSystem.SESSION_MAGIC)
+
+    target = make_nav(NavigationSystem.MODE_UNIFORM, seed=9)
+    bad = [
+        b"",
+        b"VSE",
+        b"XSES" + data[header:],
+        data[:header] + bytes([NavigationSystem.SESSION_VERSION + 1]) + data[header + 1:],
+        data[:header + 1] + b"\xff\x00garbage",
+        data[:header + 1] + marshal.dumps({"seed": 1}),
+    ]
+    for blob in bad:
+        assert not target.import_session(blob)
+    assert target.seed == 9 and target.history == []
@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+
+from visor.ui.slideshow import SlideshowScheduler
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class Playlist:
+    """Lista fija de archivos para el planificador"""
+
+    def __init__(self, count, ready=()):
+        self.files = [f"img{i}.jpg" for i in range(count)]
+        self.position = 0
+        self.ready = set(ready)
+        self.prefetched = []
+        self.given_up = []
+
+    def lookahead(self, count):
+        return self.files[self.position + 1:self.position + 1 + count]
+
+    def advance(self, count):
+        if self.position + 1 >= len(self.files):
+            return False
+        self.position = min(self.position + count, len(self.files) - 1)
+        return True
+
+    def scheduler(self):
+        return SlideshowScheduler(
+            lookahead=self.lookahead,
+            advance=self.advance,
+            prefetch=lambda paths, deadlines: self.prefetched.append(deadlines),
+            is_ready=self.ready.__contains__,
+            latency=lambda: 0.0,
+            give_up=self.given_up.append,
+        )
+
+
+def run_until_stopped(app, scheduler, timeout=5.0):
+    stopped = []
+    scheduler.stopped.connect(lambda: stopped.append(True))
+    scheduler.start()
+    end = time.monotonic() + timeout
+    while not stopped and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.002)
+    return bool(stopped)
+
+
+def test_stops_at_end_of_list(app):
+    playlist = Playlist(4, ready={"img1.jpg", "img2.jpg", "img3.jpg"})
+    scheduler = playlist.scheduler()
+    scheduler.set_period(0.1)
+    assert run_until_stopped(app, scheduler)
+    assert not scheduler.running
+    stats = scheduler.stats()
+    assert stats["on_time"] == 3 and stats["degraded"] == 0
+    assert all(deadlines for deadlines in playlist.prefetched[:-1])
+
+
+def test_degraded_frames_leave_the_prefetch_window(app):
+    playlist = Playlist(3)
+    scheduler = playlist.scheduler()
+    scheduler.set_period(0.1)
+    assert run_until_stopped(app, scheduler)
+    assert scheduler.stats()["degraded"] == 2
+    assert playlist.given_up == ["img1.jpg", "img2.jpg"]
+
+
+def test_skips_to_first_ready_frame(app):
+    playlist = Playlist(5, ready={"img3.jpg", "img4.jpg"})
+    scheduler = playlist.scheduler()
+    scheduler.set_period(0.1)
+    assert run_until_stopped(app, scheduler)
+    stats = scheduler.stats()
+    assert stats["skipped"] >= 1 and stats["on_time"] >= 1
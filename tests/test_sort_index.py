@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from visor.services.sort_index import (
+    SORT_MTIME, SORT_NAME, SORT_SCAN, SORT_SIZE, SORT_TYPE, SORT_VOTE, SortIndex,
+)
+
+
+NAMES = ("Playa", "boda", "gato", "Gato", "nieve", "viaje")
+EXTS = ("jpg", "PNG", "mp4", "gif")
+
+
+def make_files(count, rng):
+    return [
+        f"/fotos/d{rng.randrange(4)}/{rng.choice(NAMES)}_{rng.randrange(50)}.{rng.choice(EXTS)}"
+        for _ in range(count)
+    ]
+
+
+def vote_group(votes, path):
+    return {1: 0, -1: 2}.get(votes.get(path, 0), 1)
+
+
+def reference(key, files, votes=None, sizes=None, mtimes=None):
+    """Orden esperado con sorted() y el número de fila como desempate"""
+    inf = float("inf")
+
+    def name(row):
+        return files[row].rpartition("/")[2].lower()
+
+    keys = {
+        SORT_NAME: lambda row: (name(row), row),
+        SORT_TYPE: lambda row: (name(row).rpartition(".")[2], name(row), row),
+        SORT_SIZE: lambda row: (sizes.get(files[row], inf), row),
+        SORT_MTIME: lambda row: (mtimes.get(files[row], inf), row),
+        SORT_VOTE: lambda row: (vote_group(votes, files[row]), row),
+    }
+    return sorted(range(len(files)), key=keys[key])
+
+
+def random_votes(files, rng):
+    return {path: rng.choice((1, -1)) for path in files if rng.random() < 0.4}
+
+
+def test_permutations_match_sorted():
+    rng = random.Random(1)
+    files = list(dict.fromkeys(make_files(400, rng)))
+    votes = random_votes(files, rng)
+    sizes = {path: rng.randrange(20) for path in files if rng.random() < 0.9}
+    mtimes = {path: rng.randrange(10) * 1.5 for path in files if rng.random() < 0.9}
+
+    index = SortIndex(files)
+    index.set_votes(votes)
+    index.set_stats(sizes, mtimes)
+    assert index.order(SORT_SCAN) is None
+    for key in (SORT_NAME, SORT_TYPE, SORT_SIZE, SORT_MTIME, SORT_VOTE):
+        assert list(index.order(key)) == reference(key, files, votes, sizes, mtimes)
+    with pytest.raises(ValueError):
+        index.order("color")
+
+
+def test_extend_marks_stale_until_refresh():
+    rng = random.Random(2)
+    files = list(dict.fromkeys(make_files(100, rng)))
+    index = SortIndex(files)
+    before = list(index.order(SORT_NAME))
+
+    added = [path for path in dict.fromkeys(make_files(30, rng)) if path not in set(files)]
+    files.extend(added)
+    index.extend(len(added))
+    assert index.is_stale(SORT_NAME)
+    assert list(index.order(SORT_NAME)) == before + list(range(len(before), len(files)))
+
+    index.refresh()
+    assert not index.is_stale(SORT_NAME)
+    assert list(index.order(SORT_NAME)) == reference(SORT_NAME, files)
+
+
+def apply_vote(index, votes, path, vote):
+    if vote:
+        votes[path] = vote
+    else:
+        votes.pop(path, None)
+    move = index.find_vote_move(path)
+    if move is not None:
+        index.move_vote(path, *move)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vote_moves_and_extend_match_sorted(seed):
+    rng = random.Random(seed)
+    files = list(dict.fromkeys(make_files(150, rng)))
+    votes = random_votes(files, rng)
+    index = SortIndex(files)
+    index.set_votes(votes)
+    index.order(SORT_VOTE)
+
+    for step in range(600):
+        if rng.random() < 0.05:
+            # Lote de un escaneo: cada fila nueva va al final de su grupo
+            known = set(files)
+            added = [p for p in dict.fromkeys(make_files(rng.randint(1, 10), rng)) if p not in known]
+            for path in added:
+                if rng.random() < 0.5:
+                    votes[path] = rng.choice((1, -1))
+            files.extend(added)
+            index.extend(len(added))
+            assert not index.is_stale(SORT_VOTE)
+        else:
+            apply_vote(index, votes, rng.choice(files), rng.choice((1, 0, -1)))
+        if step % 25 == 0:
+            assert list(index.order(SORT_VOTE)) == reference(SORT_VOTE, files, votes)
+    assert list(index.order(SORT_VOTE)) == reference(SORT_VOTE, files, votes)
+
+
+def test_same_group_vote_does_not_move():
+    files = ["/a/1.jpg", "/a/2.jpg", "/a/3.jpg"]
+    votes = {}
+    index = SortIndex(files)
+    index.set_votes(votes)
+    assert index.find_vote_move(files[0]) is None  # Sin permutación por voto aún
+    index.order(SORT_VOTE)
+    votes[files[1]] = 0
+    assert index.find_vote_move(files[1]) is None
+    votes[files[2]] = 1
+    assert index.find_vote_move(files[2]) == (2, 0)
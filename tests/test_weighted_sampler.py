@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from visor.services.navigation_system import NavigationSystem
+from visor.services.weighted_sampler import FenwickTree
+
+
+def prefix_sums(weights):
+    sums = [0.0]
+    for w in weights:
+        sums.append(sums[-1] + w)
+    return sums
+
+
+def check_against_brute_force(tree, weights):
+    sums = prefix_sums(weights)
+    assert len(tree) == len(weights)
+    assert tree.total() == pytest.approx(sums[-1])
+    for i, w in enumerate(weights):
+        assert tree.get(i) == w
+        if w > 0:
+            # Centro del intervalo acumulado de i: lejos de los bordes de redondeo
+            assert tree.find(sums[i] + w / 2) == i
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 100, 257])
+def test_set_and_append_match_prefix_sums(size):
+    rng = random.Random(size)
+    weights = [rng.choice((0.0, 0.5, 1.0, 3.0)) for _ in range(size)]
+    tree = FenwickTree(weights)
+    check_against_brute_force(tree, weights)
+
+    for _ in range(500):
+        if rng.random() < 0.1:
+            weights.append(rng.random())
+            tree.append(weights[-1])
+        else:
+            i = rng.randrange(len(weights))
+            weights[i] = rng.choice((0.0, rng.random() * 4))
+            tree.set(i, weights[i])
+    check_against_brute_force(tree, weights)
+
+
+def test_rebuild_keeps_weights(monkeypatch):
+    monkeypatch.setattr(FenwickTree, "REBUILD_EVERY", 8)
+    rng = random.Random(5)
+    weights = [1.0] * 10
+    tree = FenwickTree(weights)
+    for _ in range(100):
+        i = rng.randrange(10)
+        weights[i] = rng.random()
+        tree.set(i, weights[i])
+    assert tree._updates < 10
+    check_against_brute_force(tree, weights)
+
+
+def test_find_skips_zero_weights_at_the_edge():
+    tree = FenwickTree([1.0, 2.0, 0.0, 0.0])
+    assert tree.find(2.999999) == 1
+    assert tree.find(3.0) == 1  # Objetivo en el borde por redondeo
+
+
+def make_nav(count=120, seed=1, **config):
+    nav = NavigationSystem([f"/lib/f{i:04d}.jpg" for i in range(count)], seed=seed)
+    nav.apply_config(selection_mode=NavigationSystem.MODE_WEIGHTED, **config)
+    return nav
+
+
+def check_sampler(nav):
+    # El árbol incremental debe coincidir con recalcular todos los pesos
+    sampler = nav._get_sampler()
+    weights = [nav.get_weight(f) for f in nav._sampler_files]
+    check_against_brute_force(sampler, weights)
+    positive = {f for f, w in zip(nav._sampler_files, weights) if w > 0}
+    eligible = set(nav._get_eligible_files())
+    # Solo los recién mostrados (decaimiento) pueden ser elegibles con peso 0
+    assert positive <= eligible
+    assert all(f in nav._last_shown or nav.file_weights.get(f) == 0 for f in eligible - positive)
+
+
+def test_sampler_tracks_votes_cooldowns_and_decay():
+    nav = make_nav(neutral_cooldown=15, positive_cooldown=5, negative_cooldown=3, decay_steps=40)
+    rng = random.Random(2)
+    for step in range(400):
+        path = rng.choice(nav.all_files)
+        action = rng.random()
+        if action < 0.05:
+            nav.vote_positive(path)
+        elif action < 0.08:
+            nav.vote_negative(path)
+        elif action < 0.1:
+            nav.clear_vote(path)
+        elif action < 0.12:
+            nav.set_file_weight(path, rng.choice((0.5, 1.0, 2.0)))
+        assert nav.next_random() is not None
+        if step % 50 == 0:
+            check_sampler(nav)
+    check_sampler(nav)
+
+
+def test_decay_recovers_full_weight():
+    nav = make_nav(count=10, neutral_cooldown=0, decay_steps=4)
+    shown = nav.next_random()
+    weights = []
+    for _ in range(5):
+        weights.append(nav.get_weight(shown))
+        nav._mark_shown(next(f for f in nav.all_files if f != shown))
+    assert weights == [0.0, 0.25, 0.5, 0.75, 1.0]
+    check_sampler(nav)
+
+
+def test_weighted_picks_follow_weights():
+    nav = make_nav(count=4, neutral_cooldown=0)
+    nav.set_file_weight(nav.all_files[0], 5.0)
+    nav.set_file_weight(nav.all_files[3], 0.0)
+    counts = dict.fromkeys(nav.all_files, 0)
+    for _ in range(16000):
+        counts[nav._pick_weighted()] += 1
+    assert counts[nav.all_files[3]] == 0
+    ratio = counts[nav.all_files[0]] / counts[nav.all_files[1]]
+    assert 4.0 < ratio < 6.0